@@ -66,6 +66,18 @@ def test_filelog(tmp_path: Path):
             }
     assert log.get_size() == nbytes_truth_per_system[platform.system()]
 
+def test_filelog_rotation(tmp_path: Path):
+    """Log files are rotated at the size cap instead of being cleared."""
+    log = filelog.Filelog(logname="rotation", filename="rotation_log", filedir=str(tmp_path), size_cap=1000)
+    for number in range(100):
+        log.info("Rotation test message %s", number)
+    log.flush()
+    assert (tmp_path / "rotation_log.log.1").is_file()
+    assert log.get_size() <= 1000
+    assert "Rotation test message 99" in (tmp_path / "rotation_log.log").read_text()
+    assert log.get_last_message() == ("Rotation test message 99", "info")
+
+
 def test_creating_a_settings_object_with_and_without_arguments(tmp_path):
     """Test settings module"""
     # create a settings object without any arguments
@@ -210,6 +222,64 @@ def test_reading_back_from_an_existing_settings_file(tmp_path):
     # now it should hold the new data
     assert _settings_2.get_property("test_string") == "test_edited"
 
+def test_settings_dirty_tracking(tmp_path):
+    """Edits are tracked without comparing deep copies."""
+    _settings = settings.Settings(file_path=str(tmp_path / "test_dirty.json"))
+    _settings.add_property("name", "test")
+    _settings.add_property("nested", {"sub": {"value": 1}, "other": [1, 2]})
+    assert _settings.apply_settings()
+    assert not _settings.is_settings_changed()
+
+    # equal values are not considered as a change
+    _settings.edit_property("name", "test")
+    _settings.add_property("name", "test")
+    assert not _settings.is_settings_changed()
+    assert not _settings.apply_settings()
+
+    # sub property edits do not leak into the original value
+    other = _settings.get_sub_property(["nested", "other"])
+    _settings.edit_sub_property(["nested", "sub", "value"], 2)
+    assert _settings.is_settings_changed()
+    assert _settings.get_sub_property(["nested", "other"]) is other
+    _settings.reset_settings()
+    assert not _settings.is_settings_changed()
+    assert _settings.get_sub_property(["nested", "sub", "value"]) == 1
+
+    # passing back the same object edited in place is a change
+    other.append(3)
+    _settings.edit_property("nested", _settings.get_property("nested"))
+    assert _settings.apply_settings()
+    assert settings.Settings(str(tmp_path / "test_dirty.json")).get_sub_property(
+        ["nested", "other"]) == [1, 2, 3]
+
+    _settings.delete_property("name")
+    assert _settings.is_settings_changed()
+    _settings.reset_settings()
+    assert _settings.get_property("name") == "test"
+
+
+def test_settings_snapshot(tmp_path):
+    """In place edits are detected and reverted after taking a snapshot."""
+    _settings = settings.Settings(file_path=str(tmp_path / "test_snapshot.json"))
+    _settings.add_property("users", {"Admin": {"permissionLevel": 3}})
+    _settings.apply_settings()
+
+    _settings.snapshot()
+    assert not _settings.is_settings_changed()
+    _settings.get_property("users")["Admin"]["permissionLevel"] = 1
+    assert _settings.is_settings_changed()
+    _settings.reset_settings()
+    assert not _settings.is_settings_changed()
+    assert _settings.get_sub_property(["users", "Admin", "permissionLevel"]) == 3
+
+    _settings.snapshot()
+    _settings.get_property("users")["Generic"] = {"permissionLevel": 0}
+    assert _settings.apply_settings()
+    assert not _settings.is_settings_changed()
+    _settings.reset_settings()
+    assert "Generic" in _settings.get_property("users")
+
+
 def test_settings_fallback_function(tmp_path):
     """Test settings fallback function."""
     _fallback_settings = settings.Settings(file_path=str(tmp_path / "test_settings_fallback.json"))
@@ -271,6 +341,130 @@ def test_io(tmp_path):
     # test reading corrupted file
     pytest.raises(Exception, _io.read)
 
+
+def test_io_atomic_write(tmp_path):
+    """Writes replace the file atomically and release the lock."""
+    file_path = tmp_path / "test_atomic.json"
+    _io = io.IO(file_path=str(file_path))
+    io.IO.reset_lock_statistics()
+    _io.write({"version": 1})
+
+    # the lock is released right after the write
+    _lock = FileLock(str(tmp_path / "test_atomic.json.lock"))
+    _lock.acquire(timeout=0)
+    _lock.release()
+    assert io.IO.get_lock_statistics()["acquired"] == 1
+
+    # an interrupted write leaves the previous content and no temp files
+    with patch("tik_manager4.core.io.os.replace", side_effect=OSError("crash")):
+        with pytest.raises(OSError):
+            _io.write({"version": 2})
+    assert _io.read() == {"version": 1}
+    assert {path.name for path in tmp_path.iterdir()} == {
+        "test_atomic.json", "test_atomic.json.lock"}
+
+    # waiting for another writer is recorded
+    _lock.acquire()
+    io.IO.lock_timeout = 0.1
+    try:
+        with pytest.raises(Timeout):
+            _io.write({"version": 3})
+    finally:
+        io.IO.lock_timeout = 3
+        _lock.release()
+    statistics = io.IO.get_lock_statistics()
+    assert statistics["contended"] == 1
+    assert statistics["timeouts"] == 1
+    assert statistics["acquired"] == 2
+    assert statistics["max_hold_time"] >= 0
+
+
+def test_io_read_cache(tmp_path):
+    """Test the parsed data cache of the IO module."""
+    io.IO.clear_cache()
+    file_path = tmp_path / "test_cache.json"
+    _io = io.IO(file_path=str(file_path))
+    _io.write({"test": [1, 2, 3]})
+
+    first = _io.read()
+    second = io.IO().read(str(file_path))
+    assert first == second == {"test": [1, 2, 3]}
+    stats = io.IO.get_cache_statistics()
+    assert stats["misses"] == 1 and stats["hits"] == 1 and stats["entries"] == 1
+
+    # each read returns an independent copy
+    first["test"].append(4)
+    assert _io.read() == {"test": [1, 2, 3]}
+
+    # modified files are parsed again and replace the old entry
+    _io.write({"test": "modified"})
+    assert _io.read() == {"test": "modified"}
+    assert io.IO.get_cache_statistics()["entries"] == 1
+
+    # size limit
+    io.IO.set_cache_size(0)
+    assert io.IO.get_cache_statistics()["entries"] == 0
+    assert _io.read() == {"test": "modified"}
+    assert io.IO.get_cache_statistics()["entries"] == 0
+    io.IO.set_cache_size(64)
+    io.IO.clear_cache()
+
+
+def test_io_journal(tmp_path):
+    """Test reading and writing the journal layout."""
+    file_path = tmp_path / "test_journal.twork"
+    _io = io.IO(file_path=str(file_path))
+    assert _io.journal_records is None
+    _io.write_journal({"name": "test"}, "versions", [{"version_number": 1}])
+    assert _io.journal_records == 1
+    _io.append_journal([(None, {"version_number": 2}), (0, {"version_number": 1, "notes": "edited"})])
+    assert _io.journal_records == 3
+    assert len(file_path.read_text().splitlines()) == 4
+
+    expected = {"name": "test", "versions": [{"version_number": 1, "notes": "edited"}, {"version_number": 2}]}
+    reader = io.IO(file_path=str(file_path))
+    assert reader.read() == expected
+    assert reader.journal_records == 3
+
+    # an interrupted append is skipped
+    with open(file_path, "a") as f:
+        f.write('{"op": "add", "item": {"vers')
+    assert reader.read() == expected
+    # the next append is not lost in the corrupted line
+    _io.append_journal([(None, {"version_number": 3})])
+    expected["versions"].append({"version_number": 3})
+    assert reader.read() == expected
+
+    # plain json files are still read the same way
+    reader.write(expected)
+    assert reader.journal_records is None
+    assert reader.read() == expected
+    assert json.loads(file_path.read_text()) == expected
+
+def test_scan_directory(tmp_path):
+    """Test the directory snapshots."""
+    from tik_manager4.core import snapshot
+    (tmp_path / "sub" / "deeper").mkdir(parents=True)
+    top = tmp_path / "top.twork"
+    top.write_text("{}")
+    (tmp_path / "sub" / "deeper" / "nested.twork").write_text("{}")
+    (tmp_path / "sub" / "other.ttask").write_text("{}")
+
+    assert [s.path for s in snapshot.scan_directory(tmp_path, ".twork")] == [top]
+    snapshots = snapshot.scan_directory(tmp_path, ".twork", recursive=True)
+    assert sorted(s.path.name for s in snapshots) == ["nested.twork", "top.twork"]
+    assert snapshot.scan_directory(tmp_path / "missing", ".twork") == []
+
+    top_snapshot = snapshot.scan_directory(tmp_path, ".twork")[0]
+    assert top_snapshot.size == 2
+    assert top_snapshot.mtime == top.lstat().st_mtime
+
+    # settings compare against the snapshot instead of the file
+    _settings = Settings(str(top))
+    assert not _settings.is_modified(snapshot=top_snapshot)
+    assert _settings.is_modified(snapshot=top_snapshot._replace(mtime=0))
+
+
 def test_getting_home_dir(monkeypatch):
     """Test the utils module."""
     # test get_home_dir
@@ -588,6 +782,205 @@ def test_move(tmp_path):
     assert target.exists()
     assert not source.exists()
 
+def test_copy_engine(tmp_path):
+    """Test the copy engine with folders, partial files and progress."""
+    from tik_manager4.core import copier
+    source = tmp_path / "source"
+    (source / "nested").mkdir(parents=True)
+    big_data = os.urandom(3 * 1024 * 1024 + 17)
+    (source / "big.bin").write_bytes(big_data)
+    (source / "nested" / "small.txt").write_text("small")
+    (source / "empty.txt").write_text("")
+
+    reports = []
+    engine = copier.CopyEngine(
+        workers=3, chunk_size=1024 * 1024, progress_callback=reports.append
+    )
+    target = tmp_path / "target"
+    final = engine.copy(source, target)
+    assert (target / "big.bin").read_bytes() == big_data
+    assert (target / "nested" / "small.txt").read_text() == "small"
+    assert (target / "empty.txt").exists()
+    assert final.copied_files == final.total_files == 3
+    assert final.copied_bytes == final.total_bytes == len(big_data) + 5
+    assert reports and reports[-1].percent == 100.0
+    assert not list(target.rglob(f"*{copier.PARTIAL_SUFFIX}"))
+    assert engine.hashes == {}
+
+    # an interrupted copy continues from the partial file
+    resumed_target = tmp_path / "resumed.bin"
+    partial = tmp_path / f"resumed.bin{copier.PARTIAL_SUFFIX}"
+    partial.write_bytes(big_data[:2 * 1024 * 1024 + 100])
+    engine = copier.CopyEngine(chunk_size=1024 * 1024, hash_files=True)
+    engine.copy(source / "big.bin", resumed_target)
+    assert resumed_target.read_bytes() == big_data
+    assert engine.statistics["resumed"] == 1
+    assert not partial.exists()
+    # the hash covers the resumed part as well
+    assert engine.hashes == {resumed_target.as_posix(): copier.file_hash(resumed_target)}
+
+    # the files are hashed while copying them
+    engine = copier.CopyEngine(workers=3, hash_files=True)
+    engine.copy(source, tmp_path / "hashed")
+    assert engine.hashes == {
+        path.as_posix(): copier.file_hash(path)
+        for path in (tmp_path / "hashed").rglob("*") if path.is_file()
+    }
+
+    # a stale partial file is not used
+    partial.write_bytes(b"x" * 100)
+    os.utime(partial, (0, 0))
+    engine = copier.CopyEngine()
+    engine.copy(source / "big.bin", resumed_target)
+    assert resumed_target.read_bytes() == big_data
+    assert engine.statistics["resumed"] == 0
+
+    # move falls back to copying when the rename fails
+    with patch("os.rename", side_effect=OSError("cross-device link")):
+        state, _msg = utils.move(source, tmp_path / "moved")
+    assert state
+    assert not source.exists()
+    assert (tmp_path / "moved" / "big.bin").read_bytes() == big_data
+
+
+def test_watcher_fallback(tmp_path, monkeypatch):
+    """Test the watcher polls when the folders cannot be watched with inotify."""
+    import ctypes
+    from tik_manager4.core import watcher
+
+    class _Libc:
+        """Accepts the given number of watches and fails the rest."""
+        def __init__(self, accepted):
+            self.accepted = accepted
+
+        def inotify_init1(self, _flags):
+            return os.open(os.devnull, os.O_RDONLY)
+
+        def inotify_add_watch(self, _fd, _path, _mask):
+            if self.accepted:
+                self.accepted -= 1
+                return 1
+            ctypes.set_errno(28)  # ENOSPC
+            return -1
+
+    (tmp_path / "nested").mkdir()
+    monkeypatch.setattr(watcher, "_load_libc", lambda: _Libc(accepted=1))
+    with pytest.raises(OSError):
+        watcher.InotifyBackend(tmp_path)
+    database_watcher = watcher.DatabaseWatcher(tmp_path)
+    assert database_watcher._interval == watcher.DatabaseWatcher.interval
+    database_watcher.start()
+    assert database_watcher.backend == "polling"
+    database_watcher.stop()
+
+    # a new folder cannot be watched later
+    monkeypatch.setattr(watcher, "_load_libc", lambda: _Libc(accepted=2))
+    database_watcher = watcher.DatabaseWatcher(tmp_path, interval=0.05)
+    database_watcher.start()
+    assert database_watcher.backend == "inotify"
+    database_watcher._backend._add_watches(tmp_path / "nested")
+    changes = []
+    for _ in range(100):
+        changes.extend(database_watcher.drain())
+        if changes:
+            break
+        time.sleep(0.02)
+    assert database_watcher.backend == "polling"
+    assert changes == [watcher.Change(watcher.OVERFLOW, tmp_path)]
+    database_watcher.stop()
+
+
+def test_manifest_scan(tmp_path, monkeypatch):
+    """Test the manifest uses the known hashes and skips the unknown ones."""
+    from tik_manager4.core import copier
+    from tik_manager4.core import manifest
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "copied.abc").write_text("copied")
+    (tmp_path / "cache" / "exported.abc").write_text("exported")
+    hashes = {"cache/copied.abc": "known"}
+
+    hashed = []
+    file_hash = copier.file_hash
+    monkeypatch.setattr(
+        copier, "file_hash", lambda path, *args: hashed.append(Path(path).name) or file_hash(path, *args)
+    )
+    entries = manifest.scan(tmp_path, "cache", hashes=hashes, compute=False)
+    assert not hashed
+    assert entries["cache/copied.abc"].hash == "known"
+    assert entries["cache/exported.abc"].hash is None
+    entries = manifest.scan(tmp_path, "cache", hashes=hashes)
+    assert hashed == ["exported.abc"]
+    monkeypatch.undo()
+
+    # the files without hashes are checked with the modified times
+    exported = tmp_path / "cache" / "exported.abc"
+    entry = manifest.ManifestEntry(exported.stat().st_size, exported.stat().st_mtime, None)
+    assert manifest.matches(exported, entry, deep=True)
+    os.utime(exported, (0, 0))
+    assert not manifest.matches(exported, entry, deep=True)
+
+
+def test_copy_throttle():
+    """Test the throttle limits the total rate of the transfers."""
+    import time
+    from tik_manager4.core import copier
+    throttle = copier.Throttle(1024 * 1024)
+    start = time.monotonic()
+    for _ in range(4):
+        throttle.consume(64 * 1024)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_materialize_keeps_protection(tmp_path, monkeypatch):
+    """Test replacing the hard links does not unprotect the previous publish."""
+    import shutil
+    from tik_manager4.core import copier
+    from tik_manager4.core.constants import MaterializationModes
+    if MaterializationModes.HARDLINK not in copier.get_capabilities(tmp_path):
+        pytest.skip("The file system does not support hard links.")
+
+    # windows does not remove the read-only files
+    def _is_protected(path):
+        return not os.lstat(path).st_mode & 0o200
+
+    unlink = Path.unlink
+    rmtree = shutil.rmtree
+
+    def _unlink(path, *args, **kwargs):
+        if _is_protected(path):
+            raise PermissionError(path)
+        return unlink(path, *args, **kwargs)
+
+    def _rmtree(path, *args, **kwargs):
+        for folder, _folders, files in os.walk(path):
+            if any(_is_protected(os.path.join(folder, name)) for name in files):
+                raise PermissionError(path)
+        return rmtree(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "unlink", _unlink)
+    monkeypatch.setattr(copier.shutil, "rmtree", _rmtree)
+
+    for name, is_folder in (("file", False), ("folder", True)):
+        publishes = []
+        for version in (1, 2):
+            publish = tmp_path / f"{name}_v{version:03d}"
+            if is_folder:
+                publish.mkdir()
+                (publish / "data.txt").write_text(f"version {version}")
+                protected = publish / "data.txt"
+            else:
+                publish.write_text(f"version {version}")
+                protected = publish
+            os.chmod(protected, 0o444)
+            publishes.append(protected)
+            target = tmp_path / "live" / name
+            used_mode = copier.materialize(
+                publish, target, mode=MaterializationModes.HARDLINK, restore=tmp_path
+            )
+            assert used_mode == MaterializationModes.HARDLINK
+        assert _is_protected(publishes[0])
+        assert _is_protected(publishes[1])
+
 def test_delete(tmp_path):
     """Test delete function."""
     file = tmp_path / "file.txt"
@@ -1,6 +1,9 @@
 # pylint: skip-file
 """Tests for Project related functions"""
+import os
+import threading
 import time
+import json
 from pathlib import Path
 import shutil
 from pprint import pprint
@@ -9,6 +12,7 @@ from tik_manager4.core.constants import ValidationResult, ValidationState # Make
 import pytest
 
 import tik_manager4
+from tik_manager4.core import copier
 from tik_manager4.core import settings
 from tik_manager4.core import utils
 
@@ -1398,3 +1402,881 @@ class TestProject:
         # check if the project is added to the templates
         assert "TestProject" in tik.user.commons.get_project_structures()
 
+
+    def test_project_index(self, project_manual_path, tik):
+        """Test the persistent project index."""
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        assert tik.project.index is None
+        assert tik.project.rebuild_index() == -1
+
+        tik.project.settings.edit_property("database_index", True)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+        assert tik.project.index
+        # the main task of the new project is indexed on the first run.
+        assert tik.project.index.find_tasks(name="main")
+
+        sub = tik.project.create_sub_project("indexed", mode="asset", parent_path="")
+        task = sub.add_task("indexed_task", categories=["Model", "Rig"])
+        work = task.categories["Model"].create_work("indexed_work")
+
+        entry = tik.project.index.get_by_id("task", task.id)
+        assert entry["name"] == "indexed_task"
+        assert entry["path"] == sub.path
+        assert tik.project.index.find_works(category="Model", dcc=work.dcc)[0]["id"] == work.id
+        assert tik.project.index.find_works(name="*indexed*")
+        assert tik.project.find_task_by_id(task.id).name == "indexed_task"
+        assert tik.project.verify_index() == []
+
+        # disagree with the index by touching a file behind its back.
+        time.sleep(0.01)
+        Path(task.settings_file).write_text(Path(task.settings_file).read_text())
+        mismatches = tik.project.verify_index(fix=True)
+        assert mismatches == [(f"{sub.path}/indexed_task.ttask", "stale")]
+        assert tik.project.verify_index() == []
+        assert tik.project.rebuild_index() == 3
+
+    def test_journaled_works(self, project_manual_path, tik):
+        """Test the works saved in the journaled layout."""
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        task = tik.project.add_task("journal_task", categories=["Model"])
+        work = task.categories["Model"].create_work("plain_work")
+        plain_file = Path(work.settings_file)
+        assert json.loads(plain_file.read_text())["name"] == work.name
+
+        tik.project.settings.edit_property("journaled_works", True)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+        task = tik.project.find_task_by_id(task.id)
+
+        # old layout is converted on the next save
+        work = list(task.categories["Model"].works.values())[0]
+        work.new_version(notes="converted")
+        lines = plain_file.read_text().splitlines()
+        assert lines[0].startswith('{"__journal__"')
+        assert len(lines) == 3
+
+        # new versions are appended without rewriting the file
+        before = plain_file.read_text()
+        work.new_version(notes="appended")
+        after = plain_file.read_text()
+        assert after.startswith(before)
+        assert len(after.splitlines()) == 4
+
+        # read back transparently
+        reloaded = tik_manager4.objects.work.Work(str(plain_file))
+        assert reloaded.version_count == 3
+        assert reloaded.get_version(3).notes == "appended"
+        assert reloaded.properties == work.properties
+
+        # edits are appended as records and compacted after the slack
+        work.journal_slack = 2
+        for number in range(3):
+            work.get_version(1).notes = f"edited {number}"
+            work.apply_settings()
+        assert len(plain_file.read_text().splitlines()) <= 4 + work.journal_slack
+        assert tik_manager4.objects.work.Work(str(plain_file)).get_version(1).notes == "edited 2"
+
+        # a failed write keeps the edit pending
+        def _fail_write(*args, **kwargs):
+            raise OSError("Lock timeout")
+
+        with patch.object(work._io, "append_journal", _fail_write), \
+                patch.object(work._io, "write_journal", _fail_write):
+            work.get_version(1).notes = "retried"
+            with pytest.raises(OSError):
+                work.apply_settings()
+        assert work.is_settings_changed()
+        assert work.apply_settings()
+        assert tik_manager4.objects.work.Work(str(plain_file)).get_version(1).notes == "retried"
+
+        # back to the plain layout when the setting is turned off
+        tik.project.settings.edit_property("journaled_works", False)
+        tik.project.settings.apply_settings()
+        work.apply_settings(force=True)
+        assert json.loads(plain_file.read_text())["versions"][2]["notes"] == "appended"
+
+    def test_database_watcher(self, project_manual_path, tik):
+        """Test reloading the objects changed on disk by the database watcher."""
+        from tik_manager4.core import watcher
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        task = tik.project.add_task("watched_task", categories=["Model"])
+        task.categories["Model"].create_work("first_work")
+        second_work = task.categories["Model"].create_work("second_work")
+        assert tik.project.watcher is None
+
+        def _edit_file(file_path, key, value):
+            data = tik_manager4.core.io.IO().read(str(file_path))
+            data[key] = value
+            tik_manager4.core.io.IO().write(data, str(file_path))
+
+        def _wait_for(paths):
+            changes = {}
+            for _ in range(250):
+                changes.update({change.path: change for change in tik.project.watcher.drain()})
+                if all(Path(path) in changes for path in paths):
+                    break
+                time.sleep(0.02)
+            return list(changes.values())
+
+        backends = [False, True] if watcher.is_inotify_available() else [False]
+        for use_inotify in backends:
+            tik.project.start_watcher(use_inotify=use_inotify, interval=0.05)
+            assert tik.project.watcher.backend == ("inotify" if use_inotify else "polling")
+            category = task.categories["Model"]
+            work = category.works[Path(category.get_abs_database_path("standalone", "watched_task_Model_first_work.twork"))]
+            time.sleep(0.05)
+
+            # only the changed objects are reloaded
+            _edit_file(work.settings_file, "creator", f"creator_{use_inotify}")
+            affected = tik.project.apply_database_changes(_wait_for([work.settings_file]))
+            assert len(affected) == 1 and affected[0] is work
+            assert work.creator == f"creator_{use_inotify}"
+
+            _edit_file(task.settings_file, "creator", f"creator_{use_inotify}")
+            affected = tik.project.apply_database_changes(_wait_for([task.settings_file]))
+            assert len(affected) == 1 and affected[0] is task
+            assert task.creator == f"creator_{use_inotify}"
+
+            # removed files are dropped from the cached containers
+            category = task.categories["Model"]
+            _ = category.works
+            if second_work.settings_file.exists():
+                second_work.settings_file.unlink()
+                affected = tik.project.apply_database_changes(_wait_for([second_work.settings_file]))
+                assert len(affected) == 1 and affected[0] is category
+                assert second_work.settings_file not in category.all_works
+            tik.project.stop_watcher()
+            assert tik.project.watcher is None
+
+    def test_category_scan_epochs(self, project_manual_path, tik):
+        """Test the works are scanned once per refresh epoch."""
+        from tik_manager4.objects.category import Category
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        task = tik.project.add_task("epoch_task", categories=["Model", "Rig"])
+        category = task.categories["Model"]
+        first_work = category.create_work("first_work")
+        Category.reset_scan_statistics()
+
+        assert not task.is_empty()
+        for _ in range(5):
+            assert len(category.works) == 1
+            assert not category.is_empty()
+        stats = Category.get_scan_statistics()
+        assert stats["scans"] == 1
+        assert stats["avoided"] >= 10
+
+        # works written in this session are cached without a rescan
+        second_work = category.create_work("second_work")
+        assert second_work.settings_file in category.works
+        assert Category.get_scan_statistics()["scans"] == 1
+
+        # changes behind the back are not seen until refreshed
+        first_work.settings_file.unlink()
+        assert first_work.settings_file in category.works
+        category.refresh()
+        assert first_work.settings_file not in category.works
+        second_work.settings_file.unlink()
+        category.invalidate()
+        assert category.is_empty()
+        assert Category.get_scan_statistics()["scans"] == 3
+
+        # a new epoch makes all the scans stale
+        task.categories["Rig"].create_work("rig_work")
+        tik.project.guard.new_refresh_epoch()
+        assert not task.is_empty()
+        assert Category.get_scan_statistics()["scans"] == 5
+
+    def test_lazy_publish(self, project_manual_path, tik):
+        """Test the publish objects are created only when accessed."""
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        task = tik.project.add_task("lazy_task", categories=["Model"])
+        work = task.categories["Model"].create_work("lazy_work")
+        work = task.categories["Model"].refresh()[work.settings_file]
+        assert work._publish is None
+        assert work.state == "active"
+        assert work._publish is None
+
+        # publish state is resolved without constructing the publish object
+        publish_folder = Path(work.get_abs_database_path("publish", work.name))
+        publish_folder.mkdir(parents=True)
+        tik_manager4.core.io.IO().write(
+            {"name": work.name, "version_number": 1, "elements": [], "deleted": False},
+            str(publish_folder / f"{work.name}_v001.tpub"),
+        )
+        work.reload()
+        assert work.state == "published"
+        assert work._publish is None
+        assert work.publish.get_last_version() == 0  # not scanned yet
+        assert len(work.publish.get_versions()) == 1
+        assert work.state == "published"
+
+    def test_deleted_publish_state(self, project_manual_path, tik):
+        """Test the soft deleted publishes do not mark the work as published."""
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        task = tik.project.add_task("deleted_task", categories=["Model"])
+        work = task.categories["Model"].create_work("deleted_work")
+        publish_folder = Path(work.get_abs_database_path("publish", work.name))
+        publish_folder.mkdir(parents=True)
+        tik_manager4.core.io.IO().write(
+            {"name": work.name, "version_number": 1, "elements": [], "deleted": True},
+            str(publish_folder / f"{work.name}_v001.tpub"),
+        )
+        work = task.categories["Model"].refresh()[work.settings_file]
+        assert work.state == "active"
+        assert work._publish is None
+        assert work.publish.versions == []
+        assert work.state == "active"
+
+    def test_discarded_publish_index(self, project_manual_path, tik):
+        """Test the discarded publishes are removed from the project index."""
+        project_path = self._new_empty_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        tik.project.settings.edit_property("database_index", True)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+        task = tik.project.add_task("discard_task", categories=["Model"])
+        work = task.categories["Model"].create_work("discard_work")
+
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        assert tik.project.index.find_publish_versions(name=work.name)
+        assert work.is_published()
+        publisher.discard()
+        assert not tik.project.index.find_publish_versions(name=work.name)
+        assert work.state == "active"
+
+        # the entries of the files deleted behind the index are not trusted
+        publish_file = Path(work.get_abs_database_path("publish", work.name, f"{work.name}_v001.tpub"))
+        tik.project.index.record(
+            str(publish_file),
+            {"name": work.name, "task_id": work.task_id, "path": Path(work.path, "publish").as_posix(),
+             "version_number": 1, "deleted": False},
+        )
+        assert tik.project.index.find_publish_versions(name=work.name)
+        work = task.categories["Model"].refresh()[work.settings_file]
+        assert work.state == "active"
+        assert work.publish.versions == []
+        tik.project.settings.edit_property("database_index", False)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+
+    def test_compact_structure(self, project_manual_path, tik):
+        """Test the structure is written compact and read back the same."""
+        project_path = self._new_asset_shot_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        structure_file = Path(tik.project.structure.settings_file)
+        assert "\n" in structure_file.read_text()
+        tree = tik.project.get_sub_tree()
+
+        tik.project.settings.edit_property("compact_structure", True)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+        assert tik.project.structure.compact
+        tik.project.create_sub_project("Compact", parent_path="Assets")
+        assert "\n" not in structure_file.read_text()
+        tree = tik.project.get_sub_tree()
+
+        tik.set_project(project_path)
+        assert tik.project.get_sub_tree() == tree
+        compact_sub = tik.project.find_sub_by_path("Assets/Compact")
+        assert compact_sub.metadata.get_value("fps") == 30
+
+    def test_journaled_structure(self, project_manual_path, tik, monkeypatch):
+        """Test the subproject changes are appended to the structure file."""
+        project_path = self._new_asset_shot_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        tik.project.settings.edit_property("journaled_structure", True)
+        tik.project.settings.apply_settings()
+        tik.set_project(project_path)
+        structure_file = Path(tik.project.structure.settings_file)
+
+        # the first change converts the file to the journaled layout
+        tik.project.create_sub_project("Journal", parent_path="Assets")
+        assert len(structure_file.read_text().splitlines()) == 1
+
+        # only the folders of the new subproject should be created
+        created_folders = []
+        monkeypatch.setattr(
+            Path, "mkdir", lambda path, *args, **kwargs: created_folders.append(path)
+        )
+        tik.project.create_sub_project("Entry", parent_path="Assets/Journal")
+        monkeypatch.undo()
+        assert len(created_folders) == 2
+        assert all(path.name == "Entry" for path in created_folders)
+        tik.project.create_sub_project("Other", parent_path="Assets/Journal")
+        tik.project.edit_sub_project(path="Assets/Journal/Entry", name="Renamed", fps=25)
+        tik.project.delete_sub_project(path="Assets/Journal/Other")
+        assert len(structure_file.read_text().splitlines()) == 5
+        tree = tik.project.get_sub_tree()
+
+        tik.set_project(project_path)
+        assert tik.project.get_sub_tree() == tree
+        renamed = tik.project.find_sub_by_path("Assets/Journal/Entry")
+        assert renamed.name == "Renamed"
+        assert renamed.metadata.get_value("fps") == 25
+        assert tik.project.find_sub_by_path("Assets/Journal/Other").deleted
+
+        # a change written partially must not swallow the next one
+        with open(structure_file, "a") as _file:
+            _file.write('{"op": "add", "item": {"par')
+        tik.project.create_sub_project("AfterTorn", parent_path="Assets/Journal")
+        tik.set_project(project_path)
+        assert tik.project.find_sub_by_path("Assets/Journal/AfterTorn").name == "AfterTorn"
+
+        # too many changes compact the file
+        monkeypatch.setattr(tik.project, "structure_slack", 4)
+        tik.project.create_sub_project("Compacted", parent_path="Assets/Journal")
+        assert len(structure_file.read_text().splitlines()) == 1
+        tree = tik.project.get_sub_tree()
+        tik.set_project(project_path)
+        assert tik.project.get_sub_tree() == tree
+
+    def test_batch(self, project_manual_path, tik, monkeypatch):
+        """Test the batch defers the writes until the end."""
+        project_path = self._new_asset_shot_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        structure_file = Path(tik.project.structure.settings_file)
+        structure_mtime = structure_file.stat().st_mtime_ns
+
+        with tik.project.batch(max_workers=4) as batch:
+            sequence = tik.project.create_sub_project("SEQ_BATCH", parent_path="Shots")
+            shots = [
+                sequence.add_task(f"SH{number:03d}", categories=["Animation"])
+                for number in range(10, 60, 10)
+            ]
+            duplicate = sequence.add_task("SH010", categories=["Animation"])
+            # nothing is written yet
+            assert structure_file.stat().st_mtime_ns == structure_mtime
+            assert not Path(tik.project.absolute_path, sequence.path).exists()
+            assert not Path(shots[0].settings_file).exists()
+            # pending tasks survive a rescan
+            assert len(sequence.scan_tasks()) == 5
+
+        assert duplicate == -1
+        assert len(batch.results) == 7
+        assert [result.name for result in batch.failed] == ["SH010"]
+        assert batch.results[0].value is sequence
+        assert Path(tik.project.absolute_path, sequence.path).is_dir()
+        assert all(Path(shot.settings_file).exists() for shot in shots)
+
+        tik.set_project(project_path)
+        sequence = tik.project.find_sub_by_path("Shots/SEQ_BATCH")
+        assert sorted(sequence.scan_tasks()) == ["SH010", "SH020", "SH030", "SH040", "SH050"]
+
+        # failed task writes are reported
+        def _fail(*args, **kwargs):
+            raise OSError("disk is full")
+        with tik.project.batch() as batch:
+            task = sequence.add_task("SH060", categories=["Animation"])
+            monkeypatch.setattr(task._io, "write", _fail)
+        assert batch.failed[0].value == "disk is full"
+
+    def test_scene_lookup(self, project_manual_path, tik, monkeypatch):
+        """Test the scene files are resolved without scanning the works."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        work.new_version()
+        first_path = work.get_abs_project_path(work.versions[0].scene_path)
+        second_path = work.get_abs_project_path(work.versions[1].scene_path)
+
+        # new versions are registered. The work folders should not be scanned.
+        def _no_glob(*args, **kwargs):
+            raise AssertionError("work files should not be scanned.")
+        monkeypatch.setattr(Path, "glob", _no_glob)
+        found_work, version_number = tik.project.find_work_by_absolute_path(second_path)
+        assert found_work.id == work.id
+        assert found_work.parent_task is task
+        assert version_number == 2
+        monkeypatch.undo()
+
+        # deleted versions are removed from the lookup
+        work.delete_version(1)
+        assert tik.project.find_work_by_absolute_path(first_path) == (None, None)
+
+        # unknown scenes are registered after the first scan
+        tik.set_project(tik.project.absolute_path)
+        assert tik.project.find_work_by_absolute_path(second_path)[1] == 2
+        monkeypatch.setattr(Path, "glob", _no_glob)
+        assert tik.project.find_work_by_absolute_path(second_path)[1] == 2
+
+    def test_parallel_extract(self, project_manual_path, tik, monkeypatch):
+        """Test the thread safe extracts run concurrently in dependency order."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        snapshot_extract = publisher.extractors["snapshot"]
+        assert snapshot_extract.thread_safe
+        assert snapshot_extract.state == "success"
+        published = publisher.publish(notes="parallel extract")
+        assert published.get_property("extract_times") == {
+            "snapshot": round(snapshot_extract.wall_time, 3)
+        }
+
+        # order of the extracts with fake extractors
+        class _FakeExtract:
+            def __init__(self, thread_safe=True, dependencies=()):
+                self.thread_safe = thread_safe
+                self.dependencies = dependencies
+
+        events = []
+        lock = threading.Lock()
+        both_started = threading.Barrier(2, timeout=5)
+
+        def _extract_single(extract_object):
+            name = extract_object.name
+            with lock:
+                events.append(f"{name}_start")
+            if name in ("usd", "alembic"):
+                # both should be running at the same time
+                both_started.wait()
+            with lock:
+                events.append(f"{name}_end")
+
+        extractors = {
+            "usd": _FakeExtract(),
+            "alembic": _FakeExtract(),
+            "scene": _FakeExtract(thread_safe=False, dependencies=("usd", "alembic")),
+            "bundle": _FakeExtract(dependencies=("scene", "not_resolved")),
+        }
+        for name, extract_object in extractors.items():
+            extract_object.name = name
+        monkeypatch.setattr(publisher, "_resolved_extractors", extractors)
+        monkeypatch.setattr(publisher, "extract_single", _extract_single)
+        publisher.extract()
+        assert events.index("scene_start") > events.index("usd_end")
+        assert events.index("scene_start") > events.index("alembic_end")
+        assert events.index("bundle_start") > events.index("scene_end")
+        assert len(events) == 8
+        # the elements keep the category order
+        assert list(publisher.extractors) == ["usd", "alembic", "scene", "bundle"]
+
+    def test_concurrent_validation(self, project_manual_path, tik):
+        """Test the validators share the collected data and run concurrently."""
+        from tik_manager4.dcc.validate_core import ValidateCore
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        collect_calls = []
+        both_validating = threading.Barrier(2, timeout=5)
+
+        def _collect_meshes():
+            collect_calls.append(threading.current_thread())
+            return ["mesh_a", "mesh_b"]
+
+        class _MeshValidator(ValidateCore):
+            thread_safe = True
+
+            def collect(self):
+                self.collection = self.get_cached("meshes", _collect_meshes)
+
+            def validate(self):
+                self.collect()
+                both_validating.wait()
+                if len(self.collection) == 2:
+                    self.passed()
+                else:
+                    self.failed()
+
+        class _SerialValidator(ValidateCore):
+            def validate(self):
+                self.collection = self.get_cached("meshes", _collect_meshes)
+                self.failed("not thread safe")
+
+        validators = {
+            "first": _MeshValidator(),
+            "second": _MeshValidator(),
+            "serial": _SerialValidator(),
+        }
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher._resolved_validators = validators
+        reported = []
+        publisher.validate(
+            callback=lambda val: reported.append((val, val.state, threading.current_thread()))
+        )
+        # collected once, in the calling thread
+        assert collect_calls == [threading.current_thread()]
+        # each finished validator is reported once, in the calling thread
+        assert sorted(id(val) for val, _state, _thread in reported) == sorted(
+            id(val) for val in validators.values()
+        )
+        assert all(state != "idle" for _val, state, _thread in reported)
+        assert all(thread is threading.current_thread() for _val, _state, thread in reported)
+        assert [val.state for val in validators.values()] == ["passed", "passed", "failed"]
+        assert all(val.scene_cache is None for val in validators.values())
+        # outside of a run, the data is collected again
+        validators["serial"].validate()
+        assert len(collect_calls) == 2
+
+        publisher.reserve()
+        publisher.extract()
+        published = publisher.publish(notes="validated")
+        validations = published.get_property("validations")
+        assert validations["serial"]["state"] == "failed"
+        assert validations["first"]["time"] == round(validators["first"].wall_time, 3)
+
+    def test_branch_materialization(self, project_manual_path, tik):
+        """Test the LIVE and PROMOTED elements are linked instead of copied."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.edit_property("branch_materialization", "Hard Link")
+        tik.project.settings.apply_settings()
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        published = publisher.publish(notes="linked branches")
+
+        publish_path = Path(published.get_element_path("snapshot", relative=False))
+        live_data = published._live_object.get_data()
+        assert live_data["materialization"] == "Hard Link"
+        live_element = live_data["elements"][0]
+        live_path = Path(tik.project.absolute_path, live_data["path"], live_element["path"])
+        assert live_path.read_bytes() == publish_path.read_bytes()
+        if live_element["materialization"] == "Hard Link":
+            assert os.path.samefile(live_path, publish_path)
+        else:
+            # the file system cannot link. The element must be copied.
+            assert live_element["materialization"] == "Copy"
+
+        tik.project.settings.edit_property("branch_materialization", "Symbolic Link")
+        tik.project.settings.apply_settings()
+        assert published.promote().state == ValidationState.SUCCESS
+        promoted_data = published._promoted_object.get_data()
+        promoted_element = promoted_data["elements"][0]
+        promoted_path = Path(
+            tik.project.absolute_path, promoted_data["path"], promoted_element["path"]
+        )
+        assert promoted_path.read_bytes() == publish_path.read_bytes()
+        if promoted_element["materialization"] == "Symbolic Link":
+            assert promoted_path.is_symlink()
+            assert not Path(os.readlink(promoted_path)).is_absolute()
+
+        tik.project.settings.edit_property("branch_materialization", "Copy")
+        tik.project.settings.apply_settings()
+
+    def test_delta_publish(self, project_manual_path, tik, tmp_path, monkeypatch):
+        """Test the unchanged files of a bundle are reused from the previous version."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        source = tmp_path / "bundle_source"
+        (source / "nested").mkdir(parents=True)
+        (source / "unchanged.txt").write_text("same")
+        (source / "changed.txt").write_text("first")
+        (source / "nested" / "deep.txt").write_text("deep")
+
+        def _publish(compare_hash=False):
+            publisher = tik.project.snapshot_publisher
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.source_path = source.as_posix()
+            publisher.resolve()
+            publisher.extractors["snapshot"].global_settings.edit_property("compare_hash", compare_hash)
+            publisher.reserve()
+            publisher.extract()
+            extractor = publisher.extractors["snapshot"]
+            published = publisher.publish(notes="delta")
+            publisher.source_path = None
+            return extractor, Path(published.get_element_path("snapshot_bundle", relative=False))
+
+        first_extract, first_bundle = _publish()
+        assert first_extract.reused_files is None
+        (source / "changed.txt").write_text("second")
+        hashed = []
+        file_hash = copier.file_hash
+        monkeypatch.setattr(
+            copier, "file_hash", lambda path, *args: hashed.append(Path(path).name) or file_hash(path, *args)
+        )
+        second_extract, second_bundle = _publish()
+        monkeypatch.undo()
+        # the changed files are hashed while copying and the hashes of the
+        # reused files are taken from the previous version
+        assert hashed == []
+        assert second_bundle != first_bundle
+        assert second_extract.reused_files == ["nested/deep.txt", "unchanged.txt"]
+        assert (second_bundle / "changed.txt").read_text() == "second"
+        assert (second_bundle / "unchanged.txt").read_text() == "same"
+        assert (second_bundle / "nested" / "deep.txt").read_text() == "deep"
+        bundle_info = second_extract.bundle_info
+        assert bundle_info["unchanged"]["reused"] == ["unchanged.txt"]
+        assert bundle_info["changed"]["reused"] == []
+        # the previous version is not touched
+        assert (first_bundle / "changed.txt").read_text() == "first"
+
+        # written again with the same content. The contents are compared with
+        # the hashes in the manifest of the previous version.
+        (source / "changed.txt").write_text("second")
+        os.utime(source / "changed.txt", (0, 0))
+        hashed = []
+        monkeypatch.setattr(
+            copier, "file_hash", lambda path, *args: hashed.append(Path(path)) or file_hash(path, *args)
+        )
+        third_extract, third_bundle = _publish(compare_hash=True)
+        monkeypatch.undo()
+        assert third_extract.reused_files == ["changed.txt", "nested/deep.txt", "unchanged.txt"]
+        assert not [path for path in hashed if second_bundle in path.parents]
+
+    def test_publish_manifest(self, project_manual_path, tik, monkeypatch):
+        """Test the publishes are verified with their content manifests."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        # the snapshot is hashed while copying. It is not read again.
+        hashed = []
+        monkeypatch.setattr(copier, "file_hash", lambda path, *args: hashed.append(path))
+        publisher.extract()
+        published = publisher.publish(notes="manifest")
+        monkeypatch.undo()
+        assert not hashed
+
+        element_path = published.get_element_path("snapshot")
+        entries = published.get_manifest()
+        assert list(entries) == [element_path]
+        publish_file = Path(published.get_element_path("snapshot", relative=False))
+        assert entries[element_path].size == publish_file.stat().st_size
+        assert entries[element_path].hash == copier.file_hash(publish_file)
+        assert Path(published.settings_file).with_suffix(".tmanifest").exists()
+        assert published.verify() == (True, [])
+        assert published.verify(deep=True, element_type="snapshot") == (True, [])
+
+        # the LIVE element is up to date. It should not be copied again.
+        copies = []
+        monkeypatch.setattr(utils, "copy", lambda *args, **kwargs: copies.append(args))
+        published.make_live()
+        monkeypatch.undo()
+        assert not copies
+
+        # same size and modified time but different content
+        stat = publish_file.stat()
+        utils.write_unprotect(publish_file)
+        publish_file.write_bytes(bytes(stat.st_size))
+        os.utime(publish_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert published.verify()[0]
+        state, problems = published.verify(deep=True)
+        assert not state
+        assert problems == [f"Modified: {publish_file.as_posix()}"]
+        publish_file.unlink()
+        assert published.verify() == (False, [f"Missing: {publish_file.as_posix()}"])
+
+    def test_sync_queue(self, project_manual_path, tik, tmp_path, monkeypatch):
+        """Test the localized publishes are synced in the background."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        from tik_manager4.objects import sync_queue
+        from tik_manager4.objects.version import PublishVersion
+        localize_settings = {
+            "enabled": True,
+            "local_cache_folder": str(tmp_path / "cache"),
+            "cache_publishes": True,
+        }
+        monkeypatch.setattr(tik.project.guard, "localize_settings", localize_settings)
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        published = publisher.publish(notes="localized")
+        assert published.localized
+        origin = Path(published.get_abs_project_path(published.get_element_path("snapshot")))
+        assert not origin.exists()
+
+        # stopped queues keep the jobs for the next start
+        queue = sync_queue.SyncQueue(tmp_path / "queue")
+        queue.stop()
+        job = queue.submit(published)
+        queue.wait()
+        assert queue.jobs == [job]
+        assert queue.submit(published) == job
+        assert job.name == "test_task_Model_test_work_v001"
+
+        # the failed attempts are retried
+        original_sync = PublishVersion.sync
+        calls = []
+
+        def _flaky_sync(version, **kwargs):
+            calls.append(version.version)
+            if len(calls) < 2:
+                return False, "Network error"
+            return original_sync(version, **kwargs)
+
+        monkeypatch.setattr(PublishVersion, "sync", _flaky_sync)
+        statuses = []
+        queue = sync_queue.SyncQueue(tmp_path / "queue", bandwidth_limit=1024 * 1024 * 1024)
+        queue.retry_delay = 0
+        queue.add_callback(statuses.append)
+        assert [queued.state for queued in queue.jobs] == [sync_queue.PENDING]
+        queue.start(project_manual_path)
+        queue.wait(timeout=60)
+        assert calls == [1, 1]
+        assert not queue.jobs
+        assert statuses[-1].job.state == sync_queue.DONE
+        assert origin.exists()
+        assert not PublishVersion(published.settings_file).localized
+        assert json.loads((tmp_path / "queue" / "sync_queue.json").read_text()) == []
+
+    def test_sync_queue_keeps_new_versions(self, project_manual_path, tik, tmp_path, monkeypatch):
+        """Test the versions saved while a work version is synced are kept."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        from tik_manager4.objects import sync_queue
+        from tik_manager4.objects.version import WorkVersion
+        from tik_manager4.objects.work import Work
+        localize_settings = {
+            "enabled": True,
+            "local_cache_folder": str(tmp_path / "cache"),
+            "cache_works": True,
+        }
+        monkeypatch.setattr(tik.project.guard, "localize_settings", localize_settings)
+        localized = work.new_version(notes="localized")
+        assert localized.localized
+
+        # the artist saves a new version during the transfer
+        original_sync = WorkVersion.sync
+
+        def _sync_while_saving(version, **kwargs):
+            work.new_version(notes="saved during the sync")
+            return original_sync(version, **kwargs)
+
+        monkeypatch.setattr(WorkVersion, "sync", _sync_while_saving)
+        queue = sync_queue.SyncQueue(tmp_path / "queue")
+        queue.submit(localized)
+        queue.start(project_manual_path)
+        queue.wait(timeout=60)
+        assert not queue.jobs
+
+        written = Work(work.settings_file)
+        assert [version.notes for version in written.versions][-2:] == [
+            "localized", "saved during the sync"
+        ]
+        assert not written.get_version(localized.version).localized
+        assert written.get_version(localized.version).localized_path == ""
+
+    def test_read_cache(self, project_manual_path, tik, tmp_path, monkeypatch):
+        """Test the published elements are read from the local cache."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        published = publisher.publish(notes="cached")
+        published.make_live()
+        origin = published.get_element_path("snapshot", relative=False)
+
+        localize_settings = {
+            "local_cache_folder": str(tmp_path / "cache"),
+            "read_cache": True,
+        }
+        monkeypatch.setattr(tik.project.guard, "localize_settings", localize_settings)
+        tik.project._set_read_cache()
+        cache = tik.project.read_cache
+        assert cache.size_limit == 20 * 1024 ** 3
+
+        # the LIVE elements of the subproject are prefetched
+        cached_paths = tik.project.prefetch([task]).result(timeout=60)
+        assert len(cached_paths) == 1
+        assert Path(cached_paths[0]).name.startswith("SNAPSHOT_")
+        assert Path(cached_paths[0]).is_relative_to(cache.root)
+
+        # read through. The first read is from the origin.
+        assert published.get_element_path("snapshot", relative=False) == origin
+        cache.stop()
+        cached = published.get_element_path("snapshot", relative=False)
+        assert cached != origin
+        assert Path(cached).read_bytes() == Path(origin).read_bytes()
+        assert published.get_element_path("snapshot", relative=False, cached=False) == origin
+
+        # touched files are still valid with the same content hash
+        os.utime(origin, (0, 0))
+        assert published.get_element_path("snapshot", relative=False) == cached
+        utils.write_unprotect(origin)
+        Path(origin).write_text("changed")
+        assert published.get_element_path("snapshot", relative=False) == origin
+        # the changed element is fetched again in the background
+        cache.stop()
+        assert Path(published.get_element_path("snapshot", relative=False)).read_text() == "changed"
+
+        # least recently used items are evicted
+        assert len(cache._load()) == 2
+        cache.size_limit = cache.size + 1
+        extra = tmp_path / "extra.txt"
+        extra.write_text("ab")
+        cache.fetch(extra)
+        assert cache.get_cached_path(extra)
+        assert [item.source for item in cache._items.values()] == [origin, extra.as_posix()]
+
+        monkeypatch.setattr(tik.project.guard, "localize_settings", {})
+        tik.project._set_read_cache()
+        assert tik.project.read_cache is None
+
+    def test_lookups_without_traversal(self, project_manual_path, tik, monkeypatch):
+        """Test the id and path lookups are answered from the project maps."""
+        project_path = self._new_asset_shot_project(project_manual_path, tik)
+        tik.set_project(project_path)
+        soldier = tik.project.create_sub_project("Soldier", parent_path="Assets/Characters")
+        task = soldier.add_task("lookup_task", categories=["Model"])
+        nested = soldier.add_sub_project("nested")
+        assert nested.parent is soldier
+        nested_task = nested.add_task("nested_task", categories=["Model"])
+
+        # none of the lookups below should need to scan the disk.
+        def _no_scan(*args, **kwargs):
+            raise AssertionError("scan_tasks should not be called.")
+        monkeypatch.setattr(tik_manager4.objects.subproject.Subproject, "scan_tasks", _no_scan)
+
+        assert tik.project.find_sub_by_id(soldier.id) is soldier
+        assert tik.project.find_sub_by_path(nested.path) is nested
+        assert tik.project.find_task_by_id(task.id) is task
+        assert tik.project.find_task_by_id(nested_task.id) is nested_task
+        # lookups are limited to the hierarchy of the caller
+        assert tik.project.subs["Shots"].find_sub_by_id(soldier.id) == -1
+        assert soldier.find_sub_by_path(nested.path) is nested
+        monkeypatch.undo()
+        assert nested.find_task_by_id(task.id) == -1
+
+        # maps are kept up to date with the structure edits
+        tik.project.edit_sub_project(uid=soldier.id, name="Soldier", mode="asset")
+        new_nested = tik.project.find_sub_by_path(nested.path)
+        assert new_nested is not nested
+        assert new_nested.id == nested.id
+        assert tik.project.find_sub_by_id(nested.id) is new_nested
+        assert tik.project.find_task_by_id(nested_task.id).name == "nested_task"
+
+        # deleted tasks are not returned unless asked explicitly
+        assert nested_task.destroy() == 1
+        assert tik.project.find_task_by_id(nested_task.id) == -1
+        assert tik.project.find_task_by_id(nested_task.id, query_all=True).id == nested_task.id
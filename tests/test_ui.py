@@ -1,4 +1,5 @@
 """Tests for the UI elements."""
+import gc
 import os
 import pytest
 
@@ -34,6 +35,9 @@ class TestUI:
             files.force_remove_directory(project_path)
         tik.user.set("Admin", "1234")
         tik.create_project(str(project_path), structure_template="empty")
+        # collect the leftovers of the previous tests before any widget is
+        # created. Otherwise they may be collected while the UI is painting.
+        gc.collect()
         return tik
 
     def _kill_modules(self):
@@ -154,11 +158,37 @@ class TestUI:
         work = main_object.project.tasks["main"].categories["Model"].create_work("test_work")
         monkeypatch.setattr(main_object.project, "get_current_work", lambda: (work, 1))
         main_object.project.publisher.resolve()
+        from tik_manager4.dcc.validate_core import ValidateCore
+
+        class _Validator(ValidateCore):
+            nice_name = "Test Validator"
+
+            def validate(self):
+                self.passed()
+
+        publisher = main_object.project.publisher
+        original_resolve = publisher.resolve
+
+        def _resolve():
+            resolved = original_resolve()
+            publisher._resolved_validators["test"] = _Validator()
+            return resolved
+
+        monkeypatch.setattr(publisher, "resolve", _resolve)
         dialog = PublishSceneDialog(main_object.project)
         qtbot.addWidget(dialog)
         style_file = pick.style_file()
         dialog.setStyleSheet(str(style_file.readAll(), "utf-8"))
         dialog.show()
+        states = []
+        widget = dialog._validator_widgets[0]
+        original_update = widget.update_state
+        monkeypatch.setattr(
+            widget, "update_state", lambda: states.append(widget.validator.state) or original_update()
+        )
+        dialog.validate_all()
+        # once as soon as it finishes and once after the run
+        assert states == ["passed", "passed"]
         # qtbot.stop()
 
     def test_settings_dialog(self, qtbot, main_object):
@@ -217,6 +247,63 @@ class TestUI:
         assert utils.apply_stylesheet(str(tmp_path / "test_stylesheet.NA"), _widget) == False
 
 
+    def test_category_refresh(self, qtbot, main_object):
+        """Test the category widget reads the works created by the others."""
+        import shutil
+        from tik_manager4.ui.mcv.category_mcv import TikCategoryWidget
+        main_object.set_project(main_object.project.absolute_path)
+        task = main_object.project.add_task("refresh_task", categories=["Model"])
+        work = task.categories["Model"].create_work("first_work")
+        widget = TikCategoryWidget()
+        qtbot.addWidget(widget)
+        widget.set_task(task)
+        assert widget.work_tree_view.model.rowCount() == 1
+
+        # written by another session
+        other_file = Path(work.settings_file).with_name("other_work.twork")
+        shutil.copy(work.settings_file, other_file)
+        widget.refresh_btn.click()
+        assert widget.work_tree_view.model.rowCount() == 2
+
+    def test_thumbnail_service(self, qtbot, tmp_path):
+        """Test the thumbnails are decoded in the background and cached."""
+        from tik_manager4.ui import thumbnails
+        from tik_manager4.ui.Qt import QtGui
+        from tik_manager4.ui.widgets.info import ImageWidget
+        image_path = str(tmp_path / "thumbnail.png")
+        image = QtGui.QImage(2000, 1000, QtGui.QImage.Format_RGB32)
+        image.fill(0)
+        assert image.save(image_path)
+
+        service = thumbnails.ThumbnailService(workers=1)
+        service.set_disk_folder(tmp_path / "disk")
+        with qtbot.waitSignal(service.thumbnail_ready, timeout=5000) as blocker:
+            assert service.request(image_path) is None
+        path, decoded = blocker.args
+        assert path == image_path
+        assert (decoded.width(), decoded.height()) == (960, 480)
+        assert len(list((tmp_path / "disk").rglob("*.jpg"))) == 1
+
+        # cached in the memory and confirmed in the background
+        with qtbot.waitSignal(service.thumbnail_ready, timeout=5000) as blocker:
+            assert service.request(image_path) is decoded
+        assert blocker.args[1] is decoded
+
+        # missing files show the empty thumbnail
+        with qtbot.waitSignal(service.thumbnail_ready, timeout=5000) as blocker:
+            service.request(str(tmp_path / "missing.png"))
+        assert blocker.args[1] is None
+
+        widget = ImageWidget()
+        qtbot.addWidget(widget)
+        widget.thumbnail_service = service
+        service.thumbnail_ready.connect(widget._on_thumbnail_ready)
+        widget.set_media(image_path)
+        assert widget._media_data is decoded
+        widget.clear()
+        assert widget._media_data is None
+
+
 class TestPySide6Compatibility:
     """Tests for PySide6.8.3 compatibility improvements.
 
@@ -379,3 +379,38 @@ def test_metadata_overrides():
     # override it
     metadata.override({"key1": "new_value1"})
     assert metadata.is_overridden("key1") == True
+
+def test_metadata_chain():
+    from tik_manager4.objects.metadata import Metadata
+    root = Metadata({"fps": 25, "mode": "global"})
+    child = Metadata(parent=root)
+    child.override({"mode": "asset"})
+    grand_child = Metadata(parent=child)
+
+    # only the own items are stored, the rest is resolved from the parents
+    assert child.get_overrides() == {"mode": "asset"}
+    assert grand_child.get_overrides() == {}
+    assert grand_child.get_value("fps") == 25
+    assert grand_child.get_value("mode") == "asset"
+    assert grand_child.is_overridden("mode") == False
+    assert child.is_overridden("mode") == True
+    assert set(grand_child.keys()) == {"fps", "mode"}
+
+    # changes of the ancestors are reflected to the cached views
+    root.add_item("fps", 30)
+    child.override({"resolution": [1920, 1080]})
+    assert grand_child.get_value("fps") == 30
+    assert grand_child.exists("resolution")
+    assert dict(grand_child.get_all_items()) == {
+        "fps": 30, "mode": "asset", "resolution": [1920, 1080]}
+
+    # re-parenting
+    grand_child.parent = root
+    assert grand_child.get_value("mode") == "global"
+    assert grand_child.exists("resolution") == False
+
+    # copy is detached from the chain
+    copied = child.copy()
+    root.add_item("fps", 50)
+    assert copied.get_value("fps") == 30
+    assert copied.is_overridden("mode") == False
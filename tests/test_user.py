@@ -380,3 +380,14 @@ def test_adding_recent_projects(tik):
     for x in range(11):
         tik.user.add_recent_project(f"/path/to/project{x}")
     assert len(tik.user.get_recent_projects()) == 10
+
+def test_parse_cache_size(tik):
+    """Test the parse cache size is applied to the database reads."""
+    from tik_manager4.core.io import IO
+    assert tik.user.settings.get_property("parse_cache_size") == 64
+    tik.user.settings.edit_property("parse_cache_size", 8)
+    tik.user.settings.apply_settings()
+    assert IO.get_cache_statistics()["max_size"] == 8 * 1024 * 1024
+    tik.user.settings.edit_property("parse_cache_size", 64)
+    tik.user.settings.apply_settings()
+    assert IO.get_cache_statistics()["max_size"] == 64 * 1024 * 1024
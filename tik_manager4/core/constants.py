@@ -83,3 +83,10 @@ class BranchingModes(Enum):
     """Enumeration of branching modes."""
     ACTIVE = "Active Branches"
     PASSIVE = "Passive Branches"
+
+class MaterializationModes(Enum):
+    """Enumeration of the ways to place the elements into the active branches."""
+    COPY = "Copy"
+    HARDLINK = "Hard Link"
+    REFLINK = "Reflink"
+    SYMLINK = "Symbolic Link"
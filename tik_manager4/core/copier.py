@@ -0,0 +1,759 @@
+"""High throughput copy engine for the publish files and folders.
+
+The files are copied by a pool of worker threads. On Linux, the files are
+cloned (reflink) or copied inside the kernel with copy_file_range when the
+file system supports it. Otherwise they are copied with large buffers.
+
+Each file is written to a partial file next to the target and renamed when
+complete. An interrupted copy continues from the partial file next time
+instead of starting over.
+
+The elements of the active branches (LIVE and PROMOTED) can also be placed
+as hard links, reflinks or symbolic links with materialize(). The supported
+ones are detected for each file system and copying is the fallback.
+
+Can be used from the command line as well:
+    python -m tik_manager4.core.copier <source> <target> --workers 8
+"""
+
+import argparse
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core.constants import MaterializationModes
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# core.utils depends on this module. filelog cannot be used here.
+LOG = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+PARTIAL_SUFFIX = ".tik_partial"
+STAGING_SUFFIX = ".tik_staging"
+
+# FICLONE ioctl request from <linux/fs.h>
+_FICLONE = 0x40049409
+# copy_file_range errors meaning the file system cannot do it.
+_UNSUPPORTED_ERRORS = (
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF
+)
+
+
+def format_size(size):
+    """Return the human readable size. e.g. 12.5 MB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+class CopyProgress(NamedTuple):
+    """Progress of a copy operation."""
+
+    copied_bytes: int
+    total_bytes: int
+    copied_files: int
+    total_files: int
+    elapsed: float
+
+    @property
+    def percent(self):
+        """Copied percentage of the total size."""
+        if not self.total_bytes:
+            return 100.0
+        return 100.0 * self.copied_bytes / self.total_bytes
+
+    @property
+    def throughput(self):
+        """Average bytes per second since the start of the copy."""
+        return self.copied_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"{format_size(self.copied_bytes)} / {format_size(self.total_bytes)} "
+            f"({self.percent:.1f}%) - {self.copied_files}/{self.total_files} files "
+            f"- {format_size(self.throughput)}/s"
+        )
+
+
+class Throttle:
+    """Limit the total throughput of the copies sharing it."""
+
+    def __init__(self, bytes_per_second):
+        """Initialize the throttle.
+
+        Args:
+            bytes_per_second (float): The maximum average throughput.
+        """
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def consume(self, size):
+        """Wait until the transferred size fits into the rate.
+
+        Args:
+            size (int): Number of bytes just transferred.
+        """
+        with self._lock:
+            now = time.monotonic()
+            # the idle time is not saved up for bursts
+            self._next_time = max(self._next_time, now) + size / self.rate
+            delay = self._next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CopyEngine:
+    """Copy files and folders with a pool of workers."""
+
+    workers = 4
+    # minimum seconds between two progress callbacks
+    progress_interval = 0.5
+
+    def __init__(self, workers=None, chunk_size=CHUNK_SIZE, resume=True,
+                 progress_callback=None, progress_interval=None, throttle=None,
+                 hash_files=False):
+        """Initialize the engine.
+
+        Args:
+            workers (int, optional): Number of files copied at the same time.
+            chunk_size (int): Bytes copied at once.
+            resume (bool): Continue the interrupted copies from the partial
+                files.
+            progress_callback (callable, optional): Function accepting a
+                CopyProgress object. It can be called from the worker
+                threads. Raising an exception from it cancels the copy.
+            progress_interval (float, optional): Minimum seconds between
+                two progress callbacks.
+            throttle (Throttle, optional): Limits the throughput. Can be
+                shared between the engines.
+            hash_files (bool): Hash the files while copying them. The
+                digests are stored in the hashes attribute. The files are
+                copied through the memory to read them only once.
+        """
+        self.workers = workers or self.workers
+        self.throttle = throttle
+        if throttle:
+            # smaller chunks keep the transfer and the progress smooth
+            chunk_size = min(chunk_size, max(64 * 1024, int(throttle.rate / 4)))
+        self.chunk_size = chunk_size
+        self.resume = resume
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval or self.progress_interval
+        self.hash_files = hash_files
+        # target posix path => BLAKE2b hex digest of the copied files
+        self.hashes = {}
+        # number of files copied with each method
+        self.statistics = {"reflink": 0, "copy_file_range": 0, "buffered": 0, "resumed": 0}
+        self._lock = threading.Lock()
+        self._buffers = threading.local()
+        self._reset(0, 0)
+
+    def _reset(self, total_bytes, total_files):
+        """Reset the counters for a new copy."""
+        self._total_bytes = total_bytes
+        self._total_files = total_files
+        self._copied_bytes = 0
+        self._copied_files = 0
+        self._start_time = time.monotonic()
+        self._last_report = 0.0
+
+    @property
+    def progress(self):
+        """The current progress of the copy."""
+        with self._lock:
+            return self._get_progress()
+
+    def _get_progress(self):
+        return CopyProgress(
+            self._copied_bytes,
+            self._total_bytes,
+            self._copied_files,
+            self._total_files,
+            time.monotonic() - self._start_time,
+        )
+
+    def _advance(self, copied_bytes=0, copied_files=0, force=False):
+        """Update the counters and call the progress callback if it is time."""
+        with self._lock:
+            self._copied_bytes += copied_bytes
+            self._copied_files += copied_files
+            if not self.progress_callback:
+                return
+            now = time.monotonic()
+            if not force and now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+            progress = self._get_progress()
+        self.progress_callback(progress)
+
+    def _transferred(self, size):
+        """Report the copied bytes and slow down if throttled."""
+        self._advance(size)
+        if self.throttle:
+            self.throttle.consume(size)
+
+    def _count(self, method):
+        with self._lock:
+            self.statistics[method] += 1
+
+    def copy(self, source, target):
+        """Copy the file or the folder to the target.
+
+        The files of a folder are merged into the target folder. Existing
+        files are overwritten.
+
+        Args:
+            source (str or Path): The file or folder to copy.
+            target (str or Path): The target file or folder path.
+
+        Returns:
+            CopyProgress: The final progress of the copy.
+        """
+        source = Path(source)
+        target = Path(target)
+        if source.is_dir():
+            jobs, folders = self._collect(source, target)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            jobs, folders = [(source, target, source.stat().st_size)], []
+        self.copy_files(jobs)
+        # the files change the modified times of the folders. Copy them last.
+        for source_folder, target_folder in reversed(folders):
+            shutil.copystat(source_folder, target_folder)
+        return self.progress
+
+    def copy_files(self, jobs):
+        """Copy the files in parallel.
+
+        Args:
+            jobs (list): List of (source, target, size) tuples. The parent
+                folders of the targets must exist.
+
+        Returns:
+            CopyProgress: The final progress of the copy.
+        """
+        self._reset(sum(job[2] for job in jobs), len(jobs))
+        if self.workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                # list() re-raises the first error of the workers
+                list(executor.map(lambda job: self.copy_file(*job), jobs))
+        else:
+            for job in jobs:
+                self.copy_file(*job)
+        self._advance(force=True)
+        return self.progress
+
+    @staticmethod
+    def _collect(source, target):
+        """Create the target folders and collect the files to copy.
+
+        Returns:
+            tuple: List of (source, target, size) for each file and
+                list of (source, target) for each folder.
+        """
+        jobs = []
+        folders = []
+        stack = [(source, target)]
+        while stack:
+            source_folder, target_folder = stack.pop()
+            target_folder.mkdir(parents=True, exist_ok=True)
+            folders.append((source_folder, target_folder))
+            with os.scandir(source_folder) as iterator:
+                for entry in iterator:
+                    if entry.is_dir():
+                        stack.append((Path(entry.path), target_folder / entry.name))
+                    elif not entry.name.endswith(PARTIAL_SUFFIX):
+                        jobs.append(
+                            (Path(entry.path), target_folder / entry.name, entry.stat().st_size)
+                        )
+        # biggest files first so that the workers finish around the same time
+        jobs.sort(key=lambda job: job[2], reverse=True)
+        return jobs, folders
+
+    def copy_file(self, source, target, size=None):
+        """Copy a single file through a partial file.
+
+        Args:
+            source (Path): The source file.
+            target (Path): The target file.
+            size (int, optional): Size of the source file.
+        """
+        source_stat = source.stat()
+        size = source_stat.st_size if size is None else size
+        partial = target.with_name(target.name + PARTIAL_SUFFIX)
+        offset = self._get_resume_offset(partial, source_stat) if self.resume else 0
+
+        digest = hashlib.blake2b() if self.hash_files else None
+        with open(source, "rb") as source_file, \
+                open(partial, "r+b" if offset else "wb") as target_file:
+            if offset:
+                target_file.truncate(offset)
+                self._count("resumed")
+                self._advance(offset)
+                if digest:
+                    # the copied part is read from the local partial file
+                    for chunk in iter(lambda: target_file.read(self.chunk_size), b""):
+                        digest.update(chunk)
+            self._copy_data(source_file, target_file, offset, size, digest)
+        shutil.copystat(source, partial)
+        os.replace(partial, target)
+        if digest:
+            with self._lock:
+                self.hashes[Path(target).as_posix()] = digest.hexdigest()
+        self._advance(copied_files=1)
+
+    def _get_resume_offset(self, partial, source_stat):
+        """Return the offset to continue the copy from the partial file."""
+        try:
+            partial_stat = partial.stat()
+        except OSError:
+            return 0
+        # the source is changed after the partial copy. Start over.
+        if partial_stat.st_mtime < source_stat.st_mtime or partial_stat.st_size > source_stat.st_size:
+            return 0
+        # the last chunk may not be written completely. Copy it again.
+        offset = partial_stat.st_size - self.chunk_size
+        return max(0, offset - offset % self.chunk_size)
+
+    def _copy_data(self, source_file, target_file, offset, size, digest=None):
+        """Copy the data with the fastest method the platform supports.
+
+        The data is copied through the memory if a digest is given to
+        update it with the copied data.
+        """
+        if digest is None:
+            if offset == 0 and size and self._reflink(source_file, target_file):
+                self._count("reflink")
+                self._advance(size)
+                return
+            offset = self._copy_file_range(source_file, target_file, offset, size)
+            if offset is None:
+                return
+        self._count("buffered")
+        source_file.seek(offset)
+        target_file.seek(offset)
+        buffer = getattr(self._buffers, "buffer", None)
+        if buffer is None or len(buffer) != self.chunk_size:
+            buffer = self._buffers.buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        while True:
+            read = source_file.readinto(buffer)
+            if not read:
+                break
+            target_file.write(view[:read])
+            if digest:
+                digest.update(view[:read])
+            self._transferred(read)
+
+    @staticmethod
+    def _reflink(source_file, target_file):
+        """Clone the file on the file systems supporting it. e.g. btrfs, xfs"""
+        try:
+            _clone(source_file, target_file)
+        except OSError:
+            return False
+        return True
+
+    def _copy_file_range(self, source_file, target_file, offset, size):
+        """Copy inside the kernel with copy_file_range.
+
+        Returns:
+            int or None: None if the file is copied completely, otherwise
+                the offset to continue from with the buffered copy.
+        """
+        if not hasattr(os, "copy_file_range") or not size:
+            return offset
+        try:
+            while offset < size:
+                copied = os.copy_file_range(
+                    source_file.fileno(),
+                    target_file.fileno(),
+                    min(self.chunk_size, size - offset),
+                    offset,
+                    offset,
+                )
+                if not copied:
+                    # the source is shorter than expected.
+                    break
+                offset += copied
+                self._transferred(copied)
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED_ERRORS:
+                raise
+            return offset
+        self._count("copy_file_range")
+        return None
+
+
+def _clone(source_file, target_file):
+    """Clone the open source file into the open target file.
+
+    Raises:
+        OSError: If the platform or the file system does not support it.
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform.")
+    fcntl.ioctl(target_file.fileno(), _FICLONE, source_file.fileno())
+
+
+def reflink(source, target):
+    """Clone the source file to the target sharing the data blocks.
+
+    Raises:
+        OSError: If the platform or the file system does not support it.
+    """
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        try:
+            _clone(source_file, target_file)
+        except OSError:
+            target_file.close()
+            os.remove(target)
+            raise
+    shutil.copystat(source, target)
+
+
+_LINKERS = {
+    MaterializationModes.HARDLINK: os.link,
+    MaterializationModes.REFLINK: reflink,
+    MaterializationModes.SYMLINK: os.symlink,
+}
+_capabilities = {}  # device => frozenset of the supported modes
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities(folder):
+    """Detect the materialization modes the file system of the folder supports.
+
+    The file system is probed once for each device by linking a temporary
+    file in the folder.
+
+    Args:
+        folder (str or Path): An existing folder on the file system.
+
+    Returns:
+        frozenset: The supported MaterializationModes. Copy is always
+            supported.
+    """
+    folder = Path(folder)
+    device = folder.stat().st_dev
+    with _capabilities_lock:
+        if device in _capabilities:
+            return _capabilities[device]
+    supported = {MaterializationModes.COPY}
+    probe = folder / f".tik_probe_{os.getpid()}_{threading.get_ident()}"
+    probe_link = probe.with_name(probe.name + "_link")
+    try:
+        probe.write_bytes(b"tik")
+        for mode, linker in _LINKERS.items():
+            try:
+                linker(probe, probe_link)
+                supported.add(mode)
+            except (OSError, NotImplementedError):
+                pass
+            _remove(probe_link)
+    except OSError as exc:
+        LOG.warning(f"Cannot probe the file system of {folder}: {exc}")
+    finally:
+        _remove(probe)
+    supported = frozenset(supported)
+    with _capabilities_lock:
+        _capabilities[device] = supported
+    return supported
+
+
+def _remove(path, restore=None):
+    """Remove the file, link or folder if exists. Write protected ones too.
+
+    Args:
+        path (str or Path): The element to remove.
+        restore (str or Path, optional): The file or folder which may share
+            the hard links with the path. The write protection lifted to
+            remove the path is applied back to it.
+    """
+    path = Path(path)
+    if not os.path.lexists(path):
+        return
+    # windows does not remove the read-only files. Making them writable
+    # makes the other hard links of the files writable as well. Their modes
+    # are kept to restore them afterwards.
+    modes = {}
+
+    def _make_writable(file_path):
+        stat = os.stat(file_path)
+        if stat.st_nlink > 1:
+            modes[(stat.st_dev, stat.st_ino)] = stat.st_mode
+        os.chmod(file_path, 0o777)
+
+    if path.is_dir() and not path.is_symlink():
+        try:
+            shutil.rmtree(path)
+        except PermissionError:
+            for folder, _folders, files in os.walk(path):
+                for name in files:
+                    _make_writable(os.path.join(folder, name))
+            shutil.rmtree(path)
+    elif path.is_symlink():
+        # the mode of a symlink is the mode of the source.
+        path.unlink()
+    else:
+        try:
+            path.unlink()
+        except PermissionError:
+            _make_writable(path)
+            path.unlink()
+    if restore and modes:
+        _restore_modes(restore, modes)
+
+
+def _restore_modes(file_or_folder, modes):
+    """Apply the modes back to the files with the matching inodes."""
+    path = Path(file_or_folder)
+    file_list = [path] if path.is_file() else [
+        Path(folder) / name for folder, _folders, files in os.walk(path) for name in files
+    ]
+    for file_path in file_list:
+        stat = file_path.stat()
+        mode = modes.get((stat.st_dev, stat.st_ino))
+        if mode is not None:
+            os.chmod(file_path, mode & 0o7777)
+
+
+def _link_tree(source, target, linker):
+    """Create the folders of the source under the target and link the files."""
+    for folder, _folders, files in os.walk(source):
+        target_folder = target / Path(folder).relative_to(source)
+        target_folder.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            linker(Path(folder) / name, target_folder / name)
+
+
+def materialize(source, target, mode=MaterializationModes.COPY, progress_callback=None,
+                restore=None):
+    """Place the source file or folder at the target.
+
+    The target is built next to its final location and swapped in when
+    complete, so the existing target is never modified in place. This
+    matters for the hard links since they share the data with the source.
+
+    Args:
+        source (str or Path): The published file or folder.
+        target (str or Path): The path of the element in the branch.
+        mode (MaterializationModes or str): The preferred mode. Falls back
+            to copying if the file system does not support it.
+        progress_callback (callable, optional): Passed to the CopyEngine
+            when copying.
+        restore (str or Path, optional): The folder of the publishes
+            which may share the hard links with the existing target. The
+            write protection lifted to replace the target is applied back
+            to them.
+
+    Returns:
+        MaterializationModes: The mode used.
+    """
+    source = Path(source)
+    target = Path(target)
+    mode = MaterializationModes(mode)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    if mode is not MaterializationModes.COPY:
+        same_device = source.stat().st_dev == target.parent.stat().st_dev
+        if mode not in get_capabilities(target.parent) or (
+            mode is not MaterializationModes.SYMLINK and not same_device
+        ):
+            LOG.info(f"{mode.value} is not supported for {target}. Copying instead.")
+            mode = MaterializationModes.COPY
+
+    staging = target.with_name(target.name + STAGING_SUFFIX)
+    _remove(staging)
+    if mode is MaterializationModes.SYMLINK:
+        # relative links survive moving the project
+        os.symlink(os.path.relpath(source, target.parent), staging,
+                   target_is_directory=source.is_dir())
+    elif mode is not MaterializationModes.COPY:
+        try:
+            if source.is_dir():
+                _link_tree(source, staging, _LINKERS[mode])
+            else:
+                _LINKERS[mode](source, staging)
+        except OSError as exc:
+            # e.g. the hard link limit of the file system is reached
+            LOG.warning(f"Cannot create the {mode.value} for {target}. Copying instead: {exc}")
+            _remove(staging)
+            mode = MaterializationModes.COPY
+    if mode is MaterializationModes.COPY:
+        CopyEngine(progress_callback=progress_callback).copy(source, staging)
+
+    if source.is_dir() and os.path.lexists(target):
+        # folders cannot be replaced in one step.
+        discarded = target.with_name(target.name + ".tik_discarded")
+        _remove(discarded)
+        os.replace(target, discarded)
+        os.replace(staging, target)
+        _remove(discarded, restore=restore)
+    else:
+        if target.is_dir() and not target.is_symlink():
+            _remove(target, restore=restore)
+        try:
+            os.replace(staging, target)
+        except PermissionError:
+            # read-only target on windows
+            _remove(target, restore=restore)
+            os.replace(staging, target)
+    return mode
+
+
+def file_hash(path, chunk_size=CHUNK_SIZE):
+    """Return the BLAKE2b hex digest of the file reading it in chunks."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_unchanged(source, reference, compare_hash=False, reference_hash=None):
+    """Check if the reference file has the same content as the source.
+
+    Args:
+        source (Path): The new file.
+        reference (Path): The file of the previous version.
+        compare_hash (bool): Compare the content hashes instead of the
+            modified times. Needed when the files are written again with
+            the same content, e.g. exported from a dcc again.
+        reference_hash (str, optional): The known hash of the reference,
+            e.g. from the manifest. The reference is read only without it.
+
+    Returns:
+        bool: True if the reference can be reused for the source.
+    """
+    try:
+        source_stat = source.stat()
+        reference_stat = reference.stat()
+    except OSError:
+        return False
+    if source_stat.st_size != reference_stat.st_size:
+        return False
+    if compare_hash:
+        return file_hash(source) == (reference_hash or file_hash(reference))
+    # copystat keeps the modified times of the copies
+    return abs(source_stat.st_mtime - reference_stat.st_mtime) < 0.001
+
+
+def delta_copy(source, target, reference, compare_hash=False, workers=None,
+               progress_callback=None, engine=None, reference_hashes=None):
+    """Copy the source folder reusing the unchanged files of the reference.
+
+    The unchanged files are cloned or hard linked from the reference
+    folder, which is usually the same element of the previous version.
+    Only the changed files are copied from the source.
+
+    Args:
+        source (str or Path): The folder to copy.
+        target (str or Path): The target folder.
+        reference (str or Path): The folder to reuse the files from.
+        compare_hash (bool): See is_unchanged.
+        workers (int, optional): Number of files processed at the same time.
+        progress_callback (callable, optional): Passed to the CopyEngine
+            copying the changed files.
+        engine (CopyEngine, optional): The engine copying the changed
+            files. e.g. one hashing them. Created from the workers and the
+            progress callback if not given.
+        reference_hashes (dict, optional): Relative posix path => hash of
+            the reference files. Used instead of reading them when
+            comparing the hashes.
+
+    Returns:
+        list: Relative posix paths of the reused files.
+    """
+    source = Path(source)
+    target = Path(target)
+    reference = Path(reference)
+    reference_hashes = reference_hashes or {}
+    jobs, folders = CopyEngine._collect(source, target)
+    linkers = []
+    if reference.stat().st_dev == target.stat().st_dev:
+        capabilities = get_capabilities(target)
+        linkers = [
+            _LINKERS[mode]
+            for mode in (MaterializationModes.REFLINK, MaterializationModes.HARDLINK)
+            if mode in capabilities
+        ]
+
+    def _reuse(job):
+        """Link the file from the reference if unchanged. Return the relative path."""
+        job_source, job_target, _size = job
+        relative = job_source.relative_to(source)
+        reference_file = reference / relative
+        if not is_unchanged(
+            job_source, reference_file, compare_hash=compare_hash,
+            reference_hash=reference_hashes.get(relative.as_posix()),
+        ):
+            return None
+        for linker in linkers:
+            try:
+                linker(reference_file, job_target)
+                return relative.as_posix()
+            except OSError:
+                # e.g. the hard link limit of the file is reached
+                _remove(job_target)
+        return None
+
+    engine = engine or CopyEngine(workers=workers, progress_callback=progress_callback)
+    reused = []
+    if linkers and jobs:
+        with ThreadPoolExecutor(max_workers=engine.workers) as executor:
+            reused = list(executor.map(_reuse, jobs))
+    changed = [job for job, relative in zip(jobs, reused) if not relative] if reused else jobs
+    engine.copy_files(changed)
+    for source_folder, target_folder in reversed(folders):
+        shutil.copystat(source_folder, target_folder)
+    return sorted(relative for relative in reused if relative)
+
+
+def main(argv=None):
+    """Copy a file or folder from the command line showing the progress."""
+    parser = argparse.ArgumentParser(description="Copy files with the tik_manager4 copy engine.")
+    parser.add_argument("source", help="The file or folder to copy.")
+    parser.add_argument("target", help="The target file or folder path.")
+    parser.add_argument("--workers", type=int, default=CopyEngine.workers,
+                        help="Number of files copied at the same time.")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Start over instead of continuing the partial copies.")
+    args = parser.parse_args(argv)
+
+    def _print_progress(progress):
+        sys.stdout.write(f"\r{progress}")
+        sys.stdout.flush()
+
+    engine = CopyEngine(
+        workers=args.workers,
+        resume=not args.no_resume,
+        progress_callback=_print_progress,
+    )
+    try:
+        engine.copy(args.source, args.target)
+    except OSError as exc:
+        sys.stdout.write("\n")
+        LOG.error(f"Copy failed: {exc}")
+        return 1
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
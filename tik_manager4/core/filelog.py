@@ -1,12 +1,180 @@
-"""Logging module for Tik Manager 4."""
+"""Logging module for Tik Manager 4.
 
+All Filelog objects share a single queue. The records are written to the
+log files by a background listener thread with one long-lived rotating
+handler per file, so logging a message does not open or close the file.
+"""
+
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
 from pathlib import Path
 
 from tik_manager4.core import utils
 
 import datetime
 
+# number of rotated files kept next to each log file. e.g. tik_manager4.log.1
+ROTATED_FILES = 1
+
+
+class _LogFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler tolerating other processes sharing the file.
+
+    DCCs and the standalone application may log into the same file. If
+    another process rotates or removes the file, the stream is reopened.
+    If the file cannot be renamed (e.g. it is open on Windows), rotation
+    is retried later and the records are appended meanwhile.
+    """
+
+    check_interval = 1.0  # seconds between the checks of the file identity
+    retry_interval = 60.0  # seconds to wait after a failed rotation
+
+    def __init__(self, file_path, max_bytes):
+        super().__init__(
+            file_path, maxBytes=max_bytes, backupCount=ROTATED_FILES, delay=True
+        )
+        self._identity = None
+        self._checked_at = 0.0
+        self._retry_at = 0.0
+
+    def _open(self):
+        stream = super()._open()
+        try:
+            file_stat = os.fstat(stream.fileno())
+            self._identity = (file_stat.st_dev, file_stat.st_ino)
+        except OSError:
+            self._identity = None
+        return stream
+
+    def close_stream(self):
+        """Close the stream. It is opened again with the next record."""
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+
+    def _reopen_if_moved(self):
+        """Drop the stream if the file is not the one opened anymore."""
+        now = time.monotonic()
+        if self.stream is None or now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            file_stat = os.stat(self.baseFilename)
+            identity = (file_stat.st_dev, file_stat.st_ino)
+        except OSError:
+            identity = None
+        if identity != self._identity:
+            self.stream.close()
+            self.stream = None
+
+    def shouldRollover(self, record):
+        if time.monotonic() < self._retry_at:
+            return False
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        try:
+            super().doRollover()
+        except OSError:
+            self._retry_at = time.monotonic() + self.retry_interval
+            if self.stream is None:
+                self.stream = self._open()
+
+    def emit(self, record):
+        self._reopen_if_moved()
+        super().emit(record)
+
+
+class _LogRouter(logging.Handler):
+    """Dispatch the queued records to the handlers of their log files."""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+        self._handlers_lock = threading.Lock()
+
+    def register(self, file_path, size_cap):
+        """Create the handler of the log file.
+
+        Args:
+            file_path (str): Absolute path of the log file.
+            size_cap (int): The size to rotate the file at. 0 disables the
+                rotation.
+
+        Returns:
+            bool: True if the file is registered for the first time.
+        """
+        with self._handlers_lock:
+            if file_path in self._handlers:
+                return False
+            self._handlers[file_path] = _LogFileHandler(file_path, size_cap)
+            return True
+
+    def close_file(self, file_path):
+        """Release the log file. It is opened again with the next record."""
+        with self._handlers_lock:
+            handler = self._handlers.get(file_path)
+        if handler:
+            handler.close_stream()
+
+    def emit(self, record):
+        with self._handlers_lock:
+            handler = self._handlers.get(getattr(record, "tik_log_file", None))
+        if handler:
+            handler.handle(record)
+
+    def close(self):
+        with self._handlers_lock:
+            handlers, self._handlers = list(self._handlers.values()), {}
+        for handler in handlers:
+            handler.close()
+        super().close()
+
+
+_queue = queue.Queue()
+_router = _LogRouter()
+_queue_handler = logging.handlers.QueueHandler(_queue)
+# only the records of the Filelog objects are queued.
+_queue_handler.addFilter(lambda record: hasattr(record, "tik_log_file"))
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener():
+    """Start the background thread writing the queued records."""
+    global _listener  # pylint: disable=global-statement
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_queue, _router)
+            _listener.start()
+            atexit.register(_stop_listener)
+
+
+def _stop_listener():
+    """Write the remaining records and stop the background thread."""
+    global _listener  # pylint: disable=global-statement
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+    _router.close()
+
+
+def flush():
+    """Block until all the queued records are written to the log files."""
+    if _listener is not None:
+        _queue.join()
+
+
 class Filelog:
     """Logging class handling file logging."""
     # FIXME(ckutlu): We should definitely rethink the need for global state as
@@ -22,13 +190,17 @@ class Filelog:
         self.file_path_obj = Path(self.file_dir, f"{self.file_name}.log")
         self.logger = logging.getLogger(self.file_name)
         self.logger.setLevel(logging.DEBUG)
+        if _queue_handler not in self.logger.handlers:
+            self.logger.addHandler(_queue_handler)
         self.log_name = logname if logname else self.file_name
         self.is_date = date
         self.is_time = time
-        if not self.file_path_obj.is_file():
+        self._extra = {"tik_log_file": str(self.file_path_obj)}
+        _start_listener()
+        # the file is rotated at the size cap by the handler.
+        is_new = _router.register(str(self.file_path_obj), size_cap)
+        if is_new and not self.file_path_obj.is_file():
             self._welcome()
-        if self.get_size() > size_cap:
-            self.clear()
 
     @classmethod
     def __set_last_message(cls, msg, message_type):
@@ -62,14 +234,16 @@ class Filelog:
 
     def _welcome(self):
         """Print welcome message to the log file."""
-        self._start_logging()
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug(self.log_name)
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug("")
-        self._end_logging()
+        self._log(logging.DEBUG, "=" * len(self.log_name))
+        self._log(logging.DEBUG, self.log_name)
+        self._log(logging.DEBUG, "=" * len(self.log_name))
+        self._log(logging.DEBUG, "")
         return self.log_name
 
+    def _log(self, level, msg, exc_info=False):
+        """Queue the message to be written to the log file."""
+        self.logger.log(level, msg, exc_info=exc_info, extra=self._extra)
+
     def info(self, msg, *args):
         """Log an info message.
 
@@ -79,10 +253,8 @@ class Filelog:
         # use args to format the message mimicking the lazy logging
         msg = msg % args if args else msg
         stamped_msg = "%sINFO     : %s" %(self._get_now(), msg)
-        self._start_logging()
-        self.logger.info(stamped_msg)
+        self._log(logging.INFO, stamped_msg)
         self.__set_last_message(msg, "info")
-        self._end_logging()
         return msg
 
     def warning(self, msg, *args):
@@ -93,10 +265,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sWARNING  : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.warning(stamped_msg)
+        self._log(logging.WARNING, stamped_msg)
         self.__set_last_message(msg, "warning")
-        self._end_logging()
         return msg
 
     def error(self, msg, *args, proceed=True):
@@ -108,10 +278,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sERROR    : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.error(stamped_msg, exc_info=True)
+        self._log(logging.ERROR, stamped_msg, exc_info=True)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         if not proceed:
             raise msg
         return msg
@@ -124,10 +292,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sEXCEPTION: %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.exception(stamped_msg)
+        self._log(logging.ERROR, stamped_msg, exc_info=True)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         return msg
 
     def title(self, msg):
@@ -136,13 +302,10 @@ class Filelog:
         Args:
             msg (str): The title to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("="*(len(msg)))
-        self.logger.debug(msg)
-        self.logger.debug("="*(len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, "="*(len(msg)))
+        self._log(logging.DEBUG, msg)
+        self._log(logging.DEBUG, "="*(len(msg)))
         return msg
 
     def header(self, msg):
@@ -151,41 +314,31 @@ class Filelog:
         Args:
             msg (str): The header to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug(msg)
-        self.logger.debug("=" * (len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, msg)
+        self._log(logging.DEBUG, "=" * (len(msg)))
         return msg
 
     def seperator(self):
         """Create a seperator in the log file."""
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("-"*30)
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, "-"*30)
         return True
 
     def clear(self):
         """Clear the log file."""
+        flush()
+        _router.close_file(str(self.file_path_obj))
         if self.file_path_obj.is_file():
             self.file_path_obj.unlink()
         self._welcome()
+        flush()
 
-    def _start_logging(self):
-        """Prepare logger to write into log file."""
-        file_logger = logging.FileHandler(str(self.file_path_obj))
-        self.logger.addHandler(file_logger)
-
-    def _end_logging(self):
-        """Delete handlers once the logging into file finishes."""
-        for handler in self.logger.handlers:
-            self.logger.removeHandler(handler)
-            handler.flush()
-            handler.close()
+    def flush(self):
+        """Block until the queued messages are written to the log file."""
+        flush()
 
     def get_size(self):
         """Return the size of the log file."""
+        flush()
         return self.file_path_obj.stat().st_size
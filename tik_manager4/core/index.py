@@ -0,0 +1,346 @@
+"""Persistent project index for tasks, works and publish versions.
+
+The index is an optional SQLite file living next to the project structure
+(tikDatabase/index.sqlite). It mirrors the searchable fields of the .ttask,
+.twork and .tpub files so that queries can be answered without walking the
+database folders. The JSON files are always the source of truth; the index
+can be rebuilt or verified against them at any time.
+"""
+
+import argparse
+import os
+import threading
+from pathlib import Path
+
+try:
+    import sqlite3
+except ImportError:  # some embedded DCC interpreters ship without sqlite
+    sqlite3 = None
+
+from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core.constants import ObjectType
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+INDEX_FILE_NAME = "index.sqlite"
+
+# file extension => kind of the record
+KINDS = {
+    ".ttask": ObjectType.TASK.value,
+    ".twork": ObjectType.WORK.value,
+    ".tpub": ObjectType.PUBLISH_VERSION.value,
+}
+
+# the key holding the unique id for each kind
+ID_KEYS = {
+    ObjectType.TASK.value: "task_id",
+    ObjectType.WORK.value: "work_id",
+    ObjectType.PUBLISH_VERSION.value: "publish_id",
+}
+
+# Queryable columns. The values are the keys to read from the json data.
+COLUMNS = {
+    "id": None,  # resolved from ID_KEYS
+    "name": "name",
+    "category": "category",
+    "dcc": "dcc",
+    "state": "state",
+    "creator": "creator",
+    "task_id": "task_id",
+    "subproject_id": "subproject_id",
+    "path": "path",
+    "version_number": "version_number",
+    "deleted": "deleted",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    file_path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    id INTEGER,
+    name TEXT,
+    category TEXT,
+    dcc TEXT,
+    state TEXT,
+    creator TEXT,
+    task_id INTEGER,
+    subproject_id INTEGER,
+    path TEXT,
+    version_number INTEGER,
+    deleted INTEGER,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_id ON entries (kind, id);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries (kind, name);
+CREATE INDEX IF NOT EXISTS idx_entries_task ON entries (kind, task_id);
+"""
+
+
+def is_available():
+    """Return True if the sqlite module can be used in this interpreter."""
+    return sqlite3 is not None
+
+
+class ProjectIndex:
+    """SQLite backed index of the database files under a database root."""
+
+    def __init__(self, database_root, file_path=None):
+        """Initialize the index.
+
+        Args:
+            database_root (str): The tikDatabase folder of the project.
+            file_path (str, optional): The index file. Defaults to
+                <database_root>/index.sqlite.
+        """
+        if not is_available():
+            raise RuntimeError("sqlite3 module is not available.")
+        self._root = Path(database_root)
+        self._file_path = Path(file_path or self._root / INDEX_FILE_NAME)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            str(self._file_path), timeout=5, check_same_thread=False
+        )
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    @property
+    def file_path(self):
+        """The path of the index file."""
+        return self._file_path.as_posix()
+
+    @property
+    def database_root(self):
+        """The database root the index is relative to."""
+        return self._root.as_posix()
+
+    def close(self):
+        """Close the connection to the index file."""
+        with self._lock:
+            self._connection.close()
+
+    def _relative(self, file_path):
+        """Return the file path relative to the database root as posix."""
+        path = Path(file_path)
+        try:
+            return path.relative_to(self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    @staticmethod
+    def _kind_from_path(file_path):
+        """Resolve the record kind from the file extension."""
+        return KINDS.get(Path(file_path).suffix)
+
+    @staticmethod
+    def _values_from_data(kind, data):
+        """Extract the column values from the json data."""
+        values = {column: data.get(key) for column, key in COLUMNS.items() if key}
+        values["id"] = data.get(ID_KEYS[kind])
+        values["deleted"] = int(bool(values["deleted"]))
+        return values
+
+    def record(self, file_path, data, mtime=None):
+        """Insert or update the entry for the given database file.
+
+        Failures are logged and swallowed. The index must never break the
+        write path of the database files.
+
+        Args:
+            file_path (str): Absolute path of the .ttask, .twork or .tpub file.
+            data (dict): The json data of the file.
+            mtime (float, optional): Modified time of the file.
+
+        Returns:
+            bool: True if the entry is recorded, False otherwise.
+        """
+        kind = self._kind_from_path(file_path)
+        if not kind:
+            return False
+        values = self._values_from_data(kind, data or {})
+        values["file_path"] = self._relative(file_path)
+        values["kind"] = kind
+        values["mtime"] = mtime
+        columns = ", ".join(values.keys())
+        placeholders = ", ".join(f":{key}" for key in values)
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    f"INSERT OR REPLACE INTO entries ({columns}) VALUES ({placeholders})",
+                    values,
+                )
+        except sqlite3.Error as exc:
+            LOG.warning(f"Cannot update the project index: {exc}")
+            return False
+        return True
+
+    def remove(self, file_path):
+        """Remove the entry of the given database file from the index."""
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE file_path = ?",
+                    (self._relative(file_path),),
+                )
+        except sqlite3.Error as exc:
+            LOG.warning(f"Cannot update the project index: {exc}")
+            return False
+        return True
+
+    def _row_to_dict(self, row):
+        """Convert the sqlite row into a dictionary with absolute path."""
+        data = dict(row)
+        data["deleted"] = bool(data["deleted"])
+        data["absolute_path"] = (self._root / data["file_path"]).as_posix()
+        return data
+
+    def query(self, kind, **filters):
+        """Query the entries of the given kind.
+
+        Values containing wildcard characters (*, ?) are matched as globs.
+
+        Args:
+            kind (str or ObjectType): The kind of the entries. task, work or
+                publish_version.
+            **filters: Column and value pairs to filter with. Valid columns
+                are id, name, category, dcc, state, creator, task_id,
+                subproject_id, path, version_number and deleted.
+
+        Returns:
+            list: List of dictionaries for the matching entries.
+        """
+        kind = getattr(kind, "value", kind)
+        clauses = ["kind = ?"]
+        arguments = [kind]
+        for column, value in filters.items():
+            if column not in COLUMNS:
+                raise ValueError(f"{column} is not a queryable column.")
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, str) and ("*" in value or "?" in value):
+                clauses.append(f"{column} GLOB ?")
+            else:
+                clauses.append(f"{column} = ?")
+            arguments.append(value)
+        statement = f"SELECT * FROM entries WHERE {' AND '.join(clauses)}"
+        with self._lock:
+            rows = self._connection.execute(statement, arguments).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get_by_id(self, kind, uid):
+        """Return the first entry matching the kind and id or None."""
+        result = self.query(kind, id=uid)
+        return result[0] if result else None
+
+    def find_tasks(self, **filters):
+        """Query the indexed tasks. See query for the arguments."""
+        return self.query(ObjectType.TASK, **filters)
+
+    def find_works(self, **filters):
+        """Query the indexed works. See query for the arguments."""
+        return self.query(ObjectType.WORK, **filters)
+
+    def find_publish_versions(self, **filters):
+        """Query the indexed publish versions. See query for the arguments."""
+        return self.query(ObjectType.PUBLISH_VERSION, **filters)
+
+    def _scan_database_files(self):
+        """Yield all indexable database files under the root."""
+        for dir_path, _dir_names, file_names in os.walk(self._root):
+            for file_name in file_names:
+                if Path(file_name).suffix in KINDS:
+                    yield Path(dir_path, file_name)
+
+    def _indexed_mtimes(self):
+        """Return a dictionary of the indexed file paths and mtimes."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT file_path, mtime FROM entries"
+            ).fetchall()
+        return {row["file_path"]: row["mtime"] for row in rows}
+
+    def rebuild(self):
+        """Drop all entries and rebuild the index from the database files.
+
+        Returns:
+            int: Number of indexed files.
+        """
+        reader = io.IO()
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+        count = 0
+        for file_path in self._scan_database_files():
+            try:
+                data = reader.read(str(file_path))
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning(f"Skipping {file_path.as_posix()}: {exc}")
+                continue
+            if self.record(file_path, data, mtime=file_path.stat().st_mtime):
+                count += 1
+        LOG.info(f"Project index rebuilt with {count} entries.")
+        return count
+
+    def verify(self, fix=False):
+        """Compare the index against the database files.
+
+        Args:
+            fix (bool): If True, the mismatching entries are re-indexed.
+
+        Returns:
+            list: List of (relative_path, reason) tuples for the
+                mismatches. Reason is one of 'missing', 'stale' or 'orphan'.
+        """
+        indexed = self._indexed_mtimes()
+        mismatches = []
+        for file_path in self._scan_database_files():
+            relative_path = self._relative(file_path)
+            mtime = file_path.stat().st_mtime
+            if relative_path not in indexed:
+                mismatches.append((relative_path, "missing"))
+            elif indexed.pop(relative_path) != mtime:
+                mismatches.append((relative_path, "stale"))
+        mismatches.extend((relative_path, "orphan") for relative_path in indexed)
+
+        if fix:
+            reader = io.IO()
+            for relative_path, reason in mismatches:
+                absolute_path = self._root / relative_path
+                if reason == "orphan":
+                    self.remove(absolute_path)
+                    continue
+                try:
+                    data = reader.read(str(absolute_path))
+                except Exception as exc:  # pylint: disable=broad-except
+                    LOG.warning(f"Skipping {relative_path}: {exc}")
+                    continue
+                self.record(absolute_path, data, mtime=absolute_path.stat().st_mtime)
+        return mismatches
+
+
+def main(argv=None):
+    """Command line entry point to rebuild or verify a project index.
+
+    Example:
+        python -m tik_manager4.core.index /path/to/project --verify --fix
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    parser.add_argument("project", help="Absolute path of the project.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch.")
+    parser.add_argument("--verify", action="store_true", help="Report the mismatches.")
+    parser.add_argument("--fix", action="store_true", help="Re-index the mismatches found by verify.")
+    args = parser.parse_args(argv)
+
+    index = ProjectIndex(Path(args.project, "tikDatabase"))
+    if args.rebuild:
+        print(f"{index.rebuild()} entries indexed.")
+    if args.verify or not args.rebuild:
+        mismatches = index.verify(fix=args.fix)
+        for relative_path, reason in mismatches:
+            print(f"{reason:<8}{relative_path}")
+        print(f"{len(mismatches)} mismatches found.")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
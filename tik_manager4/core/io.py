@@ -1,17 +1,56 @@
 """I/O Module to handle read/write operations."""
 
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 import json
 from json.decoder import JSONDecodeError
+import os
+import pickle
+import stat
+import threading
+import time
+import uuid
 from tik_manager4.core import filelog
 from tik_manager4.external import filelock as fl
 
 LOG = filelog.Filelog(logname=__name__)
 
+# First key of the journaled files. Plain json files never start with it.
+JOURNAL_MARKER = "__journal__"
+
 
 class IO:
     """Handler class for read/write operations."""
 
+    # Process-wide cache of the parsed files shared by all IO objects.
+    # (path, st_mtime_ns, st_size) => (pickled data, journal records)
+    # The data is kept pickled, so each read returns an independent copy.
+    _cache = OrderedDict()
+    _cache_keys = {}  # path => the key of its cached entry
+    _cache_lock = threading.Lock()
+    _cache_size = 0
+    _cache_max_size = 64 * 1024 * 1024
+    _cache_hits = 0
+    _cache_misses = 0
+
+    # Writers serialize on <file>.lock. Readers never take the lock, the
+    # files are replaced atomically so they always see a complete file.
+    lock_timeout = 3  # seconds to wait for the lock before giving up
+    lock_hold_warning = 1.0  # log a warning if the lock is held longer
+    # the locks held by each thread. Nested writes do not wait for them.
+    _held_locks = threading.local()
+    _lock_stats_lock = threading.Lock()
+    _lock_stats = {
+        "acquired": 0,
+        "contended": 0,
+        "timeouts": 0,
+        "wait_time": 0.0,
+        "max_wait_time": 0.0,
+        "hold_time": 0.0,
+        "max_hold_time": 0.0,
+    }
+
     def __init__(self, file_path=None):
         """Initializes the IO class."""
         super().__init__()
@@ -19,6 +58,10 @@ class IO:
         self.default_extension = ".json"
         self._string_path = None
         self._path_obj = None
+        # number of records in the journal file. None for plain json files.
+        self.journal_records = None
+        # indentation of the written json files. None writes compact files.
+        self.indent = 4
         if file_path:
             self.file_path = file_path
 
@@ -64,15 +107,214 @@ class IO:
             dict: The data read from the file.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
-        if _path_obj.is_file():
-            return self._load_json(str(_path_obj))
+        try:
+            file_stat = os.stat(str(_path_obj))
+        except OSError:
+            file_stat = None
+        if file_stat and stat.S_ISREG(file_stat.st_mode):
+            data, journal_records = self._read_cached(str(_path_obj), file_stat)
+            if not file_path:
+                self.journal_records = journal_records
+            return data
         msg = f"File does not exist => {str(_path_obj)}"
         LOG.error(msg)
         raise FileNotFoundError(msg)
 
+    @classmethod
+    def _read_cached(cls, file_path, file_stat):
+        """Return the parsed data from the cache or load the file.
+
+        Args:
+            file_path (str): The file path to read.
+            file_stat (os.stat_result): The current stat of the file.
+
+        Returns:
+            tuple: The data and the number of journal records.
+        """
+        key = (file_path, file_stat.st_mtime_ns, file_stat.st_size)
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached is not None:
+                cls._cache.move_to_end(key)
+                cls._cache_hits += 1
+            else:
+                cls._cache_misses += 1
+        if cached is not None:
+            return pickle.loads(cached[0]), cached[1]
+
+        data, journal_records = cls._load_json(file_path)
+        if cls._cache_max_size:
+            pickled = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            with cls._cache_lock:
+                cls._discard_path(file_path)
+                cls._cache[key] = (pickled, journal_records)
+                cls._cache_keys[file_path] = key
+                cls._cache_size += len(pickled)
+                cls._evict()
+        return data, journal_records
+
+    @classmethod
+    def _discard_path(cls, file_path):
+        """Remove the cached entry of the file. Call within the cache lock."""
+        key = cls._cache_keys.pop(file_path, None)
+        if key in cls._cache:
+            cls._cache_size -= len(cls._cache.pop(key)[0])
+
+    @classmethod
+    def _evict(cls):
+        """Drop the least recently used entries until the cache fits."""
+        while cls._cache_size > cls._cache_max_size and cls._cache:
+            key, (pickled, _records) = cls._cache.popitem(last=False)
+            cls._cache_keys.pop(key[0], None)
+            cls._cache_size -= len(pickled)
+
+    @classmethod
+    def invalidate_cache(cls, file_path):
+        """Remove the cached data of the given file.
+
+        Args:
+            file_path (str): The file path.
+        """
+        with cls._cache_lock:
+            cls._discard_path(str(Path(file_path)))
+
+    @classmethod
+    def clear_cache(cls):
+        """Remove all the cached data and reset the counters."""
+        with cls._cache_lock:
+            cls._cache.clear()
+            cls._cache_keys.clear()
+            cls._cache_size = 0
+            cls._cache_hits = 0
+            cls._cache_misses = 0
+
+    @classmethod
+    def set_cache_size(cls, size_mb):
+        """Set the maximum size of the read cache.
+
+        Args:
+            size_mb (float): The maximum size in megabytes. 0 disables the cache.
+        """
+        with cls._cache_lock:
+            cls._cache_max_size = max(int(size_mb * 1024 * 1024), 0)
+            cls._evict()
+
+    @classmethod
+    def get_cache_statistics(cls):
+        """Return the statistics of the read cache.
+
+        Returns:
+            dict: hits, misses, entries, size and max_size (in bytes).
+        """
+        with cls._cache_lock:
+            return {
+                "hits": cls._cache_hits,
+                "misses": cls._cache_misses,
+                "entries": len(cls._cache),
+                "size": cls._cache_size,
+                "max_size": cls._cache_max_size,
+            }
+
+    @classmethod
+    def get_lock_statistics(cls):
+        """Return the statistics of the write locks taken by this process.
+
+        Returns:
+            dict: acquired, contended (had to wait for another writer),
+                timeouts, wait_time, max_wait_time, hold_time and
+                max_hold_time (in seconds).
+        """
+        with cls._lock_stats_lock:
+            return dict(cls._lock_stats)
+
+    @classmethod
+    def reset_lock_statistics(cls):
+        """Reset the write lock statistics."""
+        with cls._lock_stats_lock:
+            for key, value in cls._lock_stats.items():
+                cls._lock_stats[key] = type(value)()
+
+    @classmethod
+    def _record_lock(cls, **values):
+        """Add the values to the lock statistics."""
+        with cls._lock_stats_lock:
+            for key, value in values.items():
+                cls._lock_stats[key] += value
+                max_key = f"max_{key}"
+                if max_key in cls._lock_stats:
+                    cls._lock_stats[max_key] = max(cls._lock_stats[max_key], value)
+
+    def lock(self, file_path=None):
+        """Hold the write lock of the file across a read, modify and write.
+
+        The writes of the same thread inside the context use the held lock.
+
+        Example:
+            with _io.lock():
+                data = _io.read()
+                data["key"] = "value"
+                _io.write(data)
+
+        Args:
+            file_path (str): The file path to lock.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+        """
+        return self._write_lock(Path(file_path) if file_path else self._path_obj)
+
+    @contextmanager
+    def _write_lock(self, path_obj):
+        """Hold the lock of the file for the duration of the context.
+
+        Args:
+            path_obj (Path): The file to lock.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process longer
+                than the lock timeout.
+        """
+        held = self._held_locks.__dict__.setdefault("paths", set())
+        key = os.path.normcase(os.path.abspath(str(path_obj)))
+        if key in held:
+            yield
+            return
+        lock = fl.FileLock(f"{str(path_obj)}.lock", timeout=self.lock_timeout)
+        start = time.perf_counter()
+        contended = 0
+        try:
+            try:
+                lock.acquire(timeout=0)
+            except fl.Timeout:
+                contended = 1
+                lock.acquire()
+        except fl.Timeout as exc:
+            self._record_lock(contended=1, timeouts=1)
+            raise fl.Timeout("File is locked by another process") from exc
+        acquired = time.perf_counter()
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            lock.release()
+            hold_time = time.perf_counter() - acquired
+            self._record_lock(
+                acquired=1,
+                contended=contended,
+                wait_time=acquired - start,
+                hold_time=hold_time,
+            )
+            if hold_time > self.lock_hold_warning:
+                LOG.warning(f"Write lock of {path_obj.as_posix()} held for {hold_time:.2f} seconds.")
+
     def write(self, data, file_path=None):
         """Write the given data to the file.
 
+        The data is written to a temporary file next to the target, synced
+        to the disk and renamed over the target. An interrupted write never
+        leaves a partial file behind.
+
         Args:
             data (dict): The data to write.
             file_path (str): The file path to write to.
@@ -81,49 +323,184 @@ class IO:
             fl.Timeout: If the file is locked by another process.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
-        _lock_path = f"{str(_path_obj)}.lock"
-        lock = fl.FileLock(_lock_path, timeout=3)
+        # serialize before taking the lock to keep the hold time short.
+        if self.indent is None:
+            content = json.dumps(data, separators=(",", ":"))
+        else:
+            content = json.dumps(data, indent=self.indent)
+        with self._write_lock(_path_obj):
+            self.invalidate_cache(_path_obj)
+            self._replace_file(content, _path_obj)
+        if _path_obj == self._path_obj:
+            self.journal_records = None
+
+    def write_journal(self, header, key, items, file_path=None):
+        """Write the data as a journal file.
+
+        Journal files keep the header data in the first line and each item
+        of the journaled list as a separate record line. New records can be
+        appended to the file with append_journal without rewriting it.
+
+        Args:
+            header (dict): The data without the journaled list.
+            key (str): The key of the journaled list.
+            items (list): The journaled list.
+            file_path (str): The file path to write to.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+        """
+        records = [{"op": "add", "item": item} for item in items]
+        lines = [json.dumps({JOURNAL_MARKER: key, "header": header})]
+        lines.extend(json.dumps(record) for record in records)
+        self._write_lines(lines, file_path, mode="w")
+        if not file_path or Path(file_path) == self._path_obj:
+            self.journal_records = len(records)
+
+    def append_journal(self, records, file_path=None):
+        """Append records to an existing journal file.
+
+        Args:
+            records (list): List of (index, item) tuples. Index None
+                appends the item to the end of the journaled list. Otherwise
+                the item at the index is replaced.
+            file_path (str): The file path to append to.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+        """
+        lines = []
+        for index, item in records:
+            if index is None:
+                lines.append(json.dumps({"op": "add", "item": item}))
+            else:
+                lines.append(json.dumps({"op": "set", "index": index, "item": item}))
+        self._write_lines(lines, file_path, mode="a")
+        if (not file_path or Path(file_path) == self._path_obj) and self.journal_records is not None:
+            self.journal_records += len(lines)
+
+    def _write_lines(self, lines, file_path=None, mode="w"):
+        """Write or append the lines to the file under the file lock.
+
+        Whole files are replaced atomically. Appends are written with a
+        single call and synced, an interrupted append leaves at most one
+        corrupted last line which is skipped while reading. The next append
+        starts on a new line so that the corrupted line does not swallow
+        its first record.
+        """
+        _path_obj = Path(file_path) if file_path else self._path_obj
+        content = "\n".join(lines) + "\n"
+        with self._write_lock(_path_obj):
+            self.invalidate_cache(_path_obj)
+            if mode == "a":
+                with open(str(_path_obj), "a+b") as f:
+                    if f.seek(0, os.SEEK_END):
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            # the tail of an interrupted append
+                            content = "\n" + content
+                    f.write(content.encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                self._replace_file(content, _path_obj)
+
+    @staticmethod
+    def _replace_file(content, path_obj):
+        """Atomically replace the file with the content.
+
+        Args:
+            content (str): The text to write.
+            path_obj (Path): The target file.
+        """
+        temp_path = path_obj.with_name(f".{path_obj.name}.{uuid.uuid4().hex[:8]}.tmp")
         try:
-            lock.acquire()
-            self._dump_json(data, str(_path_obj))
-        except fl.Timeout as exc:
-            raise fl.Timeout("File is locked by another process") from exc
+            with open(str(temp_path), "x") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(str(temp_path), stat.S_IMODE(os.stat(str(path_obj)).st_mode))
+            except OSError:
+                pass  # new file, keep the default permissions
+            for attempt in range(5):
+                try:
+                    os.replace(str(temp_path), str(path_obj))
+                    break
+                except PermissionError:
+                    # windows refuses to replace a file opened by a reader.
+                    if attempt == 4:
+                        raise
+                    time.sleep(0.05)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
 
     @staticmethod
     def _load_json(file_path):
-        """Load the given json file.
+        """Load the given json or journal file.
 
         Args:
             file_path (str): The file path to load.
+
+        Returns:
+            tuple: The data and the number of journal records. Number of
+                records is None for plain json files.
         """
         try:
             with open(file_path, "r") as f:
-                data = json.load(f)
-                return data
-        except (ValueError, JSONDecodeError) as exc:
+                text = f.read()
+            if text.startswith(f'{{"{JOURNAL_MARKER}"'):
+                return IO._replay_journal(text, file_path)
+            return json.loads(text), None
+        except (ValueError, JSONDecodeError, KeyError) as exc:
             msg = f"Corrupted file => {file_path}"
             LOG.error(msg)
             raise Exception(msg) from exc
 
     @staticmethod
-    def file_exists(file_path):
-        """Check if the file exists.
+    def _replay_journal(text, file_path):
+        """Build the data back from the journal file content.
+
+        A corrupted last line (e.g. an interrupted append) is skipped.
 
         Args:
-            file_path (str): The file path to check.
+            text (str): The content of the journal file.
+            file_path (str): The file path for logging purposes.
+
+        Returns:
+            tuple: The data and the number of journal records.
         """
-        return Path(file_path).is_file()
+        lines = text.splitlines()
+        head = json.loads(lines[0])
+        data = dict(head["header"])
+        items = []
+        record_count = 0
+        for line_number, line in enumerate(lines[1:], start=2):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except (ValueError, JSONDecodeError):
+                LOG.warning(f"Skipping corrupted journal record at line {line_number} => {file_path}")
+                continue
+            record_count += 1
+            index = record.get("index")
+            if record.get("op") == "set" and index is not None and index < len(items):
+                items[index] = record["item"]
+            else:
+                items.append(record["item"])
+        data[head[JOURNAL_MARKER]] = items
+        return data, record_count
 
     @staticmethod
-    def _dump_json(data, file_path):
-        """Save the data to the json file.
+    def file_exists(file_path):
+        """Check if the file exists.
 
         Args:
-            data (dict): The data to save.
-            file_path (str): The file path to save.
+            file_path (str): The file path to check.
         """
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=4)
+        return Path(file_path).is_file()
 
     def get_modified_time(self):
         """Get the modified time of the file"""
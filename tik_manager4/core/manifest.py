@@ -0,0 +1,196 @@
+"""Content manifests of the publishes.
+
+The manifest lists the size, modified time and BLAKE2b hash of every file of
+the published elements and is stored next to the .tpub file. The files are
+hashed in chunks so that large caches are never loaded into the memory.
+
+The files copied by the publish are hashed while they are copied. The files
+written directly by the DCCs are hashed only if the project asks for it.
+Their entries have no hash and are checked with the modified times only.
+
+The quick checks compare the sizes and modified times only. The hashes are
+compared when a deep check is requested or the modified times differ.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core import copier
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+MANIFEST_SUFFIX = ".tmanifest"
+ALGORITHM = "blake2b"
+
+
+class ManifestEntry(NamedTuple):
+    """Size, modified time and content hash of a file."""
+
+    size: int
+    mtime: float
+    hash: str  # None if the file is not hashed
+
+
+def get_manifest_path(publish_file):
+    """Return the manifest path of the .tpub file."""
+    return Path(publish_file).with_suffix(MANIFEST_SUFFIX)
+
+
+def scan(root, relative_path, reference=None, hashes=None, compute=True):
+    """Hash the file or the files of the folder under the root.
+
+    Args:
+        root (str or Path): The folder the paths are relative to.
+        relative_path (str): The file or folder relative to the root.
+        reference (dict, optional): Previous entries. The hashes of the
+            files with the same size and modified time are reused instead
+            of reading the files again.
+        hashes (dict, optional): Relative posix path => hash of the files
+            hashed while they were copied.
+        compute (bool): Read the files without a known hash to hash them.
+            If False, their entries have no hash.
+
+    Returns:
+        dict: Relative posix path => ManifestEntry.
+    """
+    root = Path(root)
+    reference = reference or {}
+    hashes = hashes or {}
+    path = root / relative_path
+    if path.is_dir():
+        files = [
+            Path(folder, name)
+            for folder, _folders, names in os.walk(path)
+            for name in names
+        ]
+    else:
+        files = [path]
+    entries = {}
+    for file_path in files:
+        stat = file_path.stat()
+        key = file_path.relative_to(root).as_posix()
+        previous = reference.get(key)
+        if previous and previous.size == stat.st_size and previous.mtime == stat.st_mtime:
+            entries[key] = previous
+            continue
+        file_hash = hashes.get(key)
+        if file_hash is None and compute:
+            file_hash = copier.file_hash(file_path)
+        entries[key] = ManifestEntry(stat.st_size, stat.st_mtime, file_hash)
+    return entries
+
+
+def read(manifest_path):
+    """Read the manifest file.
+
+    Returns:
+        dict: Relative posix path => ManifestEntry. Empty if the file does
+            not exist or cannot be read.
+    """
+    try:
+        with open(manifest_path, "r") as manifest_file:
+            data = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    if data.get("algorithm") != ALGORITHM:
+        LOG.warning(f"Unknown manifest algorithm in {manifest_path}")
+        return {}
+    return {key: ManifestEntry(*value) for key, value in data.get("files", {}).items()}
+
+
+def write(manifest_path, entries):
+    """Write the entries to the manifest file.
+
+    Args:
+        manifest_path (str or Path): The manifest file.
+        entries (dict): Relative posix path => ManifestEntry.
+    """
+    data = {
+        "algorithm": ALGORITHM,
+        "files": {key: list(entry) for key, entry in sorted(entries.items())},
+    }
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(data, manifest_file)
+
+
+def matches(path, entry, deep=False):
+    """Check if the file matches the manifest entry.
+
+    Args:
+        path (str or Path): The file to check.
+        entry (ManifestEntry): The expected state of the file.
+        deep (bool): Compare the content hash even if the modified time
+            matches. Ignored if the entry has no hash.
+
+    Returns:
+        bool: True if the file has the expected content.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != entry.size:
+        return False
+    if entry.hash is None:
+        return stat.st_mtime == entry.mtime
+    if not deep and stat.st_mtime == entry.mtime:
+        return True
+    return copier.file_hash(path) == entry.hash
+
+
+def matches_copy(target, entries, prefix, deep=False):
+    """Check if the target is an up to date copy of a manifest item.
+
+    Args:
+        target (str or Path): The copied file or folder.
+        entries (dict): Relative posix path => ManifestEntry.
+        prefix (str): The relative path of the copied file or folder in
+            the manifest.
+        deep (bool): Compare the content hashes of all files.
+
+    Returns:
+        bool: True if all files of the item exist in the target with the
+            same content.
+    """
+    target = Path(target)
+    found = False
+    for key, entry in entries.items():
+        if key == prefix:
+            path = target
+        elif key.startswith(f"{prefix}/"):
+            path = target / key[len(prefix) + 1:]
+        else:
+            continue
+        found = True
+        if not matches(path, entry, deep=deep):
+            return False
+    return found
+
+
+def verify(root, entries, deep=False, prefix=None):
+    """Check the files under the root against the manifest entries.
+
+    Args:
+        root (str or Path): The folder the entries are relative to.
+        entries (dict): Relative posix path => ManifestEntry.
+        deep (bool): Compare the content hashes of all files.
+        prefix (str, optional): Check only the entries of this file or
+            folder.
+
+    Returns:
+        list: Messages of the missing or modified files. Empty if all match.
+    """
+    root = Path(root)
+    problems = []
+    for key, entry in entries.items():
+        if prefix and key != prefix and not key.startswith(f"{prefix}/"):
+            continue
+        path = root / key
+        if not path.exists():
+            problems.append(f"Missing: {path.as_posix()}")
+        elif not matches(path, entry, deep=deep):
+            problems.append(f"Modified: {path.as_posix()}")
+    return problems
@@ -0,0 +1,318 @@
+"""Read-through local cache of the published elements.
+
+The elements are copied from the origin into the local cache folder and the
+cached copies are used as long as they are valid. A cached copy is valid if
+the size and the modified time of each origin file is the same as when it was
+copied. If only the modified time differs, the copy is still valid when the
+content hash in the manifest matches the hash recorded with the copy.
+
+The cache is limited in size. The least recently used items are evicted to
+make room for the new ones.
+
+Example:
+    cache = ReadCache("D:/tik_cache", size_limit=20 * 1024 ** 3)
+    path = cache.get_cached_path(origin_path) or origin_path
+    cache.prefetch(element_paths)
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core import copier
+from tik_manager4.core import filelog
+from tik_manager4.core import utils
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+INDEX_FILE = "read_cache.json"
+
+
+class CachedItem(NamedTuple):
+    """A cached file or folder."""
+
+    source: str
+    last_access: float
+    # relative posix path => [size, mtime, hash]. The relative path is
+    # empty for the single files. The hash is None if it is not known.
+    files: dict
+
+    @property
+    def size(self):
+        """Total size of the cached files in bytes."""
+        return sum(values[0] for values in self.files.values())
+
+
+def _get_files(source):
+    """Return relative posix path => os.stat_result of the files."""
+    source = Path(source)
+    if not source.is_dir():
+        return {"": source.stat()}
+    files = {}
+    for folder, _folders, names in os.walk(source):
+        for name in names:
+            path = Path(folder, name)
+            files[path.relative_to(source).as_posix()] = path.stat()
+    return files
+
+
+class ReadCache:
+    """Copy the published elements to the local cache and find them there."""
+
+    folder_name = "read_cache"
+    workers = 2
+    size_limit = 20 * 1024 ** 3
+
+    def __init__(self, cache_folder, size_limit=None, workers=None):
+        """Initialize the cache and load its index.
+
+        Args:
+            cache_folder (str or Path): The local cache folder.
+            size_limit (int, optional): Maximum total size in bytes.
+            workers (int, optional): Number of elements copied at the same
+                time in the background.
+        """
+        # to tell if the cache needs to be created again
+        self.settings = (cache_folder, size_limit, workers)
+        self.root = Path(cache_folder) / self.folder_name
+        self._index_file = self.root / INDEX_FILE
+        self.size_limit = size_limit or self.size_limit
+        self.workers = workers or self.workers
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._executor = None
+        # increased to stop the previous prefetches
+        self._generation = 0
+        self._items = self._load()  # key => CachedItem
+
+    @property
+    def size(self):
+        """Total size of the cached items in bytes."""
+        with self._lock:
+            return sum(item.size for item in self._items.values())
+
+    @staticmethod
+    def get_key(source):
+        """Return the relative path of the source in the cache."""
+        return Path(source).as_posix().replace(":", "").lstrip("/")
+
+    def get_path(self, source):
+        """Return the path of the cached copy. It may not exist."""
+        return self.root / self.get_key(source)
+
+    def _load(self):
+        """Read the cached items from the index file."""
+        try:
+            with open(self._index_file, "r") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+        return {key: CachedItem(**item) for key, item in data.items()}
+
+    def _save(self):
+        """Write the index file. Must be called with the lock."""
+        data = {key: item._asdict() for key, item in self._items.items()}
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            temp_file = self._index_file.with_name(self._index_file.name + ".tmp")
+            with open(temp_file, "w") as index_file:
+                json.dump(data, index_file)
+            os.replace(temp_file, self._index_file)
+        except OSError as exc:
+            LOG.error(f"Cannot save the read cache index: {exc}")
+
+    def _key_lock(self, key):
+        """Return the lock preventing the same item to be fetched twice."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _is_valid(self, source, cached, item, hashes):
+        """Check the cached copy against the origin."""
+        try:
+            source_files = _get_files(source)
+        except OSError:
+            return False
+        if set(source_files) != set(item.files):
+            return False
+        for relative_path, (size, mtime, file_hash) in item.files.items():
+            stat = source_files[relative_path]
+            cached_file = cached / relative_path if relative_path else cached
+            try:
+                cached_size = cached_file.stat().st_size
+            except OSError:
+                return False
+            if stat.st_size != size or cached_size != size:
+                return False
+            if stat.st_mtime == mtime:
+                continue
+            # touched or copied again with the same content
+            if file_hash and (hashes or {}).get(relative_path) == file_hash:
+                continue
+            return False
+        return True
+
+    def get_cached_path(self, source, hashes=None):
+        """Return the valid cached copy of the source.
+
+        Args:
+            source (str or Path): The origin file or folder.
+            hashes (dict, optional): Relative posix path => content hash of
+                the source files from the manifest.
+
+        Returns:
+            str: The path of the cached copy or None if not cached or the
+                origin has changed.
+        """
+        key = self.get_key(source)
+        with self._lock:
+            item = self._items.get(key)
+        if not item:
+            return None
+        cached = self.root / key
+        if not self._is_valid(source, cached, item, hashes):
+            return None
+        with self._lock:
+            if key in self._items:
+                self._items[key] = item._replace(last_access=time.time())
+        return cached.as_posix()
+
+    def fetch(self, source, hashes=None):
+        """Copy the source into the cache unless a valid copy exists.
+
+        Args:
+            source (str or Path): The origin file or folder.
+            hashes (dict, optional): Relative posix path => content hash of
+                the source files. Stored to validate the copy later.
+
+        Returns:
+            str: The path of the cached copy.
+        """
+        key = self.get_key(source)
+        with self._key_lock(key):
+            cached_path = self.get_cached_path(source, hashes=hashes)
+            if cached_path:
+                return cached_path
+            hashes = hashes or {}
+            # stat before copying. A change during the copy invalidates it.
+            files = {
+                relative_path: [stat.st_size, stat.st_mtime, hashes.get(relative_path)]
+                for relative_path, stat in _get_files(source).items()
+            }
+            item = CachedItem(Path(source).as_posix(), time.time(), files)
+            self.evict(required=item.size, keep=key)
+            cached = self.root / key
+            staging = cached.with_name(cached.name + copier.STAGING_SUFFIX)
+            utils.delete(staging)
+            copier.CopyEngine().copy(source, staging)
+            with self._lock:
+                self._items.pop(key, None)
+                utils.delete(cached)
+                os.replace(staging, cached)
+                self._items[key] = item
+                self._save()
+            return cached.as_posix()
+
+    def evict(self, required=0, keep=None):
+        """Remove the least recently used items until the new item fits.
+
+        Args:
+            required (int): Size of the item to add in bytes.
+            keep (str, optional): Key of the item not to evict.
+
+        Returns:
+            list: The sources of the evicted items.
+        """
+        evicted = []
+        with self._lock:
+            total = sum(item.size for item in self._items.values())
+            by_access = sorted(self._items.items(), key=lambda pair: pair[1].last_access)
+            for key, item in by_access:
+                if total + required <= self.size_limit:
+                    break
+                if key == keep:
+                    continue
+                utils.delete(self.root / key)
+                self._items.pop(key)
+                total -= item.size
+                evicted.append(item.source)
+            if evicted:
+                LOG.info(f"Evicted {len(evicted)} items from the read cache.")
+                self._save()
+        return evicted
+
+    def clear(self):
+        """Remove all cached items."""
+        with self._lock:
+            for key in list(self._items):
+                utils.delete(self.root / key)
+            self._items = {}
+            self._save()
+
+    def _get_executor(self):
+        """Return the thread pool copying in the background."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="tik_read_cache"
+                )
+            return self._executor
+
+    def request(self, source, hashes=None):
+        """Fetch the source in the background.
+
+        Args:
+            source (str or Path): The origin file or folder.
+            hashes (dict, optional): Relative posix path => content hash of
+                the source files.
+
+        Returns:
+            Future: Resolves to the cached path.
+        """
+        return self._get_executor().submit(self.fetch, source, hashes)
+
+    def prefetch(self, sources):
+        """Fetch the sources in the background.
+
+        The previous prefetches stop before their remaining items.
+
+        Args:
+            sources (iterable): The origin files or folders. Consumed in the
+                background so it can be a generator reading the database.
+
+        Returns:
+            Future: Resolves to the list of the cached paths.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return self._get_executor().submit(self._prefetch, sources, generation)
+
+    def _prefetch(self, sources, generation):
+        """Fetch the sources until a new prefetch starts."""
+        cached_paths = []
+        for source in sources:
+            if generation != self._generation:
+                break
+            try:
+                cached_paths.append(self.fetch(source))
+            except OSError as exc:
+                LOG.warning(f"Cannot prefetch {source}: {exc}")
+        return cached_paths
+
+    def stop(self, wait=True):
+        """Stop the prefetches and save the access times.
+
+        Args:
+            wait (bool): Wait for the running copies to finish.
+        """
+        with self._lock:
+            self._generation += 1
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
+        with self._lock:
+            self._save()
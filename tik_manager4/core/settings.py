@@ -1,7 +1,21 @@
-"""Module to handle settings data."""
-from copy import deepcopy
+"""Module to handle settings data.
+
+The edits are tracked instead of comparing deep copies of the data. The
+original value is a shallow copy of the top level keys and every mutation
+going through the API marks the settings dirty. Nested containers are
+copied only along the edited path, so the untouched values are shared
+between the original and the current data.
+
+As a consequence, the nested values mutated in place outside of the API
+are neither detected as changes nor reverted by reset_settings. Such
+editors should call Settings.snapshot before editing.
+"""
+from copy import copy, deepcopy
 from tik_manager4.core import io
 
+_MISSING = object()
+_CONTAINERS = (dict, list, set)
+
 
 class Settings:
     """Generic Settings class to hold read and compare dictionary data."""
@@ -16,6 +30,8 @@ class Settings:
         self._current_value = {}
         self._time_stamp = None
         self._fallback = None
+        self._dirty = False
+        self._snapshot = None
         if file_path:
             self.settings_file = file_path
 
@@ -43,6 +59,15 @@ class Settings:
         self.settings_file = self._filepath
         return self._current_value
 
+    @property
+    def compact(self):
+        """Whether the file is written without indentation."""
+        return self._io.indent is None
+
+    @compact.setter
+    def compact(self, value):
+        self._io.indent = None if value else 4
+
     @property
     def keys(self):
         """Return all keys in the current data."""
@@ -58,8 +83,16 @@ class Settings:
         """Return the current dictionary data."""
         return self._current_value
 
-    def is_modified(self):
-        """Check if the file has been modified since initialization."""
+    def is_modified(self, snapshot=None):
+        """Check if the file has been modified since initialization.
+
+        Args:
+            snapshot (FileSnapshot, optional): The snapshot of the file
+                taken by a directory scan. If given, the modified time is
+                compared against the snapshot without stat-ing the file.
+        """
+        if snapshot is not None:
+            return not bool(snapshot.mtime == self._time_stamp)
         return not bool(self._io.get_modified_time() == self._time_stamp)
 
     def initialize(self, data):
@@ -69,10 +102,28 @@ class Settings:
             data (dict): The data to initialize the settings with.
         """
         data = data or {}
-        self._original_value = {}
-        self._current_value = {}
-        self._current_value.update(data)
-        self._original_value = deepcopy(self._current_value)
+        self._current_value = dict(data)
+        self._original_value = dict(self._current_value)
+        self._dirty = False
+        self._snapshot = None
+
+    def snapshot(self):
+        """Take an independent copy of the current data.
+
+        The API calls are tracked without copying the data. Editors
+        mutating the nested values in place (e.g. the settings dialog
+        widgets) should take a snapshot first. Until the settings are
+        reset, the changes are detected and reverted by comparing against
+        the snapshot.
+        """
+        self._snapshot = deepcopy(self._current_value)
+
+    def _mark_applied(self):
+        """Accept the current data as the written state."""
+        self._original_value = dict(self._current_value)
+        self._dirty = False
+        if self._snapshot is not None:
+            self._snapshot = deepcopy(self._current_value)
 
     def update(self, data, add_missing_keys=False):
         """Update the settings data.
@@ -83,22 +134,24 @@ class Settings:
         """
         if isinstance(data, Settings):
             data = data.get_data()
+        keys = data.keys()
         if not add_missing_keys:
-            self._current_value.update(
-                (key, data[key]) for key in self._current_value.keys()
-                & data.keys())
-        else:
-            self._current_value.update(data)
+            keys = self._current_value.keys() & keys
+        for key in keys:
+            self.edit_property(key, data[key])
 
     def add_missing_keys(self, data):
         """Add only the non-existing keys, but do not update the existing ones."""
         for key in data:
             if key not in self._current_value:
                 self._current_value[key] = data[key]
+                self._dirty = True
 
     def is_settings_changed(self):
         """Check if the settings changed since initialization."""
-        return not self._current_value == self._original_value
+        if self._snapshot is not None:
+            return self._current_value != self._snapshot
+        return self._dirty
 
     def apply_settings(self, force=False):
         """Apply the changed settings and writes it to file.
@@ -111,23 +164,41 @@ class Settings:
         """
         if not self.is_settings_changed() and not force:
             return False
-        self._original_value = deepcopy(self._current_value)
-        self._io.write(self._original_value)
+        self._io.write(self._current_value)
+        self._mark_applied()
         self._time_stamp = self._io.get_modified_time()
         return True
 
     def reset_settings(self):
-        """Revert back the unsaved changes to the original state."""
-        self._current_value = deepcopy(self._original_value)
+        """Revert back the unsaved changes to the original state.
+
+        Without a snapshot only the top level keys are restored. The nested
+        values edited in place outside of the API stay edited.
+        """
+        if self._snapshot is not None:
+            # the snapshot is not needed anymore once the edits are reverted.
+            self._current_value, self._snapshot = self._snapshot, None
+            self._original_value = dict(self._current_value)
+        else:
+            self._current_value = dict(self._original_value)
+        self._dirty = False
 
     def edit_property(self, key, val):
         """Update the property key with given value.
 
+        Passing the same container back (e.g. a list edited in place)
+        always marks the settings changed. Other equal values are ignored.
+
         Args:
             key (str): The property key to update.
             val (any): The value to update the key with.
         """
-        self._current_value.update({key: val})
+        current = self._current_value.get(key, _MISSING)
+        edited_in_place = current is val and isinstance(val, _CONTAINERS)
+        if not edited_in_place and current == val:
+            return
+        self._current_value[key] = val
+        self._dirty = True
 
     def edit_sub_property(self, sub_keys, new_val):
         """Edit nested properties.
@@ -138,10 +209,14 @@ class Settings:
         """
         val = self._current_value
         for key in sub_keys[:-1]:
+            if self._snapshot is None:
+                # copy the containers on the path to keep the original intact
+                val[key] = copy(val[key])
             val = val[key]
 
         # Assign a new value to the final key
         val[sub_keys[-1]] = new_val
+        self._dirty = True
 
     def add_property(self, key, val, force=True):
         """Create a property key with given value.
@@ -156,12 +231,13 @@ class Settings:
         """
         if key in self._current_value and not force:
             return False
-        self._current_value.update({key: val})
+        self.edit_property(key, val)
         return True
 
     def delete_property(self, key):
         """Delete the given property key."""
         self._current_value.pop(key)
+        self._dirty = True
 
     def get_property(self, key, default=None):
         """Return the value of the property key.
@@ -204,6 +280,8 @@ class Settings:
         Args:
             data (dict): The data to set.
         """
+        if data is self._current_value or data != self._current_value:
+            self._dirty = True
         self._current_value = data
 
     def get_data(self):
@@ -0,0 +1,57 @@
+"""Single pass directory scanner for the database files.
+
+The scanner walks the folders with os.scandir and reuses the stat results
+of the directory entries. On network storages each separate stat call is a
+round trip, so the objects compare their modified times against the
+snapshots instead of stat-ing the files again.
+"""
+
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+
+class FileSnapshot(NamedTuple):
+    """Path, modified time and size of a file at the time of the scan."""
+
+    path: Path
+    mtime: float
+    size: int
+
+
+def scan_directory(directory, extension, recursive=False):
+    """Collect the snapshots of the files with the extension.
+
+    Args:
+        directory (str or Path): The folder to scan.
+        extension (str or tuple): The file extension including the dot.
+            e.g. ".twork". A tuple of extensions can be given as well.
+        recursive (bool): If True, the sub folders are scanned as well.
+
+    Returns:
+        list: List of FileSnapshot objects. Empty list if the directory
+            does not exist.
+    """
+    snapshots = []
+    folders = [str(directory)]
+    while folders:
+        folder = folders.pop()
+        try:
+            iterator = os.scandir(folder)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        with iterator:
+            for entry in iterator:
+                try:
+                    if recursive and entry.is_dir():
+                        folders.append(entry.path)
+                    elif entry.name.endswith(extension) and entry.is_file():
+                        # lstat is what IO.get_modified_time uses.
+                        stat = entry.stat(follow_symlinks=False)
+                        snapshots.append(
+                            FileSnapshot(Path(entry.path), stat.st_mtime, stat.st_size)
+                        )
+                except OSError:
+                    # the entry is removed during the scan
+                    continue
+    return snapshots
@@ -1,4 +1,6 @@
 """Cross-platform utility functions."""
+from contextlib import contextmanager
+import gc
 import os
 import sys
 import importlib.util
@@ -10,6 +12,7 @@ import subprocess
 import re
 import unicodedata
 
+from tik_manager4.core import copier
 from tik_manager4.external import fileseq
 
 CURRENT_PLATFORM = platform.system()
@@ -103,8 +106,22 @@ def sanitize_text(text, allow_spaces=False):
 
     return sanitized_text
 
-def copy(source, target, force=True, raise_error=False):
-    """"Copy the source file or folder to the target location."""
+def copy(source, target, force=True, raise_error=False, progress_callback=None):
+    """"Copy the source file or folder to the target location.
+
+    The copy is done with the copy engine. See tik_manager4.core.copier.
+
+    Args:
+        source (str or Path): The file or folder to copy.
+        target (str or Path): The target file or folder path.
+        force (bool): Overwrite the target if it exists.
+        raise_error (bool): Raise the errors instead of returning them.
+        progress_callback (callable, optional): Function accepting a
+            CopyProgress object. Can be called from the worker threads.
+
+    Returns:
+        tuple: (bool, str) State and the message.
+    """
     source = Path(source)
     if not source.exists():
         if raise_error:
@@ -141,7 +158,7 @@ def copy(source, target, force=True, raise_error=False):
             # rename the target to a temporary file to avoid overwriting issues
             os.rename(str(target), temp_lock_file)
         try:
-            shutil.copy2(str(source), str(target))
+            copier.CopyEngine(progress_callback=progress_callback).copy(source, target)
         except OSError as exc:
             if raise_error:
                 raise OSError(f"Error copying file: {exc}")
@@ -153,21 +170,26 @@ def copy(source, target, force=True, raise_error=False):
             except OSError as exc:
                 LOG.warning(f"Error removing temporary lock file: {exc}", exc_info=True)
     elif source.is_dir():
-        # Use copytree with dirs_exist_ok=True for Python 3.8+
-        # For older versions, use shutil.copytree and handle existing directories
-        if hasattr(shutil, "copytree") and hasattr(shutil.copytree, "dirs_exist_ok"):
-            shutil.copytree(str(source), str(target), dirs_exist_ok=True)
-        else:
-            if target.exists():
-                shutil.rmtree(target)
-            shutil.copytree(str(source), str(target))
+        # the files are merged into the existing folder. Keeping the folder
+        # lets an interrupted copy continue from its partial files.
+        try:
+            copier.CopyEngine(progress_callback=progress_callback).copy(source, target)
+        except OSError as exc:
+            if raise_error:
+                raise OSError(f"Error copying folder: {exc}")
+            return False, f"Error copying folder: {exc}"
     return True, f"{source} copied to {target}."
 
-def move(source, target, force=True, raise_error=False):
+def move(source, target, force=True, raise_error=False, progress_callback=None, throttle=None):
     """Move the source file or folder to the target location.
 
     If force is True, any existing file or folder at the target location
     will be removed before the move operation.
+
+    The source is renamed if possible. Across the devices, it is copied
+    with the copy engine and deleted afterwards. Folders are copied next to
+    the target first so that an interrupted move does not leave an
+    incomplete target behind.
     """
     source = Path(source)
     if not source.exists():
@@ -185,8 +207,30 @@ def move(source, target, force=True, raise_error=False):
     # Ensure the target's parent directory exists
     target.parent.mkdir(parents=True, exist_ok=True)
 
+    # moving into an existing folder. Same as shutil.move
+    if target.is_dir():
+        target = target / source.name
+
     # Perform the move operation
-    shutil.move(str(source), str(target))
+    try:
+        os.rename(str(source), str(target))
+    except OSError:
+        # different devices or the target cannot be replaced by rename
+        engine = copier.CopyEngine(progress_callback=progress_callback, throttle=throttle)
+        try:
+            if source.is_dir():
+                staging = target.with_name(target.name + copier.STAGING_SUFFIX)
+                engine.copy(source, staging)
+                os.replace(staging, target)
+            else:
+                engine.copy(source, target)
+        except OSError as exc:
+            if raise_error:
+                raise OSError(f"Error moving: {exc}")
+            return False, f"Error moving: {exc}"
+        ret, msg = delete(source)
+        if not ret:
+            LOG.warning(f"{source} copied but cannot be removed: {msg}")
     return True, f"{source} moved to {target}."
 
 def delete(file_or_folder):
@@ -303,4 +347,21 @@ def remove_key(data, key):
     elif isinstance(data, list):
         return [remove_key(item, key) for item in data]
     else:
-        return data
\ No newline at end of file
+        return data
+
+
+@contextmanager
+def gc_paused():
+    """Pause the garbage collector within the context.
+
+    Building or serializing large object trees triggers the cyclic garbage
+    collector many times for objects which are all alive. Pausing it
+    roughly halves the time for the large project structures.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
@@ -0,0 +1,395 @@
+"""Change watcher for the database folders.
+
+Watches the tikDatabase folder and collects the changes of the database
+files (.ttask, .twork, .tpub, live.json and promoted.json) so that only
+the affected objects need to be reloaded instead of rescanning the
+folders. Uses Linux inotify when available, otherwise falls back to
+polling the folders with directory snapshots.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core import filelog
+from tik_manager4.core import snapshot
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+WATCHED_EXTENSIONS = (".ttask", ".twork", ".tpub")
+WATCHED_NAMES = ("live.json", "promoted.json")
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+# the kernel queue overflowed. Changes may be lost and a full refresh is needed.
+OVERFLOW = "overflow"
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Change(NamedTuple):
+    """A change event for a database file."""
+
+    event: str
+    path: Path
+
+
+def is_watched(path):
+    """Check if the file is one of the watched database files.
+
+    Args:
+        path (str or Path): The file path.
+
+    Returns:
+        bool: True if the changes of the file should be reported.
+    """
+    name = Path(path).name
+    return name.endswith(WATCHED_EXTENSIONS) or name in WATCHED_NAMES
+
+
+def is_inotify_available():
+    """Return True if the inotify backend can be used on this platform."""
+    return _load_libc() is not None
+
+
+def _load_libc():
+    """Load the C library with the inotify functions or return None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _ = libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class PollingBackend:
+    """Detect the changes by comparing the directory snapshots."""
+
+    name = "polling"
+
+    def __init__(self, root):
+        """Initialize the backend and take the initial snapshot.
+
+        Args:
+            root (str or Path): The folder to watch.
+        """
+        self._root = Path(root)
+        # the snapshots always cover all the folders
+        self.failed_folders = []
+        self._stop_event = threading.Event()
+        self._state = self._take_snapshot()
+
+    def bind(self, stop_event):
+        """Use the event to interrupt the waits."""
+        self._stop_event = stop_event
+
+    def _take_snapshot(self):
+        """Return the path => (mtime, size) dictionary of the watched files."""
+        extensions = WATCHED_EXTENSIONS + WATCHED_NAMES
+        return {
+            _snapshot.path: (_snapshot.mtime, _snapshot.size)
+            for _snapshot in snapshot.scan_directory(self._root, extensions, recursive=True)
+            if is_watched(_snapshot.path)
+        }
+
+    def read(self, timeout):
+        """Wait for the timeout and return the changes since the last call.
+
+        Args:
+            timeout (float): Seconds to wait before comparing.
+
+        Returns:
+            list: List of Change objects.
+        """
+        self._stop_event.wait(timeout)
+        current = self._take_snapshot()
+        changes = [Change(DELETED, path) for path in self._state if path not in current]
+        for path, stats in current.items():
+            previous = self._state.get(path)
+            if previous is None:
+                changes.append(Change(CREATED, path))
+            elif previous != stats:
+                changes.append(Change(MODIFIED, path))
+        self._state = current
+        return changes
+
+    def close(self):
+        """Nothing to release for the polling backend."""
+
+
+class InotifyBackend:
+    """Receive the changes from the Linux kernel with inotify."""
+
+    name = "inotify"
+    # the longest wait for the events so that the watcher stops quickly
+    wait_limit = 1.0
+
+    def __init__(self, root):
+        """Create the inotify instance and watch all the folders under root.
+
+        Args:
+            root (str or Path): The folder to watch.
+
+        Raises:
+            OSError: If the inotify instance cannot be created or any of the
+                folders cannot be watched.
+        """
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError("inotify is not available on this platform.")
+        self._root = Path(root)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._folders = {}  # watch descriptor => folder
+        # folders which cannot be watched. Their changes would be missed.
+        self.failed_folders = []
+        self._add_watches(self._root)
+        if self.failed_folders:
+            self.close()
+            raise OSError(f"{len(self.failed_folders)} folders cannot be watched.")
+
+    def bind(self, stop_event):
+        """The backend waits on the file descriptor. Nothing to bind."""
+
+    def _add_watches(self, folder, report=None):
+        """Watch the folder and all its sub folders.
+
+        Args:
+            folder (Path): The top folder.
+            report (list, optional): If given, the watched files already in
+                the folders are added as created. Files written into a new
+                folder before its watch is added would be missed otherwise.
+        """
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(str(current)), _WATCH_MASK
+            )
+            if descriptor < 0:
+                # e.g. ENOSPC when fs.inotify.max_user_watches is reached
+                errno = ctypes.get_errno()
+                LOG.warning(
+                    f"Cannot watch {current}: {os.strerror(errno)} (errno {errno})"
+                )
+                self.failed_folders.append(current)
+                # the watcher falls back to polling. No need to go on.
+                return
+            self._folders[descriptor] = current
+            try:
+                with os.scandir(current) as iterator:
+                    for entry in iterator:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif report is not None and is_watched(entry.name):
+                            report.append(Change(CREATED, Path(entry.path)))
+            except OSError:
+                continue
+
+    def read(self, timeout):
+        """Wait up to timeout seconds for the changes.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            list: List of Change objects.
+        """
+        readable, _, _ = select.select([self._fd], [], [], min(timeout, self.wait_limit))
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            descriptor, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            self._process_event(descriptor, mask, name, changes)
+        return changes
+
+    def _process_event(self, descriptor, mask, name, changes):
+        """Convert a single inotify event to the changes."""
+        if mask & _IN_Q_OVERFLOW:
+            LOG.warning("Database watcher queue overflowed. Some changes may be missed.")
+            changes.append(Change(OVERFLOW, self._root))
+            return
+        if mask & _IN_IGNORED:
+            self._folders.pop(descriptor, None)
+            return
+        folder = self._folders.get(descriptor)
+        if folder is None or not name:
+            return
+        path = folder / name
+        if mask & _IN_ISDIR:
+            if mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._add_watches(path, report=changes)
+            return
+        if not is_watched(name):
+            return
+        if mask & (_IN_DELETE | _IN_MOVED_FROM):
+            changes.append(Change(DELETED, path))
+        elif mask & _IN_MOVED_TO:
+            changes.append(Change(CREATED, path))
+        elif mask & _IN_CLOSE_WRITE:
+            changes.append(Change(MODIFIED, path))
+
+    def close(self):
+        """Release the inotify instance."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class DatabaseWatcher:
+    """Background watcher collecting the changes of the database files."""
+
+    interval = 10.0
+
+    def __init__(self, root, interval=None, use_inotify=True):
+        """Initialize the watcher.
+
+        Args:
+            root (str or Path): The tikDatabase folder to watch.
+            interval (float, optional): Polling interval in seconds. Each
+                poll reads all the database folders, so keep it long on
+                large projects. Defaults to the class interval.
+            use_inotify (bool): Try to use inotify before falling back to
+                polling.
+        """
+        self._root = Path(root)
+        self._interval = interval or self.interval
+        self._use_inotify = use_inotify
+        self._backend = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = {}  # path => event. Keeps the last event of each file.
+        self._callbacks = []
+
+    @property
+    def root(self):
+        """The watched folder."""
+        return self._root.as_posix()
+
+    @property
+    def backend(self):
+        """Name of the active backend. 'inotify' or 'polling'."""
+        return self._backend.name if self._backend else None
+
+    @property
+    def is_running(self):
+        """Return True if the watcher thread is alive."""
+        return bool(self._thread and self._thread.is_alive())
+
+    def add_callback(self, callback):
+        """Add a function to call with the list of changes.
+
+        The callbacks are called from the watcher thread.
+
+        Args:
+            callback (callable): Function accepting a list of Change objects.
+        """
+        self._callbacks.append(callback)
+
+    def start(self):
+        """Start watching the database folder."""
+        if self.is_running:
+            return
+        self._backend = None
+        if self._use_inotify and is_inotify_available():
+            try:
+                self._backend = InotifyBackend(self._root)
+            except OSError as exc:
+                LOG.warning(f"Cannot use inotify, falling back to polling: {exc}")
+        if self._backend is None:
+            self._backend = PollingBackend(self._root)
+        self._stop_event.clear()
+        self._backend.bind(self._stop_event)
+        self._thread = threading.Thread(
+            target=self._run, name="tik_database_watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread and release the backend."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self._interval + 1)
+            self._thread = None
+        if self._backend:
+            self._backend.close()
+
+    def _run(self):
+        """Watcher thread loop."""
+        while not self._stop_event.is_set():
+            try:
+                changes = self._backend.read(self._interval)
+            except OSError as exc:
+                LOG.error(f"Database watcher stopped: {exc}")
+                return
+            if self._backend.failed_folders:
+                # the new folders cannot be watched. Refresh everything once.
+                changes.append(Change(OVERFLOW, self._root))
+                self._fall_back_to_polling()
+            if not changes or self._stop_event.is_set():
+                continue
+            with self._lock:
+                for change in changes:
+                    self._pending[change.path] = change.event
+            for callback in list(self._callbacks):
+                try:
+                    callback(changes)
+                except Exception as exc:  # pylint: disable=broad-except
+                    LOG.error(f"Database watcher callback failed: {exc}")
+
+    def _fall_back_to_polling(self):
+        """Replace the inotify backend with polling."""
+        LOG.warning("Some database folders cannot be watched, falling back to polling.")
+        self._backend.close()
+        backend = PollingBackend(self._root)
+        backend.bind(self._stop_event)
+        self._backend = backend
+
+    def drain(self):
+        """Return and clear the pending changes.
+
+        Multiple events of the same file are merged into the last one.
+
+        Returns:
+            list: List of Change objects.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [Change(event, path) for path, event in pending.items()]
@@ -1,9 +1,11 @@
 """Template module for publishing"""
 
+import re
 import traceback
 from pathlib import Path
 import importlib
 from tik_manager4.external import fileseq
+from tik_manager4.core import copier
 from tik_manager4.core import filelog
 from tik_manager4.core.settings import Settings
 from tik_manager4.objects.metadata import Metadata
@@ -24,6 +26,11 @@ class ExtractCore:
     bundle_match_id = 0
     # bundle_match_id is the id of the bundle to identify the matching ingestors.
     # any ingestor with the same bundle_match_id will be able to ingest this bundle.
+    thread_safe: bool = False
+    # thread safe extracts run concurrently with the other thread safe extracts.
+    # Extracts using the dcc api must keep it False to run in the main thread.
+    dependencies: tuple = ()
+    # names of the extracts that need to be finished before this one starts.
 
     def __init__(self, exposed_settings=None, global_exposed_settings=None):
         self.global_exposed_settings_ui: dict = global_exposed_settings or {}
@@ -54,6 +61,17 @@ class ExtractCore:
             self.settings[key] = _settings
 
         self.live_status = False
+        self.wall_time: float = 0.0  # seconds spent in the last extract
+        # relative paths of the files reused from the previous version by the
+        # delta publishes. None if the extract is not a delta publish.
+        self.reused_files = None
+        # relative posix path => hash of the files copied to the output. The
+        # relative path is empty for the single files. None if the output is
+        # written by the DCC.
+        self.output_hashes = None
+        # relative posix path => hash of the files of the previous output
+        # from its manifest. Set by the publisher.
+        self.previous_hashes = {}
 
     def process_settings(self):
         """Using the UI definitions exposed and global exposed settings, create the data dictionaries.
@@ -202,6 +220,8 @@ class ExtractCore:
     def extract(self):
         """Execute the extract."""
         func = self.category_functions.get(self.category, self._extract_default)
+        self.reused_files = None
+        self.output_hashes = None
         try:
             func()
             # self.update_live_branch()
@@ -233,6 +253,84 @@ class ExtractCore:
             )
         return output_path.as_posix()
 
+    def get_previous_output(self):
+        """Return the output path of the latest previous version.
+
+        Returns:
+            Path or None: The output of the highest version below the
+                current one in the extract folder. None if there is none.
+        """
+        current = re.search(r"v(\d+)$", self.version_string)
+        if not current or not self.extract_folder:
+            return None
+        suffix = "" if self.bundled else self.extension
+        pattern = re.compile(
+            rf"{re.escape(self.name.upper())}_{re.escape(self._extract_name)}_v(\d+){re.escape(suffix)}"
+        )
+        previous = {}
+        for path in Path(self.extract_folder).iterdir():
+            match = pattern.fullmatch(path.name)
+            if match and int(match.group(1)) < int(current.group(1)):
+                previous[int(match.group(1))] = path
+        return previous[max(previous)] if previous else None
+
+    def delta_copy(self, source_folder, compare_hash=False):
+        """Copy the folder to the output reusing the unchanged files of the previous version.
+
+        Bundled extracts can use this to make delta publishes. The unchanged
+        files are linked from the previous version and only the changed ones
+        are copied. Falls back to a full copy if there is no previous version.
+
+        Args:
+            source_folder (str or Path): The folder to publish.
+            compare_hash (bool): Compare the file contents instead of the
+                modified times. The files of the previous version are not
+                read if their hashes are in its manifest.
+
+        Returns:
+            str: The output folder.
+        """
+        output = self.resolve_output()
+        previous = self.get_previous_output()
+        if previous is None or not previous.is_dir():
+            return self.copy_output(source_folder)
+        engine = copier.CopyEngine(hash_files=True)
+        self.reused_files = copier.delta_copy(
+            source_folder, output, previous, compare_hash=compare_hash, engine=engine,
+            reference_hashes=self.previous_hashes,
+        )
+        self._set_output_hashes(engine)
+        LOG.info(
+            f"{len(self.reused_files)} files reused from {previous.name} for {Path(output).name}"
+        )
+        return output
+
+    def copy_output(self, source):
+        """Copy the file or folder to the output hashing it for the manifest.
+
+        Extracts publishing existing files should use this instead of
+        copying them with shutil. The files are read only once.
+
+        Args:
+            source (str or Path): The file or folder to publish.
+
+        Returns:
+            str: The output path.
+        """
+        output = self.resolve_output()
+        engine = copier.CopyEngine(hash_files=True)
+        engine.copy(source, output)
+        self._set_output_hashes(engine)
+        return output
+
+    def _set_output_hashes(self, engine):
+        """Keep the hashes of the copied files relative to the output."""
+        output = Path(self.resolve_output())
+        self.output_hashes = {
+            ("" if Path(path) == output else Path(path).relative_to(output).as_posix()): digest
+            for path, digest in engine.hashes.items()
+        }
+
     def _collect_bundle_info(self):
         """Collect bundle information and build the bundle info dictionary.
 
@@ -247,9 +345,16 @@ class ExtractCore:
         # get everything in the path as fileseq
         found_seqs = fileseq.findSequencesOnDisk(_path)
 
+        reused = set(self.reused_files or [])
         for seq in found_seqs:
             self._bundle_info[seq.basename()] = {
                 "extension": seq.extension(), # e.g ".txt"
                 "path": seq.format(), # e.g "file.txt" or "color.1009,1019.exr"
                 "sequential": bool(seq.frameRange()), # e.g True or False
             }
+            if self.reused_files is not None:
+                # files of the piece linked from the previous version
+                self._bundle_info[seq.basename()]["reused"] = sorted(
+                    Path(file_path).name for file_path in seq
+                    if Path(file_path).name in reused
+                )
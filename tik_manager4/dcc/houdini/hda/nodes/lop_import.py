@@ -21,7 +21,7 @@ class LopImportCallbacks(callbacks.Callbacks):
             parm.lock(True)
             return
 
-        abs_path = version_obj.get_element_path(element_type, relative=False)
+        abs_path = version_obj.get_element_path(element_type, relative=False, cached=False)
         abs_path = abs_path.replace(hda_node.parm("project").eval().replace("\\", "/"), hda_node.parm("project").rawValue(), 1)
         reference_node.parm("filepath1").set(abs_path, follow_parm_reference=False)
         sublayer_node.parm("filepath1").set(abs_path, follow_parm_reference=False)
@@ -30,7 +30,7 @@ class LopTextureImportCallbacks(callbacks.Callbacks):
         #     parm.lock(True)
             return
         #
-        abs_path = version_obj.get_element_path(element_type, relative=False)
+        abs_path = version_obj.get_element_path(element_type, relative=False, cached=False)
         print(abs_path)
         LOG.info(abs_path)
         #
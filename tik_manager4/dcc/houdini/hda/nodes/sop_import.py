@@ -22,7 +22,7 @@ class SopImportCallbacks(callbacks.Callbacks):
             parm.lock(True)
             return
 
-        abs_path = version_obj.get_element_path(element_type, relative=False)
+        abs_path = version_obj.get_element_path(element_type, relative=False, cached=False)
 
         # element type as key, [file node, switch value] as value
         switch_map = {
@@ -1,8 +1,10 @@
 """Extract all Textures."""
 
 from pathlib import Path
+import shutil
 import mari
 
+from tik_manager4.core import copier
 from tik_manager4.dcc.extract_core import ExtractCore
 
 
@@ -25,7 +27,16 @@ class TextureBundle(ExtractCore):
         """Extract method for any non-specified category"""
         _str_directory = self.resolve_output()
         bundle_directory = Path(_str_directory)
-        bundle_directory.mkdir(parents=True, exist_ok=True)
+        # export next to the bundle and publish only the changed textures
+        # if there is a previous version.
+        previous = self.get_previous_output()
+        export_directory = bundle_directory
+        if previous is not None:
+            export_directory = bundle_directory.with_name(
+                bundle_directory.name + copier.STAGING_SUFFIX
+            )
+            shutil.rmtree(export_directory, ignore_errors=True)
+        export_directory.mkdir(parents=True, exist_ok=True)
         export_items = []
         for geo in self.collect():
             channels = geo.channelList()
@@ -36,4 +47,9 @@ class TextureBundle(ExtractCore):
                 export_items.append(export_item)
                 mari.exports.addExportItem(export_item, geo)
 
-        mari.exports.exportTextures(export_items, bundle_directory.as_posix(), ShowProgressDialog=True)
\ No newline at end of file
+        mari.exports.exportTextures(export_items, export_directory.as_posix(), ShowProgressDialog=True)
+        if previous is not None:
+            # the textures are written again. Only the contents can tell the changes.
+            # The previous textures are compared with the hashes in its manifest.
+            self.delta_copy(export_directory, compare_hash=True)
+            shutil.rmtree(export_directory, ignore_errors=True)
\ No newline at end of file
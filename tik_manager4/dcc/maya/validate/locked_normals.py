@@ -19,7 +19,7 @@ class LockedNormals(ValidateCore):
 
     def collect(self):
         """Collect all meshes."""
-        self.collection = cmds.ls(type="mesh")
+        self.collection = self.get_cached("meshes", lambda: cmds.ls(type="mesh"))
 
     def validate(self):
         """Check if the normals are locked for the meshes."""
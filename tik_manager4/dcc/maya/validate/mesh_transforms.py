@@ -18,7 +18,7 @@ class MeshTransform(ValidateCore):
 
     def collect(self):
         """Collect all mesh transforms in the scene."""
-        all_meshes = cmds.ls(type="mesh")
+        all_meshes = self.get_cached("meshes", lambda: cmds.ls(type="mesh"))
         self.collection = [cmds.listRelatives(mesh, parent=True)[0] for mesh in all_meshes]
 
     def _check_frozen(self, mesh_transform):
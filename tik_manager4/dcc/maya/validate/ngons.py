@@ -19,7 +19,7 @@ class Ngons(ValidateCore):
 
     def collect(self):
         """Collect all meshes in the scene."""
-        self.collection = cmds.ls(type="mesh")
+        self.collection = self.get_cached("meshes", lambda: cmds.ls(type="mesh"))
 
     def validate(self):
         """Identify the ngons in the scene."""
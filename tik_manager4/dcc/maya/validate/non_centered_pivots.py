@@ -18,7 +18,7 @@ class NonCenteredPivots(ValidateCore):
 
     def collect(self):
         """Collect all mesh transforms in the scene."""
-        self.collection = cmds.ls(type="transform")
+        self.collection = self.get_cached("transforms", lambda: cmds.ls(type="transform"))
 
     def validate(self):
         """Validate unique names in Maya scene."""
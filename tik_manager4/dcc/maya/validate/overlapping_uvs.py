@@ -20,7 +20,7 @@ class OverlappingUvs(ValidateCore):
 
     def collect(self):
         """Collect all meshes in the scene."""
-        self.collection = cmds.ls(type="mesh")
+        self.collection = self.get_cached("meshes", lambda: cmds.ls(type="mesh"))
 
     def validate(self):
         """Validate."""
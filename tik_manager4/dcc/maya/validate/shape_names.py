@@ -20,7 +20,7 @@ class ShapeNames(ValidateCore):
 
     def collect(self):
         """Collect all transform nodes in the scene."""
-        self.collection = cmds.ls(type="transform")
+        self.collection = self.get_cached("transforms", lambda: cmds.ls(type="transform"))
 
     def validate(self):
         """Validate the shape names."""
@@ -27,7 +27,9 @@ class UdimCrossingUvs(ValidateCore):
 
     def collect(self):
         """Collect all meshes in the scene."""
-        self.collection = cmds.ls(type="mesh", long=True)
+        self.collection = self.get_cached(
+            "long_meshes", lambda: cmds.ls(type="mesh", long=True)
+        )
 
     def validate(self):
         """Validate."""
@@ -21,7 +21,7 @@ class UniqueNames(ValidateCore):
 
     def collect(self):
         """Collect data"""
-        self.collection = cmds.ls() # everything in the scene
+        self.collection = self.get_cached("nodes", cmds.ls) # everything in the scene
 
     def validate(self):
         """Validate unique names in Maya scene."""
@@ -1,5 +1,4 @@
 from pathlib import Path
-import shutil
 
 from tik_manager4.dcc.extract_core import ExtractCore
 
@@ -8,6 +7,7 @@ class Snapshot(ExtractCore):
 
     nice_name = "Snapshot"
     color = (255, 255, 255)
+    thread_safe = True
 
     def __init__(self):
         super().__init__()
@@ -23,6 +23,4 @@ class Snapshot(ExtractCore):
 
     def _extract_default(self):
         """Extract method for any non-specified category"""
-        _file_path = self.resolve_output()
-        shutil.copyfile(self._source_path, _file_path)
-        return _file_path
\ No newline at end of file
+        return self.copy_output(self._source_path)
\ No newline at end of file
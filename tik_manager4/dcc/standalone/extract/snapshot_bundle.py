@@ -8,10 +8,27 @@ class SnapshotBundle(ExtractCore):
 
     nice_name = "Snapshot Bundle"
     color = (255, 255, 255)
+    thread_safe = True
     bundled = True
 
     def __init__(self):
-        super().__init__()
+        global_exposed_settings = {
+            "delta_publish": {
+                "display_name": "Delta Publish",
+                "type": "boolean",
+                "value": True,
+                "tooltip": "Reuse the unchanged files of the previous version "
+                           "instead of copying them again.",
+            },
+            "compare_hash": {
+                "display_name": "Compare File Contents",
+                "type": "boolean",
+                "value": False,
+                "tooltip": "Compare the contents of the files instead of the "
+                           "modified times. Slower but safer.",
+            },
+        }
+        super().__init__(global_exposed_settings=global_exposed_settings)
         self._source_path = None
 
     @property
@@ -27,5 +44,9 @@ class SnapshotBundle(ExtractCore):
         _folder_path = self.resolve_output()
         # first delete the folder if it exists
         shutil.rmtree(_folder_path, ignore_errors=True)
-        shutil.copytree(self._source_path, _folder_path)
-        return _folder_path
\ No newline at end of file
+        if self.global_settings.get_property("delta_publish", True):
+            return self.delta_copy(
+                self._source_path,
+                compare_hash=self.global_settings.get_property("compare_hash", False),
+            )
+        return self.copy_output(self._source_path)
@@ -1,15 +1,59 @@
 """Core class for validations."""
 
 import importlib
+import threading
 from pathlib import Path
 from tik_manager4.objects.metadata import Metadata
 
 
+class CollectCache:
+    """Scene data collected once and shared by the validators.
+
+    The publisher creates a new cache for each validation run, so the
+    collected data never outlives the scene state it is collected from.
+    """
+
+    def __init__(self):
+        """Initialize the cache."""
+        self._lock = threading.Lock()
+        self._data = {}
+        self._key_locks = {}
+
+    def get(self, key, factory):
+        """Return the cached value or collect it with the factory.
+
+        The factory is called only once for each key, even if the value is
+        requested from multiple threads at the same time.
+
+        Args:
+            key (str): The key of the collected data. e.g. "meshes".
+            factory (callable): Function returning the data.
+
+        Returns:
+            object: The collected data.
+        """
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._data:
+                    return self._data[key]
+            value = factory()
+            with self._lock:
+                self._data[key] = value
+        return value
+
+
 class ValidateCore:
     """Core class for validations."""
 
     nice_name: str = ""
     checked_by_default: bool = True
+    thread_safe: bool = False
+    # thread safe validators run concurrently after their collect method.
+    # Their validate method must only read the collected data.
 
     def __init__(self, *args, **kwargs):
         """Initialize class."""
@@ -28,6 +72,9 @@ class ValidateCore:
         self._state: str = "idle"
         self._fail_message: str = ""
 
+        self.scene_cache = None  # CollectCache shared during a validation run
+        self.wall_time: float = 0.0  # seconds spent in the last validation
+
     def __init_subclass__(cls, **kwargs):
         # Get the base name of the file without the extension using pathlib
         module = importlib.import_module(cls.__module__)
@@ -74,6 +121,22 @@ class ValidateCore:
         else:
             raise ValueError("Validation is not ignorable.")
 
+    def get_cached(self, key, factory):
+        """Return the scene data shared by the validators of the same run.
+
+        Outside a validation run the data is collected every time.
+
+        Args:
+            key (str): The key of the collected data. e.g. "meshes".
+            factory (callable): Function collecting the data.
+
+        Returns:
+            object: The collected data. Must not be modified.
+        """
+        if self.scene_cache is None:
+            return factory()
+        return self.scene_cache.get(key, factory)
+
     def collect(self):
         """Collect the objects related to the validation.
 
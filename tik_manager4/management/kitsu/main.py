@@ -327,7 +327,9 @@ class ProductionPlatform(ManagementCore):
 
         self.tik_main.project.settings.apply_settings(force=True)
 
-        self.force_sync(project_id=kitsu_project_id)
+        # write the structure and the task files once at the end.
+        with self.tik_main.project.batch():
+            self.force_sync(project_id=kitsu_project_id)
 
         if not set_project: # switch back to the original project
             self.tik_main.set_project(current_project_path)
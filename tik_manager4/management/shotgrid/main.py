@@ -274,11 +274,13 @@ class ProductionPlatform(ManagementCore):
 
         ####
 
-        for asset in all_assets:
-            self._sync_new_asset(asset, assets_sub, asset_categories)
+        # write the structure and the task files once at the end.
+        with self.tik_main.project.batch():
+            for asset in all_assets:
+                self._sync_new_asset(asset, assets_sub, asset_categories)
 
-        for shot in all_shots:
-            self._sync_new_shot(shot, shots_sub, shot_categories)
+            for shot in all_shots:
+                self._sync_new_shot(shot, shots_sub, shot_categories)
 
         # tag the project as management driven
         self.tik_main.project.settings.edit_property("management_driven", True)
@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+from tik_manager4.core import manifest
 from tik_manager4.core import utils
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.entity import Entity
@@ -118,34 +119,63 @@ class LocalizeMixin(Entity):
         else:
             super().show_database_folder()
 
-    def sync(self):
+    def sync(self, progress_callback=None, throttle=None):
         """Sync the entity to the origin.
 
         This will copy the entity to the origin path. Sync is single direction.
+        Use the SyncQueue of the project to sync in the background.
+
+        Args:
+            progress_callback (callable, optional): Function accepting a
+                CopyProgress object of each moved element.
+            throttle (Throttle, optional): Limits the transfer rate.
+
+        Returns:
+            tuple: (bool, str or list) State and the message or the errors.
         """
         if not self.localized:
             LOG.error("Entity is not localized.")
-            return False
+            return False, "Entity is not localized."
         LOG.info("Syncing...")
         if self.object_type == ObjectType.WORK_VERSION:
-            ret, msg = utils.move(self.localized_path,  self.get_abs_project_path(), force=False)
+            ret, msg = utils.move(
+                self.localized_path,
+                self.get_abs_project_path(),
+                force=False,
+                progress_callback=progress_callback,
+                throttle=throttle,
+            )
             if not ret:
                 return False, msg
-            self._localized = False
-            self._localized_path = ""
+            self.mark_synced()
         elif self.object_type == ObjectType.PUBLISH_VERSION:
             # before moving, validate all paths
             publish_base = Path(self.localized_path)
-            sources = [publish_base / el["path"] for el in
-                       self._elements]
-            targets = [Path(self.get_abs_project_path(el["path"])) for el in
-                       self._elements]
+            entries = manifest.read(manifest.get_manifest_path(self.settings_file))
+            sources = []
+            targets = []
+            for el in self._elements:
+                source = publish_base / el["path"]
+                target = Path(self.get_abs_project_path(el["path"]))
+                # already at the origin. e.g. an interrupted sync.
+                if entries and target.exists() and manifest.matches_copy(target, entries, el["path"]):
+                    LOG.info(f"{target.name} is already synced. Skipping.")
+                    utils.delete(source)
+                    continue
+                sources.append(source)
+                targets.append(target)
             list_of_errors = list(self.validate_paths(sources, targets))
             if list_of_errors:
                 return False, list_of_errors
 
             for source, target in zip(sources, targets):
-                ret, msg = utils.move(source.as_posix(), target.as_posix(), force=False)
+                ret, msg = utils.move(
+                    source.as_posix(),
+                    target.as_posix(),
+                    force=False,
+                    progress_callback=progress_callback,
+                    throttle=throttle,
+                )
                 if not ret:
                     return False, msg
             self._localized = False
@@ -159,6 +189,14 @@ class LocalizeMixin(Entity):
             return False, msg
         return True, "Sync successful."
 
+    def mark_synced(self):
+        """Forget the local copy after the entity is moved to the origin.
+
+        Only the object is changed. The caller writes the database file.
+        """
+        self._localized = False
+        self._localized_path = ""
+
     # A helper function to validate paths before attempting the actual move
     def validate_paths(self, sources, targets):
         """Validate that all source files exist and can be moved to target locations."""
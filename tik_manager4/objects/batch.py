@@ -0,0 +1,150 @@
+"""Batched creation of subprojects and tasks.
+
+Inside a batch, the project structure is not written and the folders are
+not created for each new subproject. The task files are not written either.
+All of them are done once when the batch is committed and the task files
+are written in parallel.
+
+Example:
+    with project.batch() as batch:
+        shots = project.create_sub_project("Shots", parent_path="")
+        for name in shot_names:
+            shots.add_task(name, categories=["Animation"])
+    print(batch.failed)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, NamedTuple
+
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+
+class BatchResult(NamedTuple):
+    """Result of a single item of the batch."""
+
+    action: str
+    name: str
+    success: bool
+    # the created object if successful, the reason of the failure otherwise
+    value: Any
+
+
+def recorded(action):
+    """Record the results of the decorated method to the active batch.
+
+    The decorated method must be a method of a subproject taking the name
+    of the item as the first argument and returning -1 on failure.
+
+    Args:
+        action (str): The name of the action to record.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            project = self.get_project()
+            batch = project.active_batch if project else None
+            if batch:
+                name = args[0] if args else kwargs.get("name")
+                batch.record(action, name, result)
+            return result
+        return wrapper
+    return decorator
+
+
+class Batch:
+    """Collect the deferred writes and the results of a batch."""
+
+    max_workers = 8
+
+    def __init__(self, max_workers=None):
+        """Initialize the batch.
+
+        Args:
+            max_workers (int, optional): Maximum number of threads writing
+                the task files.
+        """
+        self.max_workers = max_workers or self.max_workers
+        self.results = []
+        self.structure_changed = False
+        self.new_subs = []
+        self._tasks = {}  # settings file => (task, force)
+
+    @property
+    def failed(self):
+        """The results of the failed items."""
+        return [result for result in self.results if not result.success]
+
+    def record(self, action, name, value):
+        """Record the result of an item.
+
+        Args:
+            action (str): The name of the action.
+            name (str): The name of the item.
+            value (object): The created object or -1 if failed.
+        """
+        success = not isinstance(value, int) or value != -1
+        if not success:
+            value = "Failed. See the log for details."
+        self.results.append(BatchResult(action, name, success, value))
+
+    def defer_structure(self):
+        """Write the project structure when the batch is committed."""
+        self.structure_changed = True
+
+    def defer_folders(self, sub):
+        """Create the folders of the subproject when the batch is committed."""
+        self.new_subs.append(sub)
+
+    def defer_task(self, task, force=False):
+        """Write the task file when the batch is committed.
+
+        Args:
+            task (Task): The task to write.
+            force (bool): Write the task file even if it is not changed.
+        """
+        key = str(task.settings_file)
+        _, forced = self._tasks.get(key, (None, False))
+        self._tasks[key] = (task, force or forced)
+
+    def is_pending(self, file_path):
+        """Return True if the task file is waiting to be written."""
+        return str(file_path) in self._tasks
+
+    @staticmethod
+    def _write_task(task, force):
+        """Write the task file and return the error message if failed."""
+        try:
+            task.apply_settings(force=force)
+        except Exception as exc:  # pylint: disable=broad-except
+            return str(exc)
+        return None
+
+    def write_tasks(self):
+        """Write the deferred task files in parallel.
+
+        The results of the tasks failed to write are updated.
+
+        Returns:
+            int: Number of task files failed to write.
+        """
+        pending = list(self._tasks.values())
+        self._tasks = {}
+        if not pending:
+            return 0
+        tasks, forces = zip(*pending)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            errors = list(executor.map(self._write_task, tasks, forces))
+        failures = {}
+        for task, error in zip(tasks, errors):
+            if error:
+                LOG.error(f"Cannot write the task {task.name}: {error}")
+                failures[id(task)] = error
+        for position, result in enumerate(self.results):
+            error = failures.get(id(result.value))
+            if error:
+                self.results[position] = result._replace(success=False, value=error)
+        return len(failures)
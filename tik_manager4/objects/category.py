@@ -12,6 +12,7 @@ from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.work import Work
 from tik_manager4.core import filelog
+from tik_manager4.core import snapshot
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -19,12 +20,16 @@ LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 class Category(Entity):
     """Category object to handle works and publishes under a task."""
     object_type = ObjectType.CATEGORY
+    # profiling counters shared by all categories
+    scan_statistics = {"scans": 0, "avoided": 0}
+
     def __init__(self, parent_task, definition=None, **kwargs):
         """Initializes the Category object."""
         super().__init__(**kwargs)
         definition = definition or {}
         self._works = {}
         self._publishes = {}
+        self._scan_epoch = None  # refresh epoch of the last scan
         self.type = definition.get("type", None)
         self.display_name = definition.get("display_name", None)
         self.validations = definition.get("validate", [])
@@ -34,8 +39,12 @@ class Category(Entity):
 
     @property
     def works(self):
-        """Return the works under the category."""
-        self.scan_works()
+        """Return the works under the category.
+
+        The works are scanned once per refresh epoch. Use refresh() to
+        force reading the disk state.
+        """
+        self._scan_if_stale()
         # filter the works that have at least one non-deleted version
         valid_works = {key: value for key, value in self._works.items() if value.has_valid_versions()}
         return valid_works
@@ -43,9 +52,45 @@ class Category(Entity):
     @property
     def all_works(self):
         """Return all the works under the category."""
-        self.scan_works()
+        self._scan_if_stale()
         return self._works
 
+    @classmethod
+    def get_scan_statistics(cls):
+        """Return the number of the performed and avoided work scans."""
+        return dict(cls.scan_statistics)
+
+    @classmethod
+    def reset_scan_statistics(cls):
+        """Reset the scan counters."""
+        cls.scan_statistics.update(scans=0, avoided=0)
+
+    def _scan_if_stale(self):
+        """Scan the works only if they are not scanned in the current epoch."""
+        if self._scan_epoch == self.guard.refresh_epoch:
+            self.scan_statistics["avoided"] += 1
+            return
+        self.scan_works()
+
+    def refresh(self):
+        """Rescan the category folder and return the works."""
+        return self.scan_works()
+
+    def invalidate(self):
+        """Mark the cached works as stale. Next access rescans the folder."""
+        self._scan_epoch = None
+
+    def cache_work(self, work):
+        """Put the written work object into the cache.
+
+        Keeps the cached works up to date without a rescan when the work
+        files are written by the objects of this session.
+
+        Args:
+            work (Work): The work object.
+        """
+        self._works[Path(work.settings_file)] = work
+
     def get_works_by_wildcard(self, wildcard):
         """Return a list of works that match the wildcard.
 
@@ -69,23 +114,55 @@ class Category(Entity):
         """
         # get all files recursively, regardless of the dcc
         search_dir = self.get_abs_database_path()
-        _work_paths = list(Path(search_dir).rglob("**/*.twork"))
+        _snapshots = {
+            _snapshot.path: _snapshot
+            for _snapshot in snapshot.scan_directory(search_dir, ".twork", recursive=True)
+        }
 
         # add the file if it is new. if it is not new,
         # check the modified time and update if necessary
         for w_path, _w_data in dict(self._works).items():
-            if w_path not in _work_paths:
+            if w_path not in _snapshots:
                 self._works.pop(w_path)
-        for _work_path in _work_paths:
+        for _work_path, _snapshot in _snapshots.items():
             existing_work = self._works.get(_work_path, None)
             if not existing_work:
                 work = Work(absolute_path=_work_path, parent_task=self.parent_task)
                 self._works[_work_path] = work
             else:
-                if existing_work.is_modified():
+                if existing_work.is_modified(snapshot=_snapshot):
                     existing_work.reload()
+        self._scan_epoch = self.guard.refresh_epoch
+        self.scan_statistics["scans"] += 1
         return self._works
 
+    def invalidate_database_file(self, file_path):
+        """Update the cached work or publish of the changed database file.
+
+        Args:
+            file_path (str or Path): The changed .twork, .tpub, live.json or
+                promoted.json file under the category.
+
+        Returns:
+            object: The reloaded object or the rescanned container. None if
+                nothing is cached for the file.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix == ".twork":
+            work = self._works.get(file_path)
+            if work and file_path.exists():
+                if work.is_modified():
+                    work.reload()
+                return work
+            self.scan_works()
+            return self
+        # publish files live in <work folder>/publish/<work name>/
+        publish_folder = file_path.parent
+        work = self._works.get(publish_folder.parent.parent / f"{publish_folder.name}.twork")
+        if not work or not work.publish:
+            return None
+        return work.publish.invalidate_publish_file(file_path)
+
     def is_empty(self):
         """Check if the category is empty.
 
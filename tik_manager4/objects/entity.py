@@ -18,6 +18,7 @@ class Entity:
     """Base class for all Tik Manager entities."""
     object_type = ObjectType.ENTITY
     guard = Guard()
+    _path_cache = None  # (relative path, posix path) of the last path query
 
     def __init__(self, name="", uid=None):
         """Initializes the Entity class.
@@ -46,7 +47,11 @@ class Entity:
     @property
     def path(self):
         """Return the relative path of the entity."""
-        return str(Path(self._relative_path).as_posix())
+        cached = self._path_cache
+        if cached is None or cached[0] != self._relative_path:
+            cached = (self._relative_path, str(Path(self._relative_path).as_posix()))
+            self._path_cache = cached
+        return cached[1]
 
     @path.setter
     def path(self, val):
@@ -96,6 +101,36 @@ class Entity:
             return -1
         return 1
 
+    def update_index(self):
+        """Record the database file of the entity into the project index.
+
+        Only applies to the entities backed by a database file and only when
+        the project index is enabled.
+
+        Returns:
+            bool: True if the entity is recorded, False otherwise.
+        """
+        index = self.guard.project_index
+        settings_file = getattr(self, "settings_file", None)
+        if not index or not settings_file:
+            return False
+        return index.record(settings_file, self.properties, mtime=self.date_modified)
+
+    def remove_from_index(self):
+        """Remove the database file of the entity from the project index.
+
+        Call it when the database file is deleted. Marking the entity as
+        deleted does not need it, the index is updated with the file.
+
+        Returns:
+            bool: True if the entry is removed, False otherwise.
+        """
+        index = self.guard.project_index
+        settings_file = getattr(self, "settings_file", None)
+        if not index or not settings_file:
+            return False
+        return index.remove(settings_file)
+
     def get_abs_database_path(self, *args):
         """Return the absolute database path for the entity.
 
@@ -22,6 +22,11 @@ class Guard:
     commons = None
     _dcc_handler = None
     _management_handler = None
+    _project_index = None
+    _database_watcher = None
+    _sync_queue = None
+    _read_cache = None
+    _refresh_epoch = 0
 
     @classmethod
     def set_commons(cls, commons):
@@ -101,6 +106,77 @@ class Guard:
         """
         cls._management_handler = handler
 
+    @property
+    def project_index(self):
+        """Return the project index object if enabled."""
+        return self._project_index
+
+    @classmethod
+    def set_project_index(cls, index):
+        """Set the project index object.
+
+        Args:
+            index (ProjectIndex): The project index object or None.
+        """
+        cls._project_index = index
+
+    @property
+    def database_watcher(self):
+        """Return the database watcher object if enabled."""
+        return self._database_watcher
+
+    @classmethod
+    def set_database_watcher(cls, watcher):
+        """Set the database watcher object.
+
+        Args:
+            watcher (DatabaseWatcher): The database watcher object or None.
+        """
+        cls._database_watcher = watcher
+
+    @property
+    def sync_queue(self):
+        """Return the background sync queue of the localized versions."""
+        return self._sync_queue
+
+    @classmethod
+    def set_sync_queue(cls, sync_queue):
+        """Set the sync queue object.
+
+        Args:
+            sync_queue (SyncQueue): The sync queue object or None.
+        """
+        cls._sync_queue = sync_queue
+
+    @property
+    def read_cache(self):
+        """Return the local read cache of the published elements."""
+        return self._read_cache
+
+    @classmethod
+    def set_read_cache(cls, read_cache):
+        """Set the read cache object.
+
+        Args:
+            read_cache (ReadCache): The read cache object or None.
+        """
+        cls._read_cache = read_cache
+
+    @property
+    def refresh_epoch(self):
+        """Return the current refresh epoch of the cached database objects."""
+        return self._refresh_epoch
+
+    @classmethod
+    def new_refresh_epoch(cls):
+        """Start a new refresh epoch. All cached scans become stale.
+
+        Returns:
+            int: The new epoch.
+        """
+        cls._refresh_epoch += 1
+        return cls._refresh_epoch
+
     @classmethod
     def set_user(cls, user):
         """Set the user name.
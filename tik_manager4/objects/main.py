@@ -254,7 +254,7 @@ class Main:
             self.log.warning("This user does not have rights to perform this action")
             return False
 
-        current_structure = self.project.structure.copy_data()
+        current_structure = self.project.get_sub_tree()
         # go through the structure and remove the ids
         filtered_structure = utils.remove_key(current_structure, "id")
         filtered_structure["name"] = template_name
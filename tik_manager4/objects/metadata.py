@@ -1,26 +1,80 @@
-"""Module to hold and manage metadata."""
+"""Module to hold and manage metadata.
+
+Metadata objects are chained like collections.ChainMap. Each object stores
+only its own items and resolves the rest through the parent chain. The
+resolved view is cached and rebuilt only when the object or one of its
+ancestors is changed.
+"""
+from collections.abc import Mapping
 import dataclasses
 from typing import Union
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class Metaitem:
-    """Hold the value and overridden status of a property."""
+    """Hold the value and overridden status of a property.
+
+    The items are shared between the resolved views of the chained
+    metadata objects. Use Metadata.add_item to change them.
+    """
     value: Union[str, int, float, bool, list, dict, None]
     overridden: bool
 
-class Metadata(dict):
+class Metadata(Mapping):
     """Metadata class."""
-    def __init__(self, data_dictionary):
+    def __init__(self, data_dictionary=None, parent=None):
         """Initialize Metadata object.
         Args:
             data_dictionary (dict): The dictionary to initialize the metadata with.
+            parent (Metadata, optional): The metadata to inherit the
+                missing keys from.
         """
-        super().__init__(data_dictionary)
+        self._parent = parent
+        self._items = {}  # own items. key => Metaitem
+        self._view = None  # resolved items. key => Metaitem
+        self._view_parent = None  # the parent view the cached view is built on
 
         # create a Metaitem for each key in the data_dictionary
-        for key, val in data_dictionary.items():
-            self.add_item(key, val)
+        for key, val in (data_dictionary or {}).items():
+            self._items[key] = Metaitem(val, overridden=False)
+
+    @property
+    def parent(self):
+        """The parent metadata."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, metadata):
+        self._parent = metadata
+        self._view = None
+
+    def _resolved(self):
+        """Return the resolved items including the inherited ones."""
+        parent_view = self._parent._resolved() if self._parent is not None else None
+        if self._view is None or parent_view is not self._view_parent:
+            view = {}
+            for key, item in (parent_view or {}).items():
+                # inherited items are never overridden on this level.
+                view[key] = item if not item.overridden else Metaitem(item.value, overridden=False)
+            view.update(self._items)
+            self._view = view
+            self._view_parent = parent_view
+        return self._view
+
+    def __getitem__(self, key):
+        return self._resolved()[key]
+
+    def __contains__(self, key):
+        return key in self._resolved()
+
+    def __iter__(self):
+        return iter(self._resolved())
+
+    def __len__(self):
+        return len(self._resolved())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.get_all_items())})"
 
     def add_item(self, key, value, overridden=False):
         """Add an item to the metadata.
@@ -34,14 +88,19 @@ class Metadata(dict):
         Returns:
             Metaitem: The Metaitem object that was created.
         """
-        self[key] = Metaitem(value, overridden=overridden)
-        return self[key]
+        self._items[key] = Metaitem(value, overridden=overridden)
+        self._view = None
+        return self._items[key]
 
     def get_all_items(self):
         """Return all items in the metadata."""
-        for key, val in self.items():
+        for key, val in self._resolved().items():
             yield key, val.value
 
+    def get_overrides(self):
+        """Return the overridden items of this level as a dictionary."""
+        return {key: item.value for key, item in self._items.items() if item.overridden}
+
     def get_value(self, key, fallback_value=None):
         """Get the value of a key.
 
@@ -49,8 +108,9 @@ class Metadata(dict):
             key (str): The key to get the value of.
             fallback_value (any): The value to return if the key is not found.
         """
-        if key in self:
-            return self[key].value
+        item = self._resolved().get(key)
+        if item is not None:
+            return item.value
         return fallback_value
 
     def is_overridden(self, key):
@@ -62,8 +122,9 @@ class Metadata(dict):
         Returns:
             bool: True if the key is overridden, False otherwise.
         """
-        if key in self:
-            return self[key].overridden
+        item = self._resolved().get(key)
+        if item is not None:
+            return item.overridden
         return False
 
     def override(self, data_dictionary):
@@ -72,17 +133,17 @@ class Metadata(dict):
         Args:
             data_dictionary (dict): The dictionary to override the metadata with.
         """
-        # clear metadata
         for key, data in data_dictionary.items():
-            self[key] = Metaitem(data, overridden=True)
+            self._items[key] = Metaitem(data, overridden=True)
+        self._view = None
 
     def copy(self):
-        """Return a copy of the metadata."""
+        """Return a detached copy of the metadata."""
         return Metadata(dict(self.get_all_items()))
 
     def exists(self, key):
         """Check if the key exists."""
-        return key in self
+        return key in self._resolved()
 
 class FilteredData(dict):
     """Class to filter the overridden and new data."""
@@ -3,20 +3,43 @@
 Inherits from Subproject and adds project specific methods and properties.
 """
 
+import json
+from contextlib import contextmanager
 from pathlib import Path
+from typing import NamedTuple
 
 from tik_manager4.core.constants import ObjectType
+from tik_manager4.objects.batch import Batch, recorded
 from tik_manager4.objects.publisher import Publisher, SnapshotPublisher
 from tik_manager4.core import filelog
+from tik_manager4.core import index
+from tik_manager4.core import io
+from tik_manager4.core.read_cache import ReadCache
+from tik_manager4.core import watcher
 from tik_manager4.core.settings import Settings
 from tik_manager4.objects.subproject import Subproject
+from tik_manager4.objects.sync_queue import SyncQueue
 from tik_manager4.objects.work import Work
 
+# key of the changes appended to the journaled structure file
+STRUCTURE_CHANGES_KEY = "structure_changes"
+
+
+class SceneEntry(NamedTuple):
+    """The work and version of a scene file in the reverse lookup."""
+
+    work_id: int
+    version_number: int
+    work_file: str
+
 
 class Project(Subproject):
     """Project class to handle project specific data and methods."""
     object_type = ObjectType.PROJECT
     log = filelog.Filelog(logname=__name__, filename="tik_manager4")
+    # number of appended structure changes before the file is compacted
+    structure_slack = 200
+
     def __init__(self, path=None, name=None):
         """Initializes the Project class.
 
@@ -34,6 +57,19 @@ class Project(Subproject):
         self.preview_settings = Settings()
         self.category_definitions = Settings()
         self.metadata_definitions = Settings()
+        self.index = None
+        self.watcher = None
+        self._structure_io = None
+        self._batch = None
+        # number of appended structure changes. None if not journaled.
+        self._structure_changes = None
+        # lookup maps for the subprojects and tasks of the whole hierarchy
+        self._subs_by_id = {}
+        self._subs_by_path = {}
+        self._tasks_by_id = {}
+        # reverse lookup of the scene files relative to the project root
+        self._works_by_scene = {}
+        self._scenes_by_work = {}
         self._path = path
         self._database_path = None
         self._name = name
@@ -69,15 +105,237 @@ class Project(Subproject):
         # We are overriding the method to return the project itself
         return self
 
+    def clear_lookups(self):
+        """Clear the subproject and task lookup maps."""
+        self._subs_by_id = {}
+        self._subs_by_path = {}
+        self._tasks_by_id = {}
+
+    def register_sub(self, sub):
+        """Register the subproject to the lookup maps.
+
+        Args:
+            sub (Subproject): The subproject to register.
+        """
+        self._subs_by_id[sub.id] = sub
+        self._subs_by_path[sub.path] = sub
+
+    def unregister_sub(self, sub):
+        """Remove the subproject, its children and their tasks from the lookup maps.
+
+        Args:
+            sub (Subproject): The subproject to unregister.
+        """
+        stack = [sub]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.subs.values())
+            if self._subs_by_id.get(current.id) is current:
+                del self._subs_by_id[current.id]
+            if self._subs_by_path.get(current.path) is current:
+                del self._subs_by_path[current.path]
+            for task in current.all_tasks.values():
+                self.unregister_task(task)
+
+    def register_task(self, task):
+        """Register the task to the lookup maps.
+
+        Args:
+            task (Task): The task to register.
+        """
+        self._tasks_by_id[task.id] = task
+
+    def unregister_task(self, task):
+        """Remove the task from the lookup maps.
+
+        Args:
+            task (Task): The task to unregister.
+        """
+        if self._tasks_by_id.get(task.id) is task:
+            del self._tasks_by_id[task.id]
+
+    def lookup_sub_by_id(self, uid):
+        """Return the registered subproject with the given id or None."""
+        sub = self._subs_by_id.get(uid)
+        return sub if sub and sub.id == uid else None
+
+    def lookup_sub_by_path(self, path):
+        """Return the registered subproject with the given path or None."""
+        sub = self._subs_by_path.get(path)
+        return sub if sub and sub.path == path else None
+
+    def lookup_task(self, uid):
+        """Return the registered task with the given id or None."""
+        return self._tasks_by_id.get(uid)
+
+    def _get_scene_key(self, file_path):
+        """Return the scene file path relative to the project root or None.
+
+        Localized scene files resolve to the same key as the originals.
+        """
+        relative_path = self.__get_relative_path(Path(file_path))
+        return relative_path.as_posix() if relative_path else None
+
+    def _get_scene_entries(self, work):
+        """Return the scene keys and version numbers of the work versions."""
+        entries = {}
+        for nmb, version in enumerate(work.versions):
+            version_number = version.version or nmb
+            entries[Path(work.path, version.scene_path).as_posix()] = version_number
+            localized_key = version.localized_path and self._get_scene_key(
+                version.localized_path
+            )
+            if localized_key:
+                entries[localized_key] = version_number
+        return entries
+
+    def register_work(self, work):
+        """Register the scene files of the work versions to the reverse lookup.
+
+        The entries of the deleted versions are removed.
+
+        Args:
+            work (Work): The work to register.
+
+        Returns:
+            dict: The registered scene keys and version numbers.
+        """
+        for scene_key in self._scenes_by_work.pop(work.id, ()):
+            entry = self._works_by_scene.get(scene_key)
+            if entry and entry.work_id == work.id:
+                del self._works_by_scene[scene_key]
+        entries = self._get_scene_entries(work)
+        work_file = Path(work.settings_file).as_posix()
+        for scene_key, version_number in entries.items():
+            self._works_by_scene[scene_key] = SceneEntry(
+                work.id, version_number, work_file
+            )
+        self._scenes_by_work[work.id] = set(entries)
+        return entries
+
+    @property
+    def active_batch(self):
+        """The batch collecting the deferred writes or None."""
+        return self._batch
+
+    @contextmanager
+    def batch(self, max_workers=None):
+        """Defer the structure, folder and task writes until the end.
+
+        The subprojects and tasks created inside the context are written
+        at once when the context exits. The task files are written in
+        parallel. Nested batches are merged into the outermost one.
+
+        Example:
+            with project.batch() as batch:
+                sub = project.create_sub_project("Shots", parent_path="")
+                sub.add_task("SH010", categories=["Animation"])
+            failed = batch.failed
+
+        Args:
+            max_workers (int, optional): Maximum number of threads writing
+                the task files.
+
+        Yields:
+            Batch: The batch object holding the per item results.
+        """
+        if self._batch:
+            yield self._batch
+            return
+        self._batch = Batch(max_workers=max_workers)
+        try:
+            yield self._batch
+        finally:
+            # the created objects are already in the hierarchy. Write them
+            # even if the batch is interrupted.
+            batch, self._batch = self._batch, None
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        """Write the deferred changes of the batch.
+
+        Args:
+            batch (Batch): The batch to commit.
+        """
+        if batch.structure_changed:
+            self._write_structure()
+        new_ids = {sub.id for sub in batch.new_subs}
+        for sub in batch.new_subs:
+            # the folders of the children are created with the parents.
+            if sub.parent and sub.parent.id in new_ids:
+                continue
+            sub.create_folders(self.database_path)
+            sub.create_folders(self.absolute_path)
+        failed = batch.write_tasks()
+        self.log.info(
+            f"Batch committed with {len(batch.results)} items. {failed} task files failed to write."
+        )
+
     def save_structure(self):
         """Save the project structure to the database.
 
         Project structure is the tree of subprojects.
         """
-        self.structure._current_value = self.get_sub_tree()
         self.create_folders(root=self.database_path)
         self.create_folders(root=self.absolute_path)
-        self.structure.apply_settings()
+        self._write_structure()
+
+    def _is_structure_journaled(self):
+        """Return True if the structure changes are appended as a journal."""
+        return bool(self.settings.get_property("journaled_structure", False))
+
+    def _write_structure(self):
+        """Write the whole structure file, compacting the appended changes."""
+        structure_data = self.get_sub_tree()
+        if self._is_structure_journaled():
+            self._structure_io.write_journal(
+                structure_data, STRUCTURE_CHANGES_KEY, []
+            )
+            self.structure.initialize(structure_data)
+            self._structure_changes = 0
+        else:
+            self.structure.set_data(structure_data)
+            self.structure.apply_settings()
+            self._structure_changes = None
+
+    def _save_structure_change(self, sub):
+        """Save the change of a single subproject and its children.
+
+        If the structure is journaled, only the sub tree of the changed
+        subproject is appended to the structure file. Otherwise, or when
+        there are too many appended changes, the whole file is written.
+
+        Args:
+            sub (Subproject): The changed subproject.
+        """
+        if self._batch:
+            self._batch.defer_structure()
+            return
+        if (
+            self._structure_changes is None
+            or self._structure_changes >= self.structure_slack
+            or not self._is_structure_journaled()
+            or sub.parent is None
+        ):
+            self._write_structure()
+            return
+        change = {"parent": sub.parent.id, "data": sub.get_sub_tree()}
+        self._structure_io.append_journal([(None, change)])
+        self._structure_changes += 1
+
+    def _apply_structure_change(self, change):
+        """Apply a change read from the journaled structure file.
+
+        Args:
+            change (dict): The parent id and the sub tree data.
+        """
+        parent = self.lookup_sub_by_id(change.get("parent"))
+        if not parent:
+            self.log.warning(
+                f"Skipping the structure change. Parent {change.get('parent')} is missing."
+            )
+            return
+        parent.merge_sub_tree(change.get("data", {}))
 
     def _set(self, absolute_path, commons_id=None):
         """Set the project path and initialize the project structure."""
@@ -93,7 +351,13 @@ class Project(Subproject):
         self.structure.settings_file = str(
             _database_path_obj / "project_structure.json"
         )
-        self.set_sub_tree(self.structure.properties)
+        self._structure_io = io.IO(self.structure.settings_file)
+        structure_data = dict(self.structure.properties)
+        changes = structure_data.pop(STRUCTURE_CHANGES_KEY, None)
+        self.set_sub_tree(structure_data)
+        for change in changes or []:
+            self._apply_structure_change(change)
+        self._structure_changes = None if changes is None else len(changes)
         self.guard.set_project_root(self.absolute_path)
         self.guard.set_database_root(self.database_path)
         # get project settings
@@ -103,6 +367,11 @@ class Project(Subproject):
         if project_commons_id and project_commons_id != commons_id:
             return False, f"Commons ID Mismatch\n\nThis project is linked to a different commons:\nID: {project_commons_id}\nName: {project_commons_name}\n\nTo access this project, you need to switch to the corresponding commons."
         self.guard.set_project_settings(self.settings)
+        self.structure.compact = self.settings.get_property("compact_structure", False)
+        self._set_index()
+        self._set_watcher()
+        self._set_sync_queue()
+        self._set_read_cache()
         # get preview settings
         self.preview_settings.settings_file = str(
             _database_path_obj / "preview_settings.json"
@@ -131,6 +400,227 @@ class Project(Subproject):
         self.guard.set_metadata_definitions(self.metadata_definitions)
         return True, "Success"
 
+    def _set_index(self):
+        """Open the project index if it is enabled in the project settings."""
+        if self.guard.project_index:
+            self.guard.project_index.close()
+        self.index = None
+        if self.settings.get_property("database_index", False):
+            if not index.is_available():
+                self.log.warning("sqlite3 is not available. Project index is disabled.")
+            else:
+                index_file = Path(self._database_path, index.INDEX_FILE_NAME)
+                is_new = not index_file.exists()
+                self.index = index.ProjectIndex(self._database_path, index_file)
+                if is_new:
+                    self.index.rebuild()
+        self.guard.set_project_index(self.index)
+
+    def rebuild_index(self):
+        """Rebuild the project index from the database files.
+
+        Returns:
+            int: Number of indexed files or -1 if the index is not enabled.
+        """
+        if not self.index:
+            self.log.warning("Project index is not enabled for this project.")
+            return -1
+        return self.index.rebuild()
+
+    def verify_index(self, fix=False):
+        """Compare the project index against the database files.
+
+        Args:
+            fix (bool): If True, the mismatches are re-indexed.
+
+        Returns:
+            list or int: List of (relative_path, reason) tuples or -1 if the
+                index is not enabled.
+        """
+        if not self.index:
+            self.log.warning("Project index is not enabled for this project.")
+            return -1
+        return self.index.verify(fix=fix)
+
+    def _set_watcher(self):
+        """Start the database watcher if it is enabled in the project settings."""
+        self.stop_watcher()
+        if self.settings.get_property("database_watcher", False):
+            self.start_watcher()
+
+    def start_watcher(self, use_inotify=True, interval=None):
+        """Start watching the database folder for the changes.
+
+        The collected changes are applied with apply_database_changes.
+
+        Args:
+            use_inotify (bool): Use inotify if available. Polling otherwise.
+            interval (float, optional): Polling interval in seconds.
+                Defaults to the database_watcher_interval project setting.
+
+        Returns:
+            DatabaseWatcher: The started watcher.
+        """
+        self.stop_watcher()
+        interval = interval or self.settings.get_property(
+            "database_watcher_interval", watcher.DatabaseWatcher.interval
+        )
+        self.watcher = watcher.DatabaseWatcher(
+            self._database_path, interval=interval, use_inotify=use_inotify
+        )
+        self.watcher.start()
+        self.guard.set_database_watcher(self.watcher)
+        return self.watcher
+
+    def stop_watcher(self):
+        """Stop the active database watcher if there is any."""
+        if self.guard.database_watcher:
+            self.guard.database_watcher.stop()
+        self.watcher = None
+        self.guard.set_database_watcher(None)
+
+    @property
+    def sync_queue(self):
+        """The background sync queue. None if the localization is disabled."""
+        return self.guard.sync_queue
+
+    def _set_sync_queue(self):
+        """Continue the unfinished sync jobs of the project in the background."""
+        queue = self.guard.sync_queue
+        if queue:
+            # the running jobs use the paths of the previous project
+            queue.stop()
+        localize_settings = self.guard.localize_settings
+        cache_folder = localize_settings.get("local_cache_folder") if localize_settings else None
+        if not cache_folder or not localize_settings.get("enabled"):
+            self.guard.set_sync_queue(None)
+            return
+        workers = localize_settings.get("sync_workers", SyncQueue.workers)
+        bandwidth_limit = localize_settings.get("sync_bandwidth_limit", 0) * 1024 * 1024
+        if not queue or queue.settings != (cache_folder, workers, bandwidth_limit):
+            queue = SyncQueue(cache_folder, workers=workers, bandwidth_limit=bandwidth_limit)
+        self.guard.set_sync_queue(queue)
+        queue.start(self.absolute_path)
+
+    @property
+    def read_cache(self):
+        """The local cache of the published elements. None if disabled."""
+        return self.guard.read_cache
+
+    def _set_read_cache(self):
+        """Create the read cache if it is enabled in the localization settings."""
+        cache = self.guard.read_cache
+        localize_settings = self.guard.localize_settings
+        cache_folder = localize_settings.get("local_cache_folder") if localize_settings else None
+        if not cache_folder or not localize_settings.get("read_cache"):
+            if cache:
+                cache.stop(wait=False)
+            self.guard.set_read_cache(None)
+            return
+        size_limit = int(localize_settings.get("read_cache_size", 20) * 1024 ** 3)
+        if cache and cache.settings == (cache_folder, size_limit, None):
+            # stop prefetching the elements of the previous project
+            cache.prefetch([])
+            return
+        if cache:
+            cache.stop(wait=False)
+        self.guard.set_read_cache(ReadCache(cache_folder, size_limit=size_limit))
+
+    def prefetch(self, tasks):
+        """Cache the LIVE and PROMOTED elements of the tasks in the background.
+
+        Args:
+            tasks (list): The task objects. Usually the tasks of the
+                selected subproject.
+
+        Returns:
+            Future: Resolves to the list of the cached paths. None if the
+                read cache is disabled.
+        """
+        if not self.read_cache:
+            return None
+        category_folders = [
+            Path(category.get_abs_database_path())
+            for task in tasks
+            for category in task.categories.values()
+        ]
+        return self.read_cache.prefetch(
+            self._iter_branch_elements(category_folders, self.absolute_path)
+        )
+
+    @staticmethod
+    def _iter_branch_elements(category_folders, project_root):
+        """Yield the LIVE and PROMOTED element paths of the category folders.
+
+        The USD layers are skipped. They point to the publishes with
+        relative paths.
+        """
+        for category_folder in category_folders:
+            if not category_folder.is_dir():
+                continue
+            # <category>/<dcc>/publish/<work>/live.json
+            for branch_file in sorted(category_folder.glob("*/publish/*/live.json")) + sorted(
+                    category_folder.glob("*/publish/*/promoted.json")):
+                try:
+                    with open(branch_file, "r") as branch:
+                        data = json.load(branch)
+                except (OSError, ValueError):
+                    continue
+                for element in data.get("elements", []):
+                    element_path = Path(project_root, data["path"], element["path"])
+                    if element_path.suffix.startswith(".usd"):
+                        continue
+                    yield element_path.as_posix()
+
+    def apply_database_changes(self, changes=None):
+        """Reload only the objects affected by the changed database files.
+
+        Args:
+            changes (list, optional): List of watcher.Change objects. If not
+                given, the pending changes of the watcher are used.
+
+        Returns:
+            list: The reloaded objects and the rescanned containers. The
+                project itself is returned if the changes are lost and a
+                full refresh is needed.
+        """
+        if changes is None:
+            changes = self.watcher.drain() if self.watcher else []
+        affected = []
+        for change in changes:
+            if change.event == watcher.OVERFLOW:
+                obj = self
+            else:
+                obj = self._invalidate_database_file(change.path)
+            if obj is not None and all(obj is not item for item in affected):
+                affected.append(obj)
+        return affected
+
+    def _invalidate_database_file(self, file_path):
+        """Pass the changed database file to the owner of its cache."""
+        file_path = Path(file_path)
+        try:
+            parts = file_path.relative_to(self._database_path).parts
+        except ValueError:
+            return None
+        # find the deepest registered subproject containing the file
+        for depth in range(len(parts) - 1, -1, -1):
+            sub = self.lookup_sub_by_path(Path(*parts[:depth]).as_posix() if depth else "")
+            if sub:
+                break
+        else:
+            return None
+        rest = parts[depth:]
+        if file_path.suffix == ".ttask":
+            return sub.invalidate_task_file(file_path) if len(rest) == 1 else None
+        if len(rest) < 3:
+            return None
+        task = sub.all_tasks.get(rest[0])
+        category = task.categories.get(rest[1]) if task else None
+        if not category:
+            return None
+        return category.invalidate_database_file(file_path)
+
     def delete_sub_project(self, uid=None, path=None):
         """Delete a subproject and all its children.
 
@@ -155,9 +645,10 @@ class Project(Subproject):
         result = sub.destroy()
         if not result == 1:
             return -1
-        self.save_structure()
+        self._save_structure_change(sub)
         return 1
 
+    @recorded("create_sub_project")
     def create_sub_project(self, name, parent_uid=None, parent_path=None, uid=None, **properties):
         """Create a sub-project under a specified parent sub and write data to
         persistent database.
@@ -185,8 +676,13 @@ class Project(Subproject):
         )
         if new_sub == -1:
             return -1
-        self.save_structure()
-        self.create_folders(self._database_path)
+        self._save_structure_change(new_sub)
+        if self._batch:
+            self._batch.defer_folders(new_sub)
+            return new_sub
+        # only the folders of the new subproject need to be created
+        new_sub.create_folders(self.database_path)
+        new_sub.create_folders(self.absolute_path)
         return new_sub
 
     def edit_sub_project(self, uid=None, path=None, name=None, **properties):
@@ -225,7 +721,7 @@ class Project(Subproject):
         sub_tree.update(properties)
 
         sub.set_sub_tree(sub_tree)
-        self.save_structure()
+        self._save_structure_change(sub)
         return 1
 
     def create_task(self, name, categories=None, parent_uid=None, parent_path=None, metadata_overrides=None):
@@ -317,19 +813,32 @@ class Project(Subproject):
         if not relative_path:
             self.log.error("File path is not under the project root")
             return None, None
+        scene_key = Path(relative_path, work_path.stem, base_name).as_posix()
+
+        # try the reverse lookup first. The entry is verified against the
+        # work file in case it is changed by someone else.
+        entry = self._works_by_scene.get(scene_key)
+        if entry:
+            work_obj = Work(entry.work_file)
+            version_number = self.register_work(work_obj).get(scene_key)
+            if version_number is not None:
+                return self.__set_work_parent(work_obj), version_number
+
+        # scan the works of the category and register all of them
+        found = None, None
         database_path = Path(self.get_abs_database_path(str(relative_path)))
-        work_files = database_path.glob("*.twork")
-        for work_file in work_files:
+        for work_file in database_path.glob("*.twork"):
             work_obj = Work(work_file)
-            for nmb, version in enumerate(work_obj.versions):
-                resolved_path = Path(work_path.stem, base_name).as_posix()
-                if version.scene_path == resolved_path:
-                    # if this the the version and work that we are looking for
-                    # find its parent and define it within the work object
-                    parent_task = self.find_task_by_id(work_obj.task_id)
-                    work_obj.set_parent_task(parent_task)
-                    return work_obj, version.version or nmb
-        return None, None
+            version_number = self.register_work(work_obj).get(scene_key)
+            if version_number is not None and found[0] is None:
+                found = self.__set_work_parent(work_obj), version_number
+        return found
+
+    def __set_work_parent(self, work_obj):
+        """Find the parent task of the work and define it within the work."""
+        parent_task = self.find_task_by_id(work_obj.task_id)
+        work_obj.set_parent_task(parent_task)
+        return work_obj
 
     def get_current_work(self):
         """Get the current work object AND version by resolving the current scene.
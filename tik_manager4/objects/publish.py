@@ -10,6 +10,7 @@ from tik_manager4.core.constants import ObjectType, BranchingModes
 from tik_manager4.objects.version import PublishVersion, LiveVersion
 from tik_manager4.mixins.localize import LocalizeMixin
 from tik_manager4.core import filelog
+from tik_manager4.core import snapshot
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -36,18 +37,20 @@ class Publish(LocalizeMixin):
         # _folder = Path(self.settings_file).parent
         self._live_object = None
         self._promoted_object = None
-        _folder = Path(self.work_object.get_abs_database_path("publish", self.work_object.name))
-        live_file = _folder / "live.json"
-        if live_file.exists():
-            self._live_object = Settings(live_file)
-
-        promoted_file = _folder / "promoted.json"
-        if promoted_file.exists():
-            self._promoted_object = Settings(promoted_file)
+        self._read_live_and_promoted()
 
         self._live_version = None
         self._promoted_version = None
 
+    def _read_live_and_promoted(self):
+        """Read the live and promoted files if they exist."""
+        _folder = Path(self.get_publish_data_folder())
+        live_file = _folder / "live.json"
+        self._live_object = Settings(live_file) if live_file.exists() else None
+
+        promoted_file = _folder / "promoted.json"
+        self._promoted_object = Settings(promoted_file) if promoted_file.exists() else None
+
     @property
     def name(self):
         """Publish name."""
@@ -137,6 +140,28 @@ class Publish(LocalizeMixin):
         self.__init__(self.work_object)
         self.scan_publish_versions()
 
+    def invalidate_publish_file(self, file_path):
+        """Update the cached publish version of the changed publish file.
+
+        Args:
+            file_path (str or Path): The changed .tpub, live.json or
+                promoted.json file.
+
+        Returns:
+            object: The reloaded publish version or the rescanned publish.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix == ".tpub":
+            publish_version = self._publish_versions.get(file_path)
+            if publish_version and file_path.exists():
+                if publish_version.is_modified():
+                    publish_version.reload()
+                return publish_version
+        else:
+            self._read_live_and_promoted()
+        self.scan_publish_versions()
+        return self
+
     def omit(self):
         """Omit the work."""
         self.work_object._state = "omitted"
@@ -182,13 +207,16 @@ class Publish(LocalizeMixin):
         _search_dir = Path(self.get_publish_data_folder())
         if not _search_dir.exists():
             return {}
-        _publish_version_paths = list(_search_dir.glob("*.tpub"))
+        _snapshots = {
+            _snapshot.path: _snapshot
+            for _snapshot in snapshot.scan_directory(_search_dir, ".tpub")
+        }
 
         for _p_path, _p_data in dict(self._publish_versions).items():
-            if _p_path not in _publish_version_paths:
+            if _p_path not in _snapshots:
                 self._publish_versions.pop(_p_path)
 
-        for _publish_version_path in _publish_version_paths:
+        for _publish_version_path, _snapshot in _snapshots.items():
             existing_publish = self._publish_versions.get(_publish_version_path, None)
             if not existing_publish:
                 _publish = PublishVersion(
@@ -198,7 +226,7 @@ class Publish(LocalizeMixin):
                 )
                 self._publish_versions[_publish_version_path] = _publish
             else:
-                if existing_publish.is_modified():
+                if existing_publish.is_modified(snapshot=_snapshot):
                     existing_publish.reload()
 
         # make a similar caching for live and promoted versions. The process is costly
@@ -299,8 +327,8 @@ class Publish(LocalizeMixin):
             ingestor = self._dcc_handler.ingests.get(element_type, None)
         version_obj = self.get_version(version_number)
         if version_obj:
-            relative_path = version_obj.get_element_path(element_type)
-            abs_path = version_obj.get_resolved_path(relative_path)
+            # imported data is not linked to the file. The cached copy is safe.
+            abs_path = version_obj.get_element_path(element_type, relative=False)
             _func = self._dcc_handler.ingests.get(ingestor, None)
             if not _func:
                 raise ValueError(f"Element type not supported: {element_type}")
@@ -5,12 +5,18 @@
 This module is responsible for handling the publish process.
 """
 import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from tik_manager4.core import filelog
+from tik_manager4.core import manifest
 from tik_manager4.core import utils
 
 from tik_manager4.objects.preview import Preview
+from tik_manager4.dcc.validate_core import CollectCache
 from tik_manager4.dcc.standalone import main as standalone
 from tik_manager4.objects.publish import PublishVersion
 from tik_manager4.objects.guard import Guard
@@ -22,6 +28,10 @@ class Publisher:
     """Publisher class to handle the publish process."""
 
     guard = Guard()
+    # maximum number of thread safe extracts running at the same time
+    extract_workers = 4
+    # maximum number of thread safe validators running at the same time
+    validate_workers = 4
 
     def __init__(self, project_object):
         """Initialize the Publisher object."""
@@ -42,6 +52,8 @@ class Publisher:
         # class variables
         self._published_object = None
         self.warnings = []
+        self._manifest_entries = {}
+        self._manifest_lock = threading.Lock()
 
     @property
     def validators(self):
@@ -177,12 +189,67 @@ class Publisher:
 
         self._published_object.apply_settings()  # make sure the file is created
         self._published_object.init_properties()  # make sure the properties are initialized
+        self._manifest_entries = {}
         self._published_object._dcc_handler.pre_publish()
 
-    def validate(self):
-        """Validate the scene using the resolved validators."""
-        for _val_name, val_object in self._resolved_validators.items():
-            val_object.validate()
+    @staticmethod
+    def _run_timed(validator, method):
+        """Run the method of the validator and add the time spent to it."""
+        start = time.perf_counter()
+        method()
+        validator.wall_time += time.perf_counter() - start
+
+    def validate(self, validators=None, callback=None):
+        """Validate the scene using the resolved validators.
+
+        All validators of the run share one collect cache. The thread safe
+        validators collect in the calling thread first and then validate
+        concurrently. The others run one by one in the calling thread.
+
+        Args:
+            validators (list, optional): The validator objects to run.
+                Defaults to all resolved validators.
+            callback (callable, optional): Called with each validator object
+                as soon as it finishes. Always called from the calling
+                thread, e.g. to update the UI.
+        """
+        if validators is None:
+            validators = list(self._resolved_validators.values())
+        collect_cache = CollectCache()
+        for val_object in validators:
+            val_object.wall_time = 0.0
+            val_object.scene_cache = collect_cache
+        concurrent = [val_object for val_object in validators if val_object.thread_safe]
+        try:
+            for val_object in concurrent:
+                self._run_timed(val_object, val_object.collect)
+            with ThreadPoolExecutor(max_workers=self.validate_workers) as executor:
+                futures = {
+                    executor.submit(self._run_timed, val_object, val_object.validate): val_object
+                    for val_object in concurrent
+                }
+
+                def _report(done):
+                    """Re-raise the errors and report the finished validators."""
+                    for future in done:
+                        future.result()
+                        val_object = futures.pop(future)
+                        if callback:
+                            callback(val_object)
+
+                for val_object in validators:
+                    if not val_object.thread_safe:
+                        self._run_timed(val_object, val_object.validate)
+                        if callback:
+                            callback(val_object)
+                        _report([future for future in futures if future.done()])
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    _report(done)
+        finally:
+            # the scene may change after the run. Do not keep the cache.
+            for val_object in validators:
+                val_object.scene_cache = None
 
     def extract_single(self, extract_object):
         """Extract only from the given extract object.
@@ -195,18 +262,134 @@ class Publisher:
         extract_object.extract_folder = publish_path.as_posix()  # define the extract folder
         extract_object.extract_name = f"{self._work_object.name}"  # define the extract name
         extract_object.version_string = f"v{self._publish_version:03d}"  # define the version string
+        start = time.perf_counter()
+        previous_entries = self._read_previous_manifest(extract_object)
+        # the delta publishes compare the new files with these hashes
+        # instead of reading the previous version again.
+        extract_object.previous_hashes = {
+            key: entry.hash for key, entry in previous_entries.items() if entry.hash
+        }
         extract_object.extract()
         utils.write_protect(extract_object.resolve_output())
+        if extract_object.state == "success":
+            self._hash_output(extract_object, previous_entries)
+        extract_object.wall_time = time.perf_counter() - start
+
+    def _read_previous_manifest(self, extract_object):
+        """Read the manifest entries of the previous output of the extract.
+
+        Returns:
+            dict: Posix path relative to the previous output => ManifestEntry.
+                The path is empty for the single files.
+        """
+        previous = extract_object.get_previous_output()
+        version = re.search(r"_v(\d+)$", previous.stem if previous else "")
+        if not version:
+            return {}
+        previous_manifest = manifest.read(
+            Path(self._abs_publish_data_folder)
+            / f"{self._work_object.name}_v{int(version.group(1)):03d}{manifest.MANIFEST_SUFFIX}"
+        )
+        root = Path(self._published_object.get_output_path())
+        previous_relative = previous.relative_to(root).as_posix()
+        return {
+            key[len(previous_relative) + 1:]: entry
+            for key, entry in previous_manifest.items()
+            if key == previous_relative or key.startswith(f"{previous_relative}/")
+        }
+
+    def _hash_output(self, extract_object, previous_entries):
+        """Hash the extracted files for the manifest of the publish.
+
+        The hashes of the files reused from the previous version are taken
+        from its manifest. The hashes of the copied files are computed while
+        copying them. The files written by the DCCs are read again only if
+        the project hashes the exports.
+
+        Args:
+            extract_object (Extract): The finished extract object.
+            previous_entries (dict): The manifest entries of the previous
+                output. See _read_previous_manifest.
+        """
+        root = Path(self._published_object.get_output_path())
+        output = Path(extract_object.resolve_output())
+        if not output.exists():
+            return
+        relative = output.relative_to(root).as_posix()
+        reference = {
+            (f"{relative}/{key}" if key else relative): entry
+            for key, entry in previous_entries.items()
+        }
+        hashes = {
+            (f"{relative}/{key}" if key else relative): value
+            for key, value in (extract_object.output_hashes or {}).items()
+        }
+        # hash the copied files missing from the previous manifest as well
+        compute = extract_object.output_hashes is not None or bool(
+            self._project_object.settings.get_property("hash_exports", False)
+        )
+        entries = manifest.scan(
+            root, relative, reference=reference, hashes=hashes, compute=compute
+        )
+        with self._manifest_lock:
+            self._manifest_entries.update(entries)
+
+    def _is_extract_ready(self, extract_object, finished):
+        """Check if the dependencies of the extract are finished.
+
+        Dependencies which are not resolved for the category are ignored.
+        """
+        return all(
+            dependency in finished or dependency not in self._resolved_extractors
+            for dependency in extract_object.dependencies
+        )
 
     def extract(self):
         """Extract the elements.
 
-        Uses all resolved extractors to extract the elements.
+        Uses all resolved extractors to extract the elements. Thread safe
+        extractors run concurrently. The others run one by one in the
+        calling thread. An extractor starts after its dependencies finish.
         """
         # first save the scene
         self._dcc_handler.save_scene()
-        for _extract_type_name, extract_object in self._resolved_extractors.items():
-            self.extract_single(extract_object)
+        pending = dict(self._resolved_extractors)
+        finished = set()
+        running = {}  # future => extract type name
+        ignore_dependencies = False
+        with ThreadPoolExecutor(max_workers=self.extract_workers) as executor:
+            while pending or running:
+                ready = [
+                    name for name, extract_object in pending.items()
+                    if ignore_dependencies
+                    or self._is_extract_ready(extract_object, finished)
+                ]
+                if not ready and not running:
+                    LOG.warning(
+                        f"Circular extract dependencies: {', '.join(pending)}. "
+                        "Running them in the category order."
+                    )
+                    ignore_dependencies = True
+                    ready = list(pending)
+                serial = None
+                for name in ready:
+                    if pending[name].thread_safe:
+                        future = executor.submit(self.extract_single, pending.pop(name))
+                        running[future] = name
+                    elif serial is None:
+                        serial = name
+                if serial:
+                    self.extract_single(pending.pop(serial))
+                    finished.add(serial)
+                if running:
+                    done, _ = wait(
+                        running,
+                        timeout=0 if serial else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        finished.add(running.pop(future))
+                        future.result()
 
     def publish(self,
                 notes=None,
@@ -234,8 +417,16 @@ class Publisher:
         # collect the validation states and log it into the publish object
         validations = {}
         for validation_name, validation_object in self._resolved_validators.items():
-            validations[validation_name] = validation_object.state
+            validations[validation_name] = {
+                "state": validation_object.state,
+                "time": round(validation_object.wall_time, 3),
+            }
         self._published_object.add_property("validations", validations)
+        self._published_object.add_property(
+            "extract_times",
+            {name: round(extract_object.wall_time, 3)
+             for name, extract_object in self._resolved_extractors.items()},
+        )
 
         # collect the extracted elements information and add to the publish object
         for _extract_type_name, extract_object in self._resolved_extractors.items():
@@ -261,6 +452,10 @@ class Publisher:
         self._published_object.edit_property(
             "elements", self._published_object._elements
         )
+        manifest.write(
+            manifest.get_manifest_path(self._published_object.settings_file),
+            self._manifest_entries,
+        )
         if not notes:
             notes = "[Auto Generated]"
         self._published_object.add_property("notes", notes)
@@ -344,6 +539,9 @@ class Publisher:
         )
         if _publish_file_path.exists():
             _publish_file_path.unlink()
+        if self._published_object:
+            self._published_object.remove_from_index()
+        self._work_object.invalidate_published()
         self._published_object = None
         LOG.info("Publish discarded.")
 
@@ -1,6 +1,7 @@
 90# pylint: disable=super-with-arguments
 """Module for Subproject object."""
 
+from collections import deque
 from pathlib import Path
 import shutil
 
@@ -9,6 +10,9 @@ from fnmatch import fnmatch
 from tik_manager4.core.constants import ObjectType
 import tik_manager4.objects.task
 from tik_manager4.core import filelog
+from tik_manager4.core import snapshot
+from tik_manager4.core import utils
+from tik_manager4.objects.batch import recorded
 from tik_manager4.objects.metadata import Metadata
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.task import Task
@@ -35,7 +39,7 @@ class Subproject(Entity):
         self.__parent_sub = parent_sub
         self._sub_projects: dict = {}
         self._tasks: dict = {}
-        self._metadata = metadata or Metadata({})
+        self._metadata = metadata if metadata is not None else Metadata({})
 
     @property
     def parent(self):
@@ -82,10 +86,31 @@ class Subproject(Entity):
         return self.metadata.get_value("mode", fallback_value="global")
 
     def get_project(self):
-        """The project object."""
+        """The project object.
+
+        Returns None for detached subprojects which do not have a parent.
+        """
         # traverse up until the project is found
+        if not self.__parent_sub:
+            return None
         return self.__parent_sub.get_project()
 
+    def contains(self, sub):
+        """Check if the given subproject is this one or lives under it.
+
+        Args:
+            sub (Subproject): The subproject to check.
+
+        Returns:
+            bool: True if the subproject is in the hierarchy of this one.
+        """
+        current = sub
+        while current is not None:
+            if current is self:
+                return True
+            current = current.parent
+        return False
+
     def revive(self):
         """Revive the subproject if it is deleted.
         This is a soft recover. DATABASE IS NOT TOUCHED.
@@ -106,11 +131,14 @@ class Subproject(Entity):
     def replace_metadata(self, metadata):
         """Replace the metadata with the given one."""
         self._metadata = metadata
+        # keep the sub projects inheriting from this one.
+        for sub in self._sub_projects.values():
+            sub.metadata.parent = metadata
 
     def get_sub_tree(self):
         """Return the subproject tree as a dictionary."""
-        visited = []
-        queue = []
+        visited = set()  # ids of the visited subprojects
+        queue = deque()
 
         # start with the initial dictionary with self subproject
         all_data = {
@@ -121,36 +149,31 @@ class Subproject(Entity):
             "subs": [],  # this will be filled with the while loop
         }
 
-        for key, metaitem in self.metadata.items():
-            if metaitem.overridden:
-                all_data[key] = metaitem.value
+        all_data.update(self.metadata.get_overrides())
 
         # add the initial dictionary and self into the queue
-        # Each queue item is a list.
+        # Each queue item is a tuple.
         # first element is the dictionary point and second is the subproject object
-        queue.append([all_data, self])
-
-        while queue:
-            current = queue.pop(0)
-            parent = current[0]
-            sub = current[1]
-
-            for neighbour in list(sub.subs.values()):
-                if neighbour not in visited:
-                    sub_data = {
-                        "id": neighbour.id,
-                        "name": neighbour.name,
-                        "path": neighbour.path,
-                        "subs": [],  # this will be filled with the while loop
-                    }
-                    # add the deleted flag only if there is a key for it.
-                    for key, metaitem in neighbour.metadata.items():
-                        if metaitem.overridden:
-                            sub_data[key] = metaitem.value
-
-                    parent["subs"].append(sub_data)
-                    visited.append(neighbour)
-                    queue.append([sub_data, neighbour])
+        queue.append((all_data, self))
+
+        with utils.gc_paused():
+            while queue:
+                parent, sub = queue.popleft()
+
+                for neighbour in sub.subs.values():
+                    if id(neighbour) not in visited:
+                        sub_data = {
+                            "id": neighbour.id,
+                            "name": neighbour.name,
+                            "path": neighbour.path,
+                            "subs": [],  # this will be filled with the while loop
+                        }
+                        # add the deleted flag only if there is a key for it.
+                        sub_data.update(neighbour.metadata.get_overrides())
+
+                        parent["subs"].append(sub_data)
+                        visited.add(id(neighbour))
+                        queue.append((sub_data, neighbour))
 
         return all_data
 
@@ -162,65 +185,88 @@ class Subproject(Entity):
         Args:
             data (dict): The dictionary data to build the subproject.
         """
-        # first clear the subprojects
+        # first clear the subprojects and remove them from the lookups
+        project = self.get_project()
+        if project is self:
+            project.clear_lookups()
+        elif project:
+            project.unregister_sub(self)
         self._sub_projects = {}
-        persistent_keys = ["id", "name", "path", "subs"]
-        visited = []
-        queue = []
+        persistent_keys = {"id", "name", "path", "subs"}
+        visited = set()  # ids of the visited data dictionaries
+        queue = deque()
         self.id = data.get("id", None)
         self._name = data.get("name", None)
         self._relative_path = data.get("path", None)
+        if project:
+            project.register_sub(self)
 
         # get all remaining keys as metadata
         # inherit parents metadata
         if self.__parent_sub:
-            self._metadata = Metadata(
-                dict(self.__parent_sub.metadata.get_all_items())
-            ) or Metadata({})
+            self._metadata = Metadata(parent=self.__parent_sub.metadata)
 
         for key, value in data.items():
             if key not in persistent_keys:
                 self._metadata.add_item(key, value, overridden=True)
 
         # append the subproject object and pointer for json as a queue element
-        queue.append([self, data.get("subs", [])])
+        queue.append((self, data.get("subs", [])))
+
+        with utils.gc_paused():
+            while queue:
+                sub, data_position = queue.popleft()
+
+                for neighbour in data_position:
+                    if id(neighbour) not in visited:
+                        _id = neighbour.get("id", None)
+                        _name = neighbour.get("name", None)
+                        _relative_path = neighbour.get("path", None)
+
+                        _metadata = Metadata(parent=sub.metadata)
+                        _metadata.override(
+                            {key: value for key, value in neighbour.items()
+                             if key not in persistent_keys}
+                        )
+                        sub_project = sub.__build_sub_project(
+                            _name, sub, _metadata, _id, path=_relative_path
+                        )
+                        if project:
+                            project.register_sub(sub_project)
+
+                        visited.add(id(neighbour))
+                        queue.append((sub_project, neighbour.get("subs", [])))
+
+    def merge_sub_tree(self, data):
+        """Add or replace a direct subproject from the data dictionary.
+
+        The subproject with the same id is rebuilt from the data. If there
+        is no subproject with that id, a new one is created.
 
-        while queue:
-            current = queue.pop(0)
-            sub = current[0]
-            data_position = current[1]
-
-            for neighbour in data_position:
-                if neighbour not in visited:
-                    _deleted = neighbour.get("deleted", False)
-                    _id = neighbour.get("id", None)
-                    _name = neighbour.get("name", None)
-                    _relative_path = neighbour.get("path", None)
-
-                    # TODO take a look at this if it can be improved
-                    _metadata = Metadata(
-                        dict(sub.metadata.get_all_items())
-                    ) or Metadata({})
-                    properties = {}
-                    for key, value in neighbour.items():
-                        if key not in persistent_keys:
-                            properties[key] = value
-
-                    _metadata.override(properties)
-                    sub_project = sub.__build_sub_project(_name, sub, _metadata, _id)
-
-                    # define the path and categories separately
-                    sub_project._relative_path = _relative_path
-
-                    # add and override metadata
-                    for key, metaitem in sub_project.metadata.items():
-                        if neighbour.get(key, None):
-                            sub_project.metadata[key].overridden = True
-
-                    visited.append(neighbour)
-                    queue.append([sub_project, neighbour.get("subs", [])])
-
-    def __build_sub_project(self, name, parent_sub, metadata, uid):
+        Args:
+            data (dict): The sub tree data of the subproject as returned
+                by get_sub_tree.
+
+        Returns:
+            Subproject: The added or replaced subproject.
+        """
+        uid = data.get("id", None)
+        key, sub = next(
+            ((key, sub) for key, sub in self._sub_projects.items() if sub.id == uid),
+            (None, None),
+        )
+        if sub:
+            self._sub_projects.pop(key)
+        else:
+            sub = self.__build_sub_project(
+                data.get("name", None), self, Metadata(parent=self.metadata),
+                uid, path=data.get("path", None)
+            )
+        sub.set_sub_tree(data)
+        self._sub_projects[sub.name] = sub
+        return sub
+
+    def __build_sub_project(self, name, parent_sub, metadata, uid, path=None):
         """Build a nested subproject.
 
         Args:
@@ -228,6 +274,8 @@ class Subproject(Entity):
             parent_sub (Subproject): Parent subproject object.
             metadata (Metadata): Metadata object to hold any extra data.
             uid (int): Unique id of the subproject.
+            path (str, optional): The relative path of the subproject. If
+                not given, it is resolved from the path of this subproject.
 
         Returns:
             Subproject: The created subproject object.
@@ -236,7 +284,7 @@ class Subproject(Entity):
         sub_pr = Subproject(
             name=name, parent_sub=parent_sub, metadata=metadata, uid=uid
         )
-        sub_pr.path = str(Path(self.path, name))
+        sub_pr.path = str(Path(self.path, name)) if path is None else path
         self._sub_projects[name] = sub_pr
         return sub_pr
 
@@ -264,8 +312,7 @@ class Subproject(Entity):
         if state != 1:
             return -1
 
-        # TODO look at this if it can be improved
-        _metadata = Metadata(dict(self.metadata.get_all_items())) or Metadata({})
+        _metadata = Metadata(parent=self.metadata)
         # eliminate the None values
         properties = {k: v for k, v in properties.items() if v is not None}
         _metadata.override(properties)
@@ -284,8 +331,11 @@ class Subproject(Entity):
             return -1
 
         new_sub = self.__build_sub_project(
-            name, parent_sub, _metadata, uid
+            name, parent_sub or self, _metadata, uid
         )  # keep uid at the end
+        project = self.get_project()
+        if project:
+            project.register_sub(new_sub)
 
         return new_sub
 
@@ -296,36 +346,64 @@ class Subproject(Entity):
             dict: The tasks under the subproject.
         """
         _tasks_search_dir = Path(self.get_abs_database_path())
-        _task_paths = list(_tasks_search_dir.glob("*.ttask"))
+        _snapshots = snapshot.scan_directory(_tasks_search_dir, ".ttask")
 
+        project = self.get_project()
         # add the file if it is new. if it is not new,
         # check the modified time and update if necessary
-        for _task_path in _task_paths:
+        for _snapshot in _snapshots:
+            _task_path = _snapshot.path
             _task_name = _task_path.stem
             existing_task = self._tasks.get(_task_name, None)
             if not existing_task:
-                _task = Task(absolute_path=_task_path, parent_sub=self)
-                self._tasks[_task_name] = _task
+                existing_task = Task(absolute_path=_task_path, parent_sub=self)
+                self._tasks[_task_name] = existing_task
             else:
-                if existing_task.is_modified():
+                if existing_task.is_modified(snapshot=_snapshot):
                     existing_task.refresh()
+            if project:
+                project.register_task(existing_task)
 
         # if the lengths are not matching that means some tasks are deleted
-        if len(_task_paths) != len(self._tasks):
+        if len(_snapshots) != len(self._tasks):
             # get the task names
-            _task_names = [_task_path.stem for _task_path in _task_paths]
+            _task_names = {_snapshot.path.stem for _snapshot in _snapshots}
             # get the task names that are not in the _task_names
+            # tasks waiting to be written by the active batch are kept.
+            batch = project.active_batch if project else None
             _deleted_task_names = [
                 task_name
-                for task_name in self._tasks.keys()
+                for task_name, task in self._tasks.items()
                 if task_name not in _task_names
+                and not (batch and batch.is_pending(task.settings_file))
             ]
             # delete the tasks
             for _deleted_task_name in _deleted_task_names:
-                del self._tasks[_deleted_task_name]
+                _deleted_task = self._tasks.pop(_deleted_task_name)
+                if project:
+                    project.unregister_task(_deleted_task)
 
         return self._tasks
 
+    def invalidate_task_file(self, file_path):
+        """Update the cached task of the changed task file.
+
+        Args:
+            file_path (str or Path): The changed .ttask file under the subproject.
+
+        Returns:
+            object: The reloaded task or the rescanned subproject.
+        """
+        file_path = Path(file_path)
+        task = self._tasks.get(file_path.stem)
+        if task and file_path.exists():
+            if task.is_modified():
+                task.refresh()
+            return task
+        self.scan_tasks()
+        return self
+
+    @recorded("add_task")
     def add_task(self,
                  name,
                  categories,
@@ -360,6 +438,13 @@ class Subproject(Entity):
         file_name = f"{name}.ttask"
         relative_path = Path(self.path, file_name)
         abs_path = Path(self.guard.database_root, relative_path)
+        project = self.get_project()
+        batch = project.active_batch if project else None
+        if batch and batch.is_pending(abs_path):
+            LOG.warning(
+                f"There is a task under this sub-project with the same name => {name}"
+            )
+            return -1
         if abs_path.exists():
             # instanciate the task object and see if its deleted or not
             _task = Task(absolute_path=abs_path, parent_sub=self)
@@ -372,6 +457,7 @@ class Subproject(Entity):
             _task.revive()
             _task.edit(categories=categories, metadata_overrides=metadata_overrides, uid=uid)
             self._tasks[name] = _task
+            self.__register_task(_task)
             return _task
 
         _task_id = uid or self.generate_id()
@@ -403,8 +489,15 @@ class Subproject(Entity):
 
         _task.apply_settings()
         self._tasks[name] = _task
+        self.__register_task(_task)
         return _task
 
+    def __register_task(self, task):
+        """Register the task to the project lookups."""
+        project = self.get_project()
+        if project:
+            project.register_task(task)
+
     @staticmethod
     def is_task_empty(task):
         """Check all categories and return True if all are empty.
@@ -459,13 +552,39 @@ class Subproject(Entity):
             list: List of tasks matching the wildcard.
         """
         _tasks = self.get_tasks_by_wildcard(wildcard, query_all=query_all)
-        queue = list(self.subs.values())
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
-            _tasks.extend(current.get_tasks_by_wildcard(wildcard))
+            current = queue.popleft()
+            queue.extend(current.subs.values())
+            _tasks.extend(current.get_tasks_by_wildcard(wildcard, query_all=query_all))
         return _tasks
 
+    def _get_registered_task(self, uid):
+        """Return the task from the project lookups if it lives under this subproject.
+
+        The task is refreshed if its database file is modified.
+
+        Args:
+            uid (int): Unique id of the task.
+
+        Returns:
+            Task or None: The task object if found, None otherwise.
+        """
+        project = self.get_project()
+        if not project:
+            return None
+        task = project.lookup_task(uid)
+        if not task or not self.contains(task.parent_sub):
+            return None
+        try:
+            if task.is_modified():
+                task.refresh()
+        except OSError:
+            # the task file is removed from the disk.
+            project.unregister_task(task)
+            return None
+        return task if task.id == uid else None
+
     def find_task_by_id(self, uid, query_all=False):
         """Find the task by id.
 
@@ -476,15 +595,25 @@ class Subproject(Entity):
         Returns:
             Task or int: The task object if successful, -1 otherwise.
         """
-        # first check if the task is under this subproject
-        _search = self.get_task_by_id(uid, query_all=query_all)
-        if _search != -1:
-            return _search
-        queue = list(self.subs.values())
+        # first check the lookups of the tasks that are already known
+        _search = self._get_registered_task(uid)
+        if _search:
+            return _search if query_all or not _search.deleted else -1
+        # resolve the parent subproject from the project index, if enabled
+        _index = self.guard.project_index
+        _entry = _index.get_by_id(ObjectType.TASK, uid) if _index else None
+        if _entry:
+            _sub = self.find_sub_by_path(_entry["path"])
+            if _sub != -1:
+                _search = _sub.get_task_by_id(uid, query_all=query_all)
+                if _search != -1:
+                    return _search
+        # fall back to scanning the hierarchy. This registers the found tasks.
+        queue = deque([self])
         while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
-            _search = current.get_task_by_id(uid)
+            current = queue.popleft()
+            queue.extend(current.subs.values())
+            _search = current.get_task_by_id(uid, query_all=query_all)
             if _search != -1:
                 return _search
         return -1
@@ -501,12 +630,16 @@ class Subproject(Entity):
         """
         if self.id == uid:
             return self
-        queue = list(self.subs.values())
+        project = self.get_project()
+        if project:
+            sub = project.lookup_sub_by_id(uid)
+            return sub if sub and self.contains(sub) else -1
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if current.id == uid:
                 return current
-            queue.extend(list(current.subs.values()))
+            queue.extend(current.subs.values())
         return -1
 
     def find_sub_by_path(self, path):
@@ -521,12 +654,16 @@ class Subproject(Entity):
         """
         if path in ("", "."):  # this is root
             return self
-        queue = list(self.subs.values())
+        project = self.get_project()
+        if project:
+            sub = project.lookup_sub_by_path(path)
+            return sub if sub and self.contains(sub) else -1
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if current.path == path:
                 return current
-            queue.extend(list(current.subs.values()))
+            queue.extend(current.subs.values())
         return -1
 
     def find_subs_by_wildcard(self, wildcard):
@@ -539,14 +676,12 @@ class Subproject(Entity):
             list: List of subprojects matching the wildcard.
         """
         subs = []
-        queue = list(self.subs.values())
-        visited = []
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if fnmatch(current.name, wildcard):
                 subs.append(current)
-            if current not in visited:
-                queue.extend(list(current.subs.values()))
+            queue.extend(current.subs.values())
         return subs
 
     def get_uid_by_path(self, path):
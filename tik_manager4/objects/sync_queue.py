@@ -0,0 +1,326 @@
+"""Background queue syncing the localized works and publishes to the origin.
+
+The sync jobs run in a small pool of worker threads so that the DCC is not
+blocked while the files are transferred. The total transfer rate of the
+jobs can be limited. Failed jobs are retried a few times.
+
+The queue is stored in the local cache folder. The jobs left unfinished when
+the DCC is closed continue the next time the project is set. The copied
+parts of the files are kept, so the transfers continue where they stopped.
+
+Example:
+    queue = project.sync_queue
+    queue.add_callback(lambda status: print(status.job.name, status.progress))
+    queue.submit(publish_version)
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core import copier
+from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core.constants import ObjectType
+from tik_manager4.objects.version import PublishVersion
+from tik_manager4.objects.work import Work
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+DONE = "done"
+
+
+class SyncJob(NamedTuple):
+    """A work or publish version waiting to be synced."""
+
+    job_id: str
+    project_root: str
+    # the .twork file of the work versions or the .tpub file of the publishes
+    database_file: str
+    version_number: int
+    name: str
+    state: str = PENDING
+    attempts: int = 0
+    message: str = ""
+
+
+class SyncStatus(NamedTuple):
+    """Reported to the callbacks when a job changes or makes progress."""
+
+    job: SyncJob
+    # None if the state of the job changed
+    progress: copier.CopyProgress = None
+
+
+class SyncCancelled(Exception):
+    """Raised from the progress callback to stop the transfer."""
+
+
+class SyncQueue:
+    """Queue the sync jobs and run them in the background."""
+
+    file_name = "sync_queue.json"
+    workers = 2
+    # number of retries after the first attempt
+    retries = 3
+    # seconds to wait before the first retry. Doubles with each attempt.
+    retry_delay = 5.0
+
+    def __init__(self, cache_folder, workers=None, bandwidth_limit=None):
+        """Initialize the queue and load the unfinished jobs.
+
+        Args:
+            cache_folder (str or Path): The local cache folder to store the
+                queue in.
+            workers (int, optional): Number of jobs running at the same time.
+            bandwidth_limit (float, optional): Maximum total transfer rate in
+                bytes per second. No limit if not given.
+        """
+        # to tell if the queue needs to be created again
+        self.settings = (cache_folder, workers, bandwidth_limit)
+        self._file = Path(cache_folder) / self.file_name
+        self.workers = workers or self.workers
+        self._throttle = copier.Throttle(bandwidth_limit) if bandwidth_limit else None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._executor = None
+        self._futures = {}  # job id => future
+        self._callbacks = []
+        self._jobs = self._load()  # job id => SyncJob
+
+    @property
+    def jobs(self):
+        """List of the queued, running and failed jobs."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def add_callback(self, callback):
+        """Add a function to call with the SyncStatus of the jobs.
+
+        The callbacks are called from the worker threads.
+
+        Args:
+            callback (callable): Function accepting a SyncStatus object.
+        """
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Remove a callback added with add_callback."""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _notify(self, job, progress=None):
+        """Call the callbacks with the status of the job."""
+        for callback in list(self._callbacks):
+            try:
+                callback(SyncStatus(job, progress))
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.error(f"Sync callback failed: {exc}")
+
+    def _load(self):
+        """Read the unfinished jobs from the queue file."""
+        try:
+            with open(self._file, "r") as queue_file:
+                data = json.load(queue_file)
+        except (OSError, ValueError):
+            return {}
+        jobs = {}
+        for job_data in data:
+            job = SyncJob(**job_data)
+            if job.state == RUNNING:
+                # the application was closed during the transfer
+                job = job._replace(state=PENDING)
+            jobs[job.job_id] = job
+        return jobs
+
+    def _save(self):
+        """Write the jobs to the queue file. Must be called with the lock."""
+        data = [job._asdict() for job in self._jobs.values() if job.state != DONE]
+        try:
+            self._file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self._file.with_name(self._file.name + ".tmp")
+            with open(temp_file, "w") as queue_file:
+                json.dump(data, queue_file, indent=4)
+            os.replace(temp_file, self._file)
+        except OSError as exc:
+            LOG.error(f"Cannot save the sync queue: {exc}")
+
+    def _update(self, job_id, **changes):
+        """Change the job, save the queue and report the new state."""
+        with self._lock:
+            job = self._jobs[job_id]._replace(**changes)
+            if job.state == DONE:
+                self._jobs.pop(job_id)
+            else:
+                self._jobs[job_id] = job
+            self._save()
+        self._notify(job)
+        return job
+
+    def submit(self, version):
+        """Add the localized work or publish version to the queue.
+
+        Args:
+            version (WorkVersion or PublishVersion): The version to sync.
+
+        Returns:
+            SyncJob: The queued job. The existing job if the version is
+                already in the queue.
+        """
+        if version.object_type == ObjectType.WORK_VERSION:
+            database_file = version.parent_work.settings_file
+            base_name = version.parent_work.name
+        else:
+            database_file = version.settings_file
+            base_name = version.name
+        job = SyncJob(
+            job_id=uuid.uuid4().hex,
+            project_root=Path(version.guard.project_root).as_posix(),
+            database_file=Path(database_file).as_posix(),
+            version_number=version.version,
+            name=f"{base_name}_v{version.version:03d}",
+        )
+        with self._lock:
+            existing = next(
+                (queued for queued in self._jobs.values()
+                 if (queued.database_file, queued.version_number)
+                 == (job.database_file, job.version_number)),
+                None,
+            )
+            if existing and existing.state != FAILED:
+                return existing
+            if existing:
+                # submitting a failed job again resets its attempts
+                job = job._replace(job_id=existing.job_id)
+            self._jobs[job.job_id] = job
+            self._save()
+        self._notify(job)
+        self._start_job(job)
+        return job
+
+    def start(self, project_root):
+        """Start the unfinished jobs of the project.
+
+        Args:
+            project_root (str): The root folder of the current project. The
+                jobs of the other projects wait for their project to be set.
+        """
+        project_root = Path(project_root).as_posix()
+        self._stop_event.clear()
+        for job in self.jobs:
+            if job.state == PENDING and job.project_root == project_root:
+                self._start_job(job)
+
+    def _start_job(self, job):
+        """Run the job in the worker pool."""
+        with self._lock:
+            future = self._futures.get(job.job_id)
+            if future and not future.done():
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="tik_sync"
+                )
+            self._futures[job.job_id] = self._executor.submit(self._run, job.job_id)
+
+    def stop(self, wait=True):
+        """Stop the running transfers. They continue with the next start.
+
+        Args:
+            wait (bool): Wait for the workers to stop.
+        """
+        self._stop_event.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._futures = {}
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def wait(self, timeout=None):
+        """Wait for the started jobs to finish.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for each job.
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def _run(self, job_id):
+        """Sync the version of the job retrying on failures."""
+        job = self._update(job_id, state=RUNNING)
+        while True:
+            try:
+                state, msg = self._sync(job)
+            except SyncCancelled:
+                self._update(job_id, state=PENDING)
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                state, msg = False, str(exc)
+            if state:
+                self._update(job_id, state=DONE, message=str(msg))
+                return
+            attempts = job.attempts + 1
+            if attempts > self.retries:
+                LOG.error(f"Sync of {job.name} failed: {msg}")
+                self._update(job_id, state=FAILED, attempts=attempts, message=str(msg))
+                return
+            LOG.warning(f"Sync of {job.name} failed. Retrying: {msg}")
+            job = self._update(job_id, attempts=attempts, message=str(msg))
+            if self._stop_event.wait(self.retry_delay * 2 ** (attempts - 1)):
+                self._update(job_id, state=PENDING)
+                return
+
+    def _sync(self, job):
+        """Sync the version of the job.
+
+        Returns:
+            tuple: (bool, str) State and the message.
+        """
+        if self._stop_event.is_set():
+            raise SyncCancelled()
+        if not Path(job.database_file).exists():
+            return False, f"Database file not found: {job.database_file}"
+
+        def _progress(progress):
+            if self._stop_event.is_set():
+                raise SyncCancelled()
+            self._notify(job, progress)
+
+        if job.database_file.endswith(".tpub"):
+            version = PublishVersion(job.database_file)
+            work = None
+        else:
+            work = Work(job.database_file)
+            version = work.get_version(job.version_number)
+            if version is None:
+                return False, f"Version {job.version_number} not found in {job.database_file}"
+        if not version.localized:
+            return True, f"{job.name} is already synced."
+        state, msg = version.sync(progress_callback=_progress, throttle=self._throttle)
+        if state and work:
+            self._write_synced(job)
+        return state, msg
+
+    @staticmethod
+    def _write_synced(job):
+        """Mark the version of the job synced in the work file.
+
+        The work is read again under the write lock. The versions saved
+        while the files were transferred are kept.
+        """
+        with io.IO(job.database_file).lock():
+            work = Work(job.database_file)
+            version = work.get_version(job.version_number)
+            if version is None:
+                return
+            version.mark_synced()
+            work.apply_settings()
@@ -58,6 +58,8 @@ class Task(Settings, Entity):
         self._works = {}
         self._publishes = {}
         self._metadata_overrides = metadata_overrides or self.get_property("metadata_overrides", default={})
+        self._metadata = None
+        self._metadata_state = None  # (parent metadata, overrides) of the cached metadata
         self._task_id = self.get_property("task_id") or task_id
         self._relative_path = self.get_property("path") or path
         self._file_name = self.get_property("file_name") or file_name
@@ -74,6 +76,22 @@ class Task(Settings, Entity):
         self.reload()
         self.__init__(self.settings_file, parent_sub=self._parent_sub)
 
+    def apply_settings(self, force=False):
+        """Override the apply settings to keep the project index up to date.
+
+        Inside a project batch, the task file is written when the batch is
+        committed.
+        """
+        project = self._parent_sub.get_project() if self._parent_sub else None
+        batch = project.active_batch if project else None
+        if batch:
+            batch.defer_task(self, force=force)
+            return False
+        applied = super().apply_settings(force=force)
+        if applied:
+            self.update_index()
+        return applied
+
     @property
     def file_name(self):
         """File Name of the task settings file."""
@@ -116,12 +134,25 @@ class Task(Settings, Entity):
 
     @property
     def metadata(self):
-        """Metadata of the task."""
-        if self._parent_sub:
-            _metadata = self._parent_sub.metadata.copy()
-            _metadata.override(self._metadata_overrides)
-            return _metadata
-        return Metadata(self._metadata_overrides)
+        """Metadata of the task.
+
+        Chained to the metadata of the parent subproject. Rebuilt only if
+        the parent metadata or the overrides of the task are changed.
+        """
+        parent_metadata = self._parent_sub.metadata if self._parent_sub else None
+        state = self._metadata_state
+        if (
+            self._metadata is None
+            or state[0] is not parent_metadata
+            or state[1] != self._metadata_overrides
+        ):
+            if parent_metadata is not None:
+                self._metadata = Metadata(parent=parent_metadata)
+                self._metadata.override(self._metadata_overrides)
+            else:
+                self._metadata = Metadata(self._metadata_overrides)
+            self._metadata_state = (parent_metadata, dict(self._metadata_overrides))
+        return self._metadata
 
     @property
     def state(self):
@@ -189,7 +220,7 @@ class Task(Settings, Entity):
             LOG.warning(msg)
             return -1
         self._categories[category] = Category(name=category, parent_task=self)
-        self._current_value["categories"] = list(self._categories.keys())
+        self.edit_property("categories", list(self._categories.keys()))
         self.apply_settings()
         return self._categories[category]
 
@@ -290,7 +321,7 @@ class Task(Settings, Entity):
 
         # delete category from database
         self._categories.pop(category)
-        self._current_value["categories"] = list(self._categories.keys())
+        self.edit_property("categories", list(self._categories.keys()))
         self.apply_settings()
 
         return 1
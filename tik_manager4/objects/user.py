@@ -5,6 +5,7 @@ from pathlib import Path
 from tik_manager4.core.constants import ObjectType, ValidationState, ValidationResult
 from tik_manager4.core import filelog
 from tik_manager4.core import utils
+from tik_manager4.core.io import IO
 from tik_manager4.core.settings import Settings
 from tik_manager4.objects.commons import Commons
 from tik_manager4.objects.guard import Guard
@@ -22,6 +23,7 @@ class UserSettings(Settings):
     """Customized settings for the User class."""
     def apply_settings(self, force=False):
         """Apply the settings to the file."""
+        IO.set_cache_size(self._current_value.get("parse_cache_size", 64))
         original_folder = self._original_value.get("commonFolder", "")
         # if there is no original folder, it means that the user is not set yet
         if not original_folder:
@@ -362,6 +364,7 @@ class User:
         self.settings.add_property("image_viewer", "", force=False)
         self.settings.add_property("sequence_viewer", "", force=False)
         self.settings.add_property("video_player", "", force=False)
+        self.settings.add_property("parse_cache_size", 64, force=False)
         self.settings.apply_settings()
 
         self.commons = Commons(self.common_directory)
@@ -611,9 +614,9 @@ class User:
         if user_name not in self.commons.users.keys:
             return -1, LOG.error("User %s does not exist. Aborting" % user_name)
 
-        user_data = self.commons.users.get_property(user_name)
-        user_data["permissionLevel"] = self.__clamp_level(new_level)
-        self.commons.users.edit_property(user_name, user_data)
+        self.commons.users.edit_sub_property(
+            (user_name, "permissionLevel"), self.__clamp_level(new_level)
+        )
         self.commons.users.apply_settings()
         return 1, "Success"
 
@@ -632,8 +635,8 @@ class User:
         if self.__hash_pass(old_password) == self.commons.users.get_property(
             user_name
         ).get("pass"):
-            self.commons.users.get_property(user_name)["pass"] = self.__hash_pass(
-                new_password
+            self.commons.users.edit_sub_property(
+                (user_name, "pass"), self.__hash_pass(new_password)
             )
             self.commons.users.apply_settings()
             return 1, "Success"
@@ -657,8 +660,8 @@ class User:
             LOG.error(msg)
             return ValidationResult(ValidationState.ERROR, msg,
                                     allow_proceed=False)
-        self.commons.users.get_property(user_name)["pass"] = self.__hash_pass(
-            new_password
+        self.commons.users.edit_sub_property(
+            (user_name, "pass"), self.__hash_pass(new_password)
         )
         self.commons.users.apply_settings()
 
@@ -707,7 +710,9 @@ class User:
         """
         bookmark_list = self.bookmarks.get_property("bookmarkedProjects")
         if project_path not in bookmark_list:
-            bookmark_list.append(project_path)
+            self.bookmarks.edit_property(
+                "bookmarkedProjects", bookmark_list + [project_path]
+            )
             self.bookmarks.apply_settings()
             return 1
         else:
@@ -727,7 +732,9 @@ class User:
         if project_path not in bookmark_list:
             LOG.warning("Project %s doesn't exist in bookmarks" % project_path)
             return -1
-        bookmark_list.remove(project_path)
+        self.bookmarks.edit_property(
+            "bookmarkedProjects", [path for path in bookmark_list if path != project_path]
+        )
         self.bookmarks.apply_settings()
         return 1
 
@@ -746,6 +753,7 @@ class User:
         recent_list.append(path)
         if len(recent_list) > 10:
             recent_list.pop(0)
+        self.bookmarks.edit_property("recentProjects", recent_list)
         self.bookmarks.apply_settings(force=True)
 
     def get_recent_projects(self):
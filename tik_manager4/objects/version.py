@@ -1,10 +1,15 @@
 """Work and Publish objects."""
 
+from copy import copy
 from datetime import datetime
 from pathlib import Path
 
+from tik_manager4.core import copier
+from tik_manager4.core import manifest
 from tik_manager4.core import utils
-from tik_manager4.core.constants import ObjectType, ColorCodes, ValidationResult, ValidationState, BranchingModes
+from tik_manager4.core.constants import (
+    ObjectType, ColorCodes, ValidationResult, ValidationState, BranchingModes, MaterializationModes
+)
 from tik_manager4.core.settings import Settings
 from tik_manager4.mixins.localize import LocalizeMixin
 from tik_manager4.core import filelog
@@ -88,6 +93,13 @@ class PublishVersion(Settings, LocalizeMixin):
         self._localized_path = self.get_property("localized_path", self._localized_path)
         self._deleted = self.get_property("deleted", self._deleted)
 
+    def apply_settings(self, force=False):
+        """Override the apply settings to keep the project index up to date."""
+        applied = super().apply_settings(force=force)
+        if applied:
+            self.update_index()
+        return applied
+
     @property
     def creator(self):
         """The creator of the publish version."""
@@ -214,6 +226,51 @@ class PublishVersion(Settings, LocalizeMixin):
         promoted_folder = Path(self.get_abs_project_path()).parent / "PROMOTED"
         return promoted_folder
 
+    def _get_materialization_mode(self):
+        """Return the project setting for placing the elements into the branches."""
+        return self.guard.project_settings.get(
+            "branch_materialization", MaterializationModes.COPY.value
+        )
+
+    def _materialize(self, publish_path, branch_path, element_path=None, branch_object=None):
+        """Place the published element into the branch folder.
+
+        The element is skipped if the branch already has the same content
+        according to the manifest of the publish.
+
+        Args:
+            publish_path (Path): The published file or folder.
+            branch_path (Path): The path of the element in the branch.
+            element_path (str, optional): The relative path of the element
+                in the publish. Used to find the element in the manifest.
+            branch_object (Settings, optional): The live or promoted object
+                to get the mode of the skipped element from.
+
+        Returns:
+            tuple: (bool, str) State and the used mode or the error message.
+        """
+        mode = self._get_materialization_mode()
+        # symbolic links would keep pointing to the previous publish.
+        if element_path and not branch_path.is_symlink() and manifest.matches_copy(
+                branch_path, self.get_manifest(), element_path):
+            LOG.info(f"{branch_path.name} is up to date. Skipping.")
+            for branch_element in branch_object.get_property("elements", []) if branch_object else []:
+                if branch_element.get("path") == branch_path.name:
+                    return True, branch_element.get("materialization") or mode
+            return True, mode
+        if mode == MaterializationModes.COPY.value:
+            state, msg = utils.copy(publish_path.as_posix(), branch_path.as_posix())
+            return state, mode if state else msg
+        try:
+            # the previous versions of the element may share the hard links
+            # with the branch element
+            used_mode = copier.materialize(
+                publish_path, branch_path, mode=mode, restore=publish_path.parent
+            )
+        except (OSError, ValueError) as exc:
+            return False, str(exc)
+        return True, used_mode.value
+
     def is_deleted(self):
         """Convenience method to check if the publish version is deleted."""
         return self._deleted
@@ -237,12 +294,15 @@ class PublishVersion(Settings, LocalizeMixin):
             "name": self._name,
             "path": live_folder.relative_to(self.guard.project_root).as_posix(),
             "version_number": self._version,
+            "materialization": self._get_materialization_mode(),
             "elements": []
         }
 
         for element_data in self.elements:
             element_type = element_data["type"]
-            publish_path = Path(self.get_element_path(element_type, relative=False))
+            publish_path = Path(self.get_element_path(element_type, relative=False, cached=False))
+            # stays None for the usd elements. They are referenced with a layer.
+            materialization = None
             # construct the name of the LIVE element from the data
             # if it's a usd
             if publish_path.suffix.startswith(".usd"):
@@ -263,8 +323,11 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 live_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 live_path = live_folder / live_element_name
-                state, msg = utils.copy(publish_path.as_posix(), live_path.as_posix())
+                state, materialization = self._materialize(
+                    publish_path, live_path, element_data["path"], self._live_object
+                )
                 if not state:
+                    msg = materialization
                     # TODO: FIX - TEST - STREAMLINE
                     LOG.error(f"Error copying {publish_path} to {live_path}: {msg}")
                     return ValidationResult(ValidationState.ERROR, msg, False)
@@ -282,6 +345,7 @@ class PublishVersion(Settings, LocalizeMixin):
                 "bundled": element_data["bundled"],
                 "bundle_info": element_data["bundle_info"],
                 "bundle_match_id": element_data["bundle_match_id"],
+                "materialization": materialization,
             })
         self._live_object.set_data(_data)
         self._live_object.apply_settings(force=True)
@@ -332,12 +396,15 @@ class PublishVersion(Settings, LocalizeMixin):
             "name": self._name,
             "path": promoted_folder.relative_to(self.guard.project_root).as_posix(),
             "version_number": self.version,
+            "materialization": self._get_materialization_mode(),
             "elements": []
         }
 
         for element_data in self.elements:
             element_type = element_data["type"]
-            publish_path = Path(self.get_element_path(element_type, relative=False))
+            publish_path = Path(self.get_element_path(element_type, relative=False, cached=False))
+            # stays None for the usd elements. They are referenced with a layer.
+            materialization = None
             # construct the name of the LIVE element from the data
             # if it's a usd
             if publish_path.suffix.startswith(".usd"):
@@ -358,8 +425,11 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 promoted_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 promoted_path = promoted_folder / promoted_element_name
-                state, msg = utils.copy(publish_path.as_posix(), promoted_path.as_posix())
+                state, materialization = self._materialize(
+                    publish_path, promoted_path, element_data["path"], self._promoted_object
+                )
                 if not state:
+                    msg = materialization
                     LOG.error(f"Error copying {publish_path} to {promoted_path}: {msg}")
                     return ValidationResult(ValidationState.ERROR, msg, False)
             # get the relative path against the project path
@@ -375,6 +445,7 @@ class PublishVersion(Settings, LocalizeMixin):
                 "bundled": element_data.get("bundled", False),
                 "bundle_info": element_data.get("bundle_info", {}),
                 "bundle_match_id": element_data.get("bundle_match_id", 0),
+                "materialization": materialization,
             })
         self._promoted_object.set_data(_data)
         self._promoted_object.apply_settings(force=True)
@@ -421,28 +492,91 @@ class PublishVersion(Settings, LocalizeMixin):
                 return element
         return None
 
-    def get_element_path(self, element_type, relative=True):
+    def get_element_path(self, element_type, relative=True, cached=True):
         """Return the element path of the given element type.
 
         Args:
             element_type (str): The type of the element.
             relative (bool, optional): If True, returns the relative path.
                 If False, returns the absolute path. Default is True.
+            cached (bool, optional): If True and the read cache is enabled,
+                the absolute path resolves to the valid cached copy of the
+                element. Missing copies are fetched in the background.
+                Default is True.
 
         Returns:
             str: The path of the element or None if not found.
         """
         for element in self.elements:
             if element["type"] == element_type:
-                path = (
-                    element["path"]
-                    if relative
-                    # else (self.get_abs_project_path(element["path"]))
-                    else (self.get_resolved_path(element["path"]))
-                )
+                if relative:
+                    return element["path"]
+                path = self.get_resolved_path(element["path"])
+                if cached:
+                    path = self._get_cached_element_path(path, element["path"])
                 return path
         return None
 
+    def _get_cached_element_path(self, path, element_path):
+        """Return the cached copy of the element or the given path."""
+        read_cache = self.guard.read_cache
+        # usd layers may point to the other files with relative paths
+        if not read_cache or self.localized or Path(path).suffix.startswith(".usd"):
+            return path
+        hashes = self._get_element_hashes(element_path)
+        cached_path = read_cache.get_cached_path(path, hashes=hashes)
+        if cached_path:
+            return cached_path
+        read_cache.request(path, hashes=hashes)
+        return path
+
+    def _get_element_hashes(self, element_path):
+        """Return relative path => content hash of the element files.
+
+        The relative paths are relative to the element. The path of a
+        single file element is empty.
+        """
+        hashes = {}
+        for key, entry in self.get_manifest().items():
+            if key == element_path:
+                hashes[""] = entry.hash
+            elif key.startswith(f"{element_path}/"):
+                hashes[key[len(element_path) + 1:]] = entry.hash
+        return hashes
+
+    def get_manifest(self):
+        """Return the content manifest of the publish.
+
+        Returns:
+            dict: Relative posix path => ManifestEntry. Empty if the publish
+                has no manifest.
+        """
+        return manifest.read(manifest.get_manifest_path(self.settings_file))
+
+    def verify(self, deep=False, element_type=None):
+        """Check the published files against the manifest.
+
+        Args:
+            deep (bool): Compare the content hashes of all files. Otherwise
+                only the files with different modified times are hashed.
+            element_type (str, optional): Check only this element.
+
+        Returns:
+            tuple: (bool, list) State and the messages of the missing or
+                modified files.
+        """
+        entries = self.get_manifest()
+        if not entries:
+            return False, [f"No manifest found for {self.nice_name}."]
+        prefix = None
+        if element_type:
+            prefix = self.get_element_path(element_type)
+            if prefix is None:
+                return False, [f"{element_type} element not found in {self.nice_name}."]
+        root = self.localized_path if self.localized else self.get_abs_project_path()
+        problems = manifest.verify(root, entries, deep=deep, prefix=prefix)
+        return not problems, problems
+
     def get_element_suffix(self, element_type):
         """Return the element suffix of the given element type.
 
@@ -594,6 +728,10 @@ class LiveVersion(PublishVersion):
         live_folder = self._get_live_folder()
         return Path(live_folder, *args).as_posix()
 
+    def _get_element_hashes(self, element_path):
+        """The branch elements are not listed in the manifest of the publish."""
+        return None
+
     def get_display_color(self):
         """Return the display color of the version.
 
@@ -641,6 +779,10 @@ class PromotedVersion(PublishVersion):
         promoted_folder = self._get_promoted_folder()
         return Path(promoted_folder, *args).as_posix()
 
+    def _get_element_hashes(self, element_path):
+        """The branch elements are not listed in the manifest of the publish."""
+        return None
+
     def get_display_color(self):
         """Return the display color of the version.
 
@@ -753,7 +895,8 @@ class WorkVersion(LocalizeMixin):
         for key, value in dictionary.items():
             # add a leading underscore to directly write into protected attrs.
             key = f"_{key}"
-            setattr(self, key, value)
+            # do not share the nested values with the settings data.
+            setattr(self, key, copy(value) if isinstance(value, (dict, list)) else value)
 
     def to_dict(self):
         """Convert the WorkVersion object to a dictionary."""
@@ -766,7 +909,7 @@ class WorkVersion(LocalizeMixin):
             "dcc_version": self._dcc_version,
             "localized": self._localized,
             "localized_path": self._localized_path,
-            "previews": self._previews,
+            "previews": dict(self._previews),
             "thumbnail": self._thumbnail,
             "workstation": self._workstation,
             "deleted": self._deleted
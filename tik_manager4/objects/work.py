@@ -10,6 +10,8 @@ from tik_manager4.core.constants import ObjectType
 from tik_manager4.dcc.standalone.main import Dcc as StandaloneDcc
 from tik_manager4.core.settings import Settings
 from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core import snapshot
 from tik_manager4.objects.publish import Publish
 from tik_manager4.objects.version import WorkVersion
 from tik_manager4.mixins.localize import LocalizeMixin
@@ -22,6 +24,8 @@ class Work(Settings, LocalizeMixin):
 
     _standalone_handler = StandaloneDcc()
     object_type = ObjectType.WORK
+    # number of outdated records allowed in the journal file before compacting
+    journal_slack = 50
 
     def __init__(self, absolute_path, name=None, path=None, parent_task=None):
         """Initialize the Work object.
@@ -54,10 +58,9 @@ class Work(Settings, LocalizeMixin):
         self._state = "working"
 
         self.modified_time = None  # to compare and update if necessary
-        self.publish = None
+        self._publish = None  # created on first access
+        self._published = None  # cached flag for the published state
         self.init_properties()
-        self.init_publish()
-
 
     def init_properties(self):
         """Initialize the properties of the work from the inherited dictionary."""
@@ -76,18 +79,72 @@ class Work(Settings, LocalizeMixin):
         # keeping the 'working' state for backward compatibility.
 
     def init_publish(self):
-        self.publish = Publish(
+        """Create the publish object of the work."""
+        self._publish = Publish(
             self
         )
-        if self._state == "active" or self._state == "working":
-            if self.publish.versions:
-                self._state = "published"
+        return self._publish
+
+    @property
+    def publish(self):
+        """Publish object of the work. Created on the first access."""
+        if self._publish is None:
+            self.init_publish()
+        return self._publish
 
     @property
     def state(self):
         """Current state of the work."""
+        if self._state in ("active", "working") and self.is_published():
+            return "published"
         return self._state
 
+    def is_published(self):
+        """Check if the work has any publish versions.
+
+        Uses the publish object if it is already scanned. Otherwise the
+        result is resolved from the project index or the publish folder
+        once and cached, without constructing the publish object.
+
+        Returns:
+            bool: True if there are publish versions.
+        """
+        if self._publish is not None and self._publish.all_versions:
+            return bool(self._publish.versions)
+        if self._published is None:
+            index = self.guard.project_index
+            entries = index.find_publish_versions(
+                name=self._name,
+                task_id=self._task_id,
+                path=Path(self.path, "publish").as_posix(),
+                deleted=False
+            ) if index else None
+            # the index may be stale. e.g. the files deleted by other tools.
+            if entries is not None and all(
+                Path(entry["absolute_path"]).exists() for entry in entries
+            ):
+                self._published = bool(entries)
+            else:
+                publish_folder = self.get_abs_database_path("publish", self._name)
+                self._published = any(
+                    not self._is_deleted_publish(file_snapshot.path)
+                    for file_snapshot in snapshot.scan_directory(publish_folder, ".tpub")
+                )
+        return self._published
+
+    def invalidate_published(self):
+        """Forget the cached published state. It is resolved again when needed."""
+        self._published = None
+
+    @staticmethod
+    def _is_deleted_publish(publish_file):
+        """Check the deleted flag of the .tpub file without the publish object."""
+        try:
+            return bool(io.IO().read(publish_file).get("deleted", False))
+        except (OSError, ValueError) as exc:
+            LOG.warning(f"Cannot read the publish file {publish_file}: {exc}")
+            return False
+
     @property
     def dcc(self):
         """Name of the DCC that the work is originated from."""
@@ -275,7 +332,78 @@ class Work(Settings, LocalizeMixin):
         """Override the apply settings to add version serialization before."""
         self.edit_property("versions",
                            [version.to_dict() for version in self._versions])
-        super(Work, self).apply_settings(force=force)
+        if self._is_journaled():
+            applied = self._apply_journal(force=force)
+        else:
+            applied = super(Work, self).apply_settings(force=force)
+        if applied:
+            self.update_index()
+            self._update_category_cache()
+            self._update_scene_lookup()
+        return applied
+
+    def _update_category_cache(self):
+        """Keep the cached works of the parent category up to date."""
+        if not self._parent_task:
+            return
+        category = self._parent_task.categories.get(self.get_property("category"))
+        if category:
+            category.cache_work(self)
+
+    def _update_scene_lookup(self):
+        """Keep the scene files of the versions in the project lookup."""
+        parent_sub = self._parent_task.parent_sub if self._parent_task else None
+        project = parent_sub.get_project() if parent_sub else None
+        if project:
+            project.register_work(self)
+
+    def _is_journaled(self):
+        """Check if the project stores the works as journal files."""
+        project_settings = self.guard.project_settings
+        return bool(project_settings and project_settings.get("journaled_works", False))
+
+    def _apply_journal(self, force=False):
+        """Write the changes to the journal file.
+
+        New and edited versions are appended to the end of the file as
+        records. The whole file is rewritten (compacted) if the header data
+        changed, a version is removed, the file is in the old json layout or
+        there are too many outdated records in it.
+
+        Args:
+            force (bool): Whether to force write the settings or not.
+
+        Returns:
+            bool: True if the settings were written to file, False otherwise.
+        """
+        if not self.is_settings_changed() and not force:
+            return False
+        header = {key: val for key, val in self._current_value.items() if key != "versions"}
+        original_header = {key: val for key, val in self._original_value.items() if key != "versions"}
+        versions = self._current_value.get("versions", [])
+        written_versions = self._original_value.get("versions", [])
+        records = [
+            (None if index >= len(written_versions) else index, version)
+            for index, version in enumerate(versions)
+            if index >= len(written_versions) or written_versions[index] != version
+        ]
+        journal_records = self._io.journal_records
+        compact = (
+            force
+            or journal_records is None
+            or not self._io.file_exists(self.settings_file)
+            or header != original_header
+            or len(versions) < len(written_versions)
+            or journal_records + len(records) - len(versions) > self.journal_slack
+        )
+        if compact:
+            self._io.write_journal(header, "versions", versions)
+        elif records:
+            self._io.append_journal(records)
+        # only after the write. A failed write keeps the changes pending.
+        self._mark_applied()
+        self._time_stamp = self._io.get_modified_time()
+        return True
 
     def new_version(self, file_format=None, notes="", ignore_checks=True, from_selection=False):
         """Create a new version of the work.
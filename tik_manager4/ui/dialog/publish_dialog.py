@@ -497,17 +497,28 @@ class PublishSceneDialog(QtWidgets.QDialog):
     def validate_all(self):
         """Validate all the validators."""
         self.reset_validators()
-        for validator_widget in self._validator_widgets:
-            # if it is already validated or unchecked skip
-            if (
-                validator_widget.validator.state == "passed"
-                or not validator_widget.checkbox.isChecked()
-            ):
-                continue
-            validator_widget.validate()
+        # skip the already validated or unchecked ones
+        widgets = {
+            id(validator_widget.validator): validator_widget
+            for validator_widget in self._validator_widgets
+            if validator_widget.validator.state != "passed"
+            and validator_widget.checkbox.isChecked()
+        }
+
+        def _on_validated(validator):
+            """Update the widget of the finished validator."""
+            LOG.info("%s validated in %.3f seconds", validator.name, validator.wall_time)
+            widgets[id(validator)].update_state()
             # keep updating the ui
             QtWidgets.QApplication.processEvents()
 
+        self.project.publisher.validate(
+            validators=[widget.validator for widget in widgets.values()],
+            callback=_on_validated,
+        )
+        for validator_widget in self._validator_widgets:
+            validator_widget.update_state()
+
     def extract_all(self, callback_handler=None):
         """Extract all the extractors."""
         # single extractors are not saving the scene. Make sure the scene saved first
@@ -5,7 +5,7 @@ import sys  # This is required for the 'frozen' attribute DO NOT REMOVE
 from pathlib import Path
 import logging
 
-from tik_manager4.core.constants import DataTypes, BranchingModes
+from tik_manager4.core.constants import DataTypes, BranchingModes, MaterializationModes
 
 from tik_manager4.ui.Qt import QtWidgets, QtCore
 from tik_manager4.ui.widgets.validated_string import ValidatedString
@@ -205,6 +205,15 @@ class SettingsDialog(QtWidgets.QDialog):
                     "user_templates_directory"
                 ),
             },
+            "parse_cache_size": {
+                "display_name": "Database Parse Cache (MB) :",
+                "tooltip": "Maximum memory used to cache the parsed database files.\n"
+                           "Files are parsed again only if they are modified. 0 disables the cache.",
+                "type": DataTypes.SPINNERINT.value,
+                "minimum": 0,
+                "maximum": 4096,
+                "value": self.main_object.user.settings.get_property("parse_cache_size", 64),
+            },
             "_separator_2": {
                 "display_name": "",
                 "value": "--------------------------------------------------------",
@@ -304,7 +313,43 @@ class SettingsDialog(QtWidgets.QDialog):
                 "type": DataTypes.BOOLEAN.value,
                 "tooltip": "If enabled, publish files will be stored in the cache folder and won't be accessible for other users until its synced.",
                 "value": self.main_object.user.localization.get_property("cache_publishes", False),
-            }
+            },
+            "sync_workers": {
+                "display_name": "Sync Workers",
+                "type": DataTypes.SPINNERINT.value,
+                "tooltip": "Number of versions synced to the origin at the same time in the background.",
+                "minimum": 1,
+                "maximum": 16,
+                "value": self.main_object.user.localization.get_property("sync_workers", 2),
+            },
+            "sync_bandwidth_limit": {
+                "display_name": "Sync Bandwidth Limit (MB/s)",
+                "type": DataTypes.SPINNERFLOAT.value,
+                "tooltip": "Maximum total transfer rate of the background syncs. 0 means no limit.",
+                "minimum": 0.0,
+                "maximum": 10000.0,
+                "value": self.main_object.user.localization.get_property("sync_bandwidth_limit", 0.0),
+            },
+            "read_cache": {
+                "display_name": "Read Cache",
+                "type": DataTypes.BOOLEAN.value,
+                "tooltip": "If enabled, the published elements are copied to the cache folder and read from there while they are up to date.",
+                "value": self.main_object.user.localization.get_property("read_cache", False),
+            },
+            "read_cache_size": {
+                "display_name": "Read Cache Size (GB)",
+                "type": DataTypes.SPINNERFLOAT.value,
+                "tooltip": "Maximum size of the read cache. The least recently used elements are removed when exceeded.",
+                "minimum": 1.0,
+                "maximum": 100000.0,
+                "value": self.main_object.user.localization.get_property("read_cache_size", 20.0),
+            },
+            "cache_thumbnails": {
+                "display_name": "Cache Thumbnails",
+                "type": DataTypes.BOOLEAN.value,
+                "tooltip": "If enabled, the downscaled thumbnails are stored in the cache folder.",
+                "value": self.main_object.user.localization.get_property("cache_thumbnails", False),
+            },
         }
 
         # fill the content
@@ -480,7 +525,77 @@ class SettingsDialog(QtWidgets.QDialog):
                            "Active branches are overwritten duplicates of specific published versions.\n"
                            "Passive branches method won't overwrite the branch but still keep\n"
                            "track of the versions that the branches are originated from.\n",
-            }
+            },
+            "branch_materialization": {
+                "display_name": "Branch Materialization",
+                "type": DataTypes.COMBO.value,
+                "items": [mode.value for mode in MaterializationModes],
+                "value": self.main_object.project.settings.get_property(
+                    "branch_materialization", MaterializationModes.COPY.value
+                ),
+                "tooltip": "How the published elements are placed into the LIVE and PROMOTED folders\n"
+                           "with Active Branches. Links avoid duplicating the files on the server.\n"
+                           "Falls back to copying if the file system does not support the selected mode.\n",
+            },
+            "hash_exports": {
+                "display_name": "Hash Exported Files",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("hash_exports", False),
+                "tooltip": "Read the files exported by the DCCs again after publishing to store\n"
+                           "their content hashes in the publish manifest.\n"
+                           "The copied files are always hashed while they are copied.\n",
+            },
+            "database_index": {
+                "display_name": "Database Index",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("database_index", False),
+                "tooltip": "Keep a searchable index (tikDatabase/index.sqlite) of tasks, works\n"
+                           "and publishes. Speeds up the lookups on large projects.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
+            "journaled_works": {
+                "display_name": "Journaled Work Files",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("journaled_works", False),
+                "tooltip": "Append the new versions to the end of the work files instead of\n"
+                           "rewriting the whole file each time. Files are compacted occasionally.\n"
+                           "Existing work files are converted the next time they are saved.\n",
+            },
+            "database_watcher": {
+                "display_name": "Watch Database Changes",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("database_watcher", False),
+                "tooltip": "Watch the database folder and reload only the changed tasks, works\n"
+                           "and publishes instead of rescanning the folders.\n"
+                           "Uses inotify on Linux and polling on the other platforms.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
+            "database_watcher_interval": {
+                "display_name": "Database Polling Interval",
+                "type": DataTypes.SPINNERFLOAT.value,
+                "minimum": 1.0,
+                "maximum": 600.0,
+                "value": self.main_object.project.settings.get_property("database_watcher_interval", 10.0),
+                "tooltip": "Seconds between the checks of the database folders when the changes\n"
+                           "are polled. Each check reads all the folders, keep it long on large projects.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
+            "compact_structure": {
+                "display_name": "Compact Project Structure",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("compact_structure", False),
+                "tooltip": "Write the project structure file without indentation.\n"
+                           "Makes the file much smaller and faster to read on large projects.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
+            "journaled_structure": {
+                "display_name": "Journaled Project Structure",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("journaled_structure", False),
+                "tooltip": "Append the created, edited and deleted subprojects to the end of the\n"
+                           "project structure file instead of rewriting the whole file each time.\n"
+                           "The file is compacted occasionally.\n",
+            },
         }
 
         # fill the content
@@ -585,6 +700,15 @@ class SettingsDialog(QtWidgets.QDialog):
         if close_dialog:
             self.close()
 
+    def _track_settings(self, settings_object):
+        """Register the settings object to apply or discard with the dialog.
+
+        The widgets edit the nested values in place. A snapshot is taken to
+        detect and revert those edits.
+        """
+        settings_object.snapshot()
+        self.settings_list.append(settings_object)
+
     def check_changes(self):
         """Check if there are changes in the settings and enable the apply button."""
 
@@ -694,7 +818,7 @@ class SettingsDialog(QtWidgets.QDialog):
         scroll_layout.setContentsMargins(0, 0, 0, 0)
 
         # Actual content creation begins here..
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
         ui_definition = ui_definition or convert_to_ui_definition(
             settings_data.properties
         )
@@ -713,7 +837,7 @@ class SettingsDialog(QtWidgets.QDialog):
 
         settings_data = self.main_object.project.guard.category_definitions
         availability_dict = self._gather_validations_and_extracts()
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
 
         project_category_definitions_widget = CategoryDefinitions(
             settings_data,
@@ -735,7 +859,7 @@ class SettingsDialog(QtWidgets.QDialog):
         """Create the metadata content."""
         settings_data = self.main_object.project.metadata_definitions
         # add it to the global settings list so it can be checked globally.
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
 
         metadata_widget = MetadataDefinitions(
             settings_data, title="Metadata Definitions", parent=self
@@ -752,7 +876,7 @@ class SettingsDialog(QtWidgets.QDialog):
         """Create the common metadata content."""
         settings_data = self.main_object.user.commons.metadata
         # add it to the global settings list so it can be checked globally.
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
 
         common_metadata_widget = MetadataDefinitions(
             settings_data, title="Metadata Definitions (Common)", parent=self
@@ -769,7 +893,7 @@ class SettingsDialog(QtWidgets.QDialog):
         """Create the common category definitions."""
         settings_data = self.main_object.user.commons.category_definitions
         availability_dict = self._gather_validations_and_extracts()
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
 
         common_category_definitions_widget = CategoryDefinitions(
             settings_data,
@@ -789,7 +913,7 @@ class SettingsDialog(QtWidgets.QDialog):
         """Create the user management content."""
         settings_data = self.main_object.user.commons.users
         # add the settings data so it can be checked for alterations within the entire dialog
-        self.settings_list.append(settings_data)
+        self._track_settings(settings_data)
 
         user_management_widget = UsersDefinitions(
             self.main_object.user, title="Users Management", parent=self
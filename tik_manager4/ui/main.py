@@ -26,7 +26,7 @@ import webbrowser
 
 import tik_manager4
 import tik_manager4._version as version
-from tik_manager4.core.constants import ValidationResult, ValidationState
+from tik_manager4.core.constants import ObjectType, ValidationResult, ValidationState
 from tik_manager4 import management
 from tik_manager4.core import utils
 from tik_manager4.management.exceptions import SyncError
@@ -179,6 +179,11 @@ class MainUI(QtWidgets.QMainWindow):
 
         self.management_lock()
 
+        # apply the changes collected by the database watcher
+        self._database_changes_timer = QtCore.QTimer(self)
+        self._database_changes_timer.timeout.connect(self.on_database_changes)
+        self._database_changes_timer.start(1000)
+
         self.status_bar.showMessage("Status | Ready")
 
     def support_splash(self, count_limit=10):
@@ -390,6 +395,8 @@ class MainUI(QtWidgets.QMainWindow):
         self.subprojects_mcv.sub_view.item_selected.connect(
             self.tasks_mcv.task_view.set_tasks
         )
+        # cache the LIVE and PROMOTED elements of the selected subproject
+        self.subprojects_mcv.sub_view.item_selected.connect(self.tik.project.prefetch)
         self.subprojects_mcv.sub_view.add_item.connect(
             self.tasks_mcv.task_view.add_tasks
         )
@@ -1085,6 +1092,8 @@ class MainUI(QtWidgets.QMainWindow):
 
     def refresh_project(self):
         """Refresh the project ui."""
+        # make the cached scans stale to read the changes of the other users.
+        self.tik.project.guard.new_refresh_epoch()
         self.set_last_state()
         self.project_mcv.refresh()
         self.refresh_subprojects()
@@ -1108,6 +1117,23 @@ class MainUI(QtWidgets.QMainWindow):
         """Refresh the versions' ui."""
         self.versions_mcv.refresh()
 
+    def on_database_changes(self):
+        """Update the views for the changes collected by the database watcher."""
+        if not self.tik.project.watcher:
+            return
+        affected = self.tik.project.apply_database_changes()
+        if not affected:
+            return
+        types = {obj.object_type for obj in affected}
+        if ObjectType.PROJECT in types:
+            self.refresh_project()
+        elif types & {ObjectType.SUBPROJECT, ObjectType.TASK}:
+            self.set_last_state()
+            self.tasks_mcv.task_view.refresh()
+            self.resume_last_state()
+        else:
+            self.refresh_versions()
+
     def refresh(self):
         """Refresh the entire UI."""
         self.versions_mcv.update_preview_settings()
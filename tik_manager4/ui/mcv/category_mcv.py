@@ -944,7 +944,8 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self.category_tab_widget.blockSignals(True)
         self.category_tab_widget.clear()
         for key, category in categories.items():
-            category.scan_works()
+            # scanned when the tab is shown
+            category.invalidate()
             self.pre_tab = QtWidgets.QWidget()
             self.pre_tab.setObjectName(key)
             self.category_tab_widget.addTab(self.pre_tab, key)
@@ -976,10 +977,13 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self._last_category = self.category_tab_widget.tabText(index)
         if not self._last_category:
             return
+        category = self.task.categories[self._last_category]
+        # read the works created or changed by the others
+        category.refresh()
         if self._purgatory_mode:
-            works = self.task.categories[self._last_category].all_works
+            works = category.all_works
         else:
-            works = self.task.categories[self._last_category].works
+            works = category.works
         if self.mode == 0 and self._last_category:
             self.work_tree_view.model.set_works(works.values())
         else:
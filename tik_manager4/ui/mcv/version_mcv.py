@@ -13,6 +13,7 @@ from tik_manager4.ui.widgets.info import ImageWidget, NotesEditor
 from tik_manager4.ui.dialog.bunde_ingest_dialog import BundleIngestDialog
 from tik_manager4.ui.dialog.info_dialog import InfoDialog
 from tik_manager4.core import filelog
+from tik_manager4.core import watcher
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -163,6 +164,8 @@ class TikVersionWidget(QtWidgets.QWidget):
     element_view_event = QtCore.Signal(str, str)
     status_updated = QtCore.Signal(str, int)
     version_resurrected = QtCore.Signal()
+    # emitted from the sync workers with the SyncStatus objects
+    sync_status_received = QtCore.Signal(object)
 
     def __init__(self, project_object, *args, **kwargs):
         """Initialize the TikVersionLayout."""
@@ -174,6 +177,8 @@ class TikVersionWidget(QtWidgets.QWidget):
         self._parent = _parent
         self.feedback = Feedback(parent=self._parent)
         self.app_instance = QtWidgets.QApplication.instance()
+        self._sync_queue = None
+        self.sync_status_received.connect(self._on_sync_status)
 
         self._main_layout = QtWidgets.QVBoxLayout(self)
         self._main_layout.setContentsMargins(0, 0, 0, 0)
@@ -322,6 +327,7 @@ class TikVersionWidget(QtWidgets.QWidget):
 
         # Set aspect ratio from settings
         self.info.thumbnail.set_preview_settings(self.project.preview_settings)
+        self.update_thumbnail_cache()
 
         self._main_layout.addWidget(self.info.thumbnail)
 
@@ -427,6 +433,13 @@ class TikVersionWidget(QtWidgets.QWidget):
         )
         if are_you_sure == "cancel":
             return
+        queue = self.project.sync_queue
+        if queue:
+            self._watch_sync_queue(queue)
+            queue.submit(_version)
+            self.toggle_sync_state(False)
+            self.status_updated.emit(f"{_version.nice_name} queued to sync.", 5000)
+            return
         ret, msg = _version.sync()
         if not ret:
             self.feedback.pop_info(
@@ -443,6 +456,36 @@ class TikVersionWidget(QtWidgets.QWidget):
         self.toggle_sync_state(False)
         self.status_updated.emit("Synced to origin.", 5000)
 
+    def _watch_sync_queue(self, queue):
+        """Forward the sync status of the queue to the widget."""
+        if queue is self._sync_queue:
+            return
+        if self._sync_queue:
+            self._sync_queue.remove_callback(self.sync_status_received.emit)
+        self._sync_queue = queue
+        queue.add_callback(self.sync_status_received.emit)
+
+    def _on_sync_status(self, status):
+        """Show the progress and the result of the background syncs."""
+        if status.progress:
+            self.status_updated.emit(f"Syncing {status.job.name}: {status.progress}", 2000)
+            return
+        if status.job.state == "done":
+            self.status_updated.emit(f"{status.job.name} synced to origin.", 5000)
+            # reload the cached objects of the synced file. They would write
+            # the localized state back otherwise.
+            self.project.apply_database_changes(
+                [watcher.Change(watcher.MODIFIED, Path(status.job.database_file))]
+            )
+            self.refresh()
+        elif status.job.state == "failed":
+            self.feedback.pop_info(
+                title="Sync failed",
+                text=f"The sync operation of {status.job.name} failed.",
+                details=status.job.message,
+                critical=True,
+            )
+
     def on_import(self):
         """Import the current version."""
         if not self.base:
@@ -933,6 +976,7 @@ class TikVersionWidget(QtWidgets.QWidget):
     def refresh(self):
         """Refresh the version layout."""
         self.update_preview_settings()
+        self.update_thumbnail_cache()
         if self.base:
             self.base.reload()
             self.populate_versions(self.base)
@@ -947,6 +991,15 @@ class TikVersionWidget(QtWidgets.QWidget):
         # The widget handles reading the settings itself
         self.info.thumbnail.adjust_height_to_ratio()
 
+    def update_thumbnail_cache(self):
+        """Store the scaled thumbnails in the local cache folder if enabled."""
+        localize_settings = self.project.guard.localize_settings
+        cache_folder = localize_settings.get("local_cache_folder") if localize_settings else None
+        if cache_folder and localize_settings.get("cache_thumbnails", False):
+            self.info.thumbnail.thumbnail_service.set_disk_folder(Path(cache_folder, "thumbnails"))
+        else:
+            self.info.thumbnail.thumbnail_service.set_disk_folder(None)
+
     def on_replace_thumbnail(self, mode="view"):
         """Replace the thumbnail with the current view or external file."""
         if not self.base:
@@ -0,0 +1,180 @@
+"""Thumbnail service decoding the images off the UI thread.
+
+The thumbnails are read and scaled down in a thread pool. The scaled images
+are kept in memory keyed by the path and the modified time of the file so
+that going back and forth between the versions does not read them again.
+Optionally, the scaled images are written to a local folder as well.
+
+The animated thumbnails (gif, webp) are read into the memory as they are.
+QMovie plays them from the memory instead of the database folder.
+
+Example:
+    service = thumbnails.get_service()
+    service.thumbnail_ready.connect(on_ready)
+    data = service.request(thumbnail_path)  # QImage, QByteArray or None
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from tik_manager4.ui.Qt import QtCore, QtGui
+
+ANIMATED_SUFFIXES = (".gif", ".webp")
+
+_SERVICE = None
+
+
+class _DecodeSignals(QtCore.QObject):
+    """Signals of the decode task. QRunnable cannot have signals."""
+
+    # path, modified time, QImage or QByteArray. The modified time is None
+    # if the file is missing. The data is None if the cached one is valid.
+    finished = QtCore.Signal(str, object, object)
+
+
+class _DecodeTask(QtCore.QRunnable):
+    """Read and scale down a thumbnail in the thread pool."""
+
+    def __init__(self, path, known_mtime, max_size, disk_folder):
+        super().__init__()
+        self.path = path
+        self.known_mtime = known_mtime
+        self.max_size = max_size
+        self.disk_folder = disk_folder
+        self.signals = _DecodeSignals()
+
+    def run(self):
+        """Decode the thumbnail and report it back."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self.signals.finished.emit(self.path, None, None)
+            return
+        if mtime == self.known_mtime:
+            self.signals.finished.emit(self.path, mtime, None)
+            return
+        if Path(self.path).suffix.lower() in ANIMATED_SUFFIXES:
+            try:
+                data = QtCore.QByteArray(Path(self.path).read_bytes())
+            except OSError:
+                data = None
+            self.signals.finished.emit(self.path, mtime if data else None, data)
+            return
+        disk_file = self._get_disk_file(mtime)
+        image = QtGui.QImage(str(disk_file)) if disk_file and disk_file.exists() else None
+        if not image or image.isNull():
+            image = self._read_scaled()
+            if disk_file and not image.isNull():
+                disk_file.parent.mkdir(parents=True, exist_ok=True)
+                image.save(str(disk_file), "JPG", 90)
+        self.signals.finished.emit(self.path, mtime if not image.isNull() else None, image)
+
+    def _get_disk_file(self, mtime):
+        """Return the path of the scaled copy in the disk cache."""
+        if not self.disk_folder:
+            return None
+        key = hashlib.blake2b(
+            f"{self.path}|{mtime}|{self.max_size}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return Path(self.disk_folder, key[:2], f"{key}.jpg")
+
+    def _read_scaled(self):
+        """Read the image scaled down to the maximum size while decoding."""
+        reader = QtGui.QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > self.max_size or size.height() > self.max_size):
+            reader.setScaledSize(size.scaled(
+                self.max_size, self.max_size, QtCore.Qt.KeepAspectRatio
+            ))
+        return reader.read()
+
+
+class ThumbnailService(QtCore.QObject):
+    """Decode the thumbnails in the background and cache the results."""
+
+    # path, QImage or QByteArray. None if the file cannot be read.
+    thumbnail_ready = QtCore.Signal(str, object)
+
+    max_size = 960
+    cache_size = 128
+
+    def __init__(self, parent=None, workers=2):
+        """Initialize the service.
+
+        Args:
+            parent (QObject, optional): The parent object.
+            workers (int): Number of the threads decoding the thumbnails.
+        """
+        super().__init__(parent)
+        self.disk_folder = None
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(workers)
+        self._cache = OrderedDict()  # path => (mtime, data)
+        self._pending = set()
+
+    def set_disk_folder(self, folder):
+        """Store the scaled thumbnails in the folder. None disables it."""
+        self.disk_folder = str(folder) if folder else None
+
+    def request(self, path):
+        """Return the cached thumbnail and check it in the background.
+
+        The thumbnail_ready signal is emitted when the file is decoded or
+        the cached one is confirmed.
+
+        Args:
+            path (str): The thumbnail file.
+
+        Returns:
+            QImage or QByteArray: The cached thumbnail. None if not cached.
+        """
+        cached = self._cache.get(path)
+        if cached:
+            self._cache.move_to_end(path)
+        if path not in self._pending:
+            self._pending.add(path)
+            task = _DecodeTask(
+                path, cached[0] if cached else None, self.max_size, self.disk_folder
+            )
+            task.signals.finished.connect(self._on_finished)
+            self._pool.start(task)
+        return cached[1] if cached else None
+
+    def wait(self, msecs=-1):
+        """Wait for the running decode tasks. Mostly for tests."""
+        return self._pool.waitForDone(msecs)
+
+    def clear(self):
+        """Remove the thumbnails from the memory."""
+        self._cache.clear()
+
+    def _on_finished(self, path, mtime, data):
+        """Cache the decoded thumbnail and report it."""
+        self._pending.discard(path)
+        if mtime is None:
+            self._cache.pop(path, None)
+            self.thumbnail_ready.emit(path, None)
+            return
+        if data is None:
+            cached = self._cache.get(path)
+            data = cached[1] if cached else None
+            if data is None:
+                # evicted while checking. Decode again.
+                self.request(path)
+                return
+        self._cache[path] = (mtime, data)
+        self._cache.move_to_end(path)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.thumbnail_ready.emit(path, data)
+
+
+def get_service():
+    """Return the thumbnail service shared by the widgets."""
+    global _SERVICE  # pylint: disable=global-statement
+    if _SERVICE is None:
+        _SERVICE = ThumbnailService(QtCore.QCoreApplication.instance())
+    return _SERVICE
@@ -5,6 +5,7 @@ from tik_manager4.core.constants import ObjectType
 from tik_manager4.ui.Qt import QtWidgets, QtGui, QtCore
 from tik_manager4.ui.widgets.common import TikButtonBox
 from tik_manager4.ui import pick
+from tik_manager4.ui import thumbnails
 
 class LightboxDialog(QtWidgets.QDialog):
     """Minimalistic lightbox dialog to show full size image."""
@@ -86,6 +87,10 @@ class ImageWidget(QtWidgets.QLabel):
         self.is_movie = False
         self.q_media = None
         self.media_path = None
+        self._media_data = None  # QImage or QByteArray of the media
+        self._movie_buffer = None
+        self.thumbnail_service = thumbnails.get_service()
+        self.thumbnail_service.thumbnail_ready.connect(self._on_thumbnail_ready)
 
     def set_preview_settings(self, settings):
         """Set the preview settings object."""
@@ -99,26 +104,52 @@ class ImageWidget(QtWidgets.QLabel):
             self.aspect_ratio = 1.0 if ratio_str == "1:1" else 1.777
 
     def set_media(self, media_path):
-        """Set the media to the widget."""
+        """Set the media to the widget.
+
+        The media is decoded in the background. The empty thumbnail is
+        shown until it is ready unless it is already in the memory.
+        """
         self.media_path = media_path
-        if not Path(media_path).exists():
-            self.q_media = pick.pixmap("empty_thumbnail.png")
-            self.is_movie = False
-            self.update()
+        data = self.thumbnail_service.request(media_path) if media_path else None
+        self._apply_media(data)
+
+    def _on_thumbnail_ready(self, path, data):
+        """Show the decoded media if it is still the current one."""
+        if path != self.media_path:
+            return
+        # the cached media is already shown
+        if data is not None and data is self._media_data:
             return
-        if Path(media_path).suffix.lower() in [".gif", ".webp"]:
-            self.q_media = QtGui.QMovie(media_path)
+        self._apply_media(data)
+
+    def _apply_media(self, data):
+        """Show the QImage, play the QByteArray or show the empty thumbnail."""
+        if self.is_movie and self.q_media:
+            self.q_media.stop()
+            self.q_media.deleteLater()
+            self._movie_buffer.deleteLater()
+        self._movie_buffer = None
+        self._media_data = data
+        if isinstance(data, QtCore.QByteArray):
+            # the buffer is kept alive while the movie reads from it
+            self._movie_buffer = QtCore.QBuffer(self)
+            self._movie_buffer.setData(data)
+            self._movie_buffer.open(QtCore.QIODevice.ReadOnly)
+            self.q_media = QtGui.QMovie(self._movie_buffer, QtCore.QByteArray(), self)
             # don't start but show the first frame
             self.q_media.jumpToFrame(0)
             self.q_media.frameChanged.connect(self.update)
             self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
             # self.setMovie(self.q_media) # We draw manually
             self.is_movie = True
-        else:
-            self.q_media = QtGui.QPixmap(media_path)
+        elif data is not None:
+            self.q_media = QtGui.QPixmap.fromImage(data)
             self.setScaledContents(False)
             self.setAlignment(QtCore.Qt.AlignCenter)
             self.is_movie = False
+        else:
+            self.q_media = pick.pixmap("empty_thumbnail.png")
+            self.is_movie = False
         self.update()
 
     def clear(self):